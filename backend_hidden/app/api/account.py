@@ -13,7 +13,7 @@ from app.schemas import (
     BackendErrorResponse
 )
 from app.services.account_deletion_service import AccountDeletionService
-from app.services.supabase_db_service import SupabaseDBService
+from app.services.supabase_db_service import AsyncSupabaseDBService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -76,8 +76,8 @@ async def initiate_account_deletion(
         )
 
         # Log the initiation attempt
-        db_service = SupabaseDBService()
-        db_service.create_audit_log({
+        db_service = AsyncSupabaseDBService()
+        await db_service.create_audit_log({
             'event_type': 'account_deletion_initiated',
             'status': 'success',
             'severity': 'warning',
@@ -149,11 +149,11 @@ async def confirm_account_deletion(
         deletion_service = AccountDeletionService()
 
         # Log the confirmation attempt before deletion
-        db_service = SupabaseDBService()
+        db_service = AsyncSupabaseDBService()
         ip_address = request.client.host if request.client else None
         user_agent = request.headers.get('user-agent')
 
-        db_service.create_audit_log({
+        await db_service.create_audit_log({
             'event_type': 'account_deletion_confirmed',
             'status': 'in_progress',
             'severity': 'critical',
@@ -190,8 +190,8 @@ async def confirm_account_deletion(
 
         # Log the failure
         try:
-            db_service = SupabaseDBService()
-            db_service.create_audit_log({
+            db_service = AsyncSupabaseDBService()
+            await db_service.create_audit_log({
                 'event_type': 'account_deletion_failed',
                 'status': 'failure',
                 'severity': 'error',
@@ -247,8 +247,8 @@ async def get_data_summary(
     Get summary of all user data
     """
     try:
-        db_service = SupabaseDBService()
-        data_counts = db_service.count_user_data(current_user.id)
+        db_service = AsyncSupabaseDBService()
+        data_counts = await db_service.count_user_data(current_user.id)
 
         # Estimate storage files
         deletion_service = AccountDeletionService()
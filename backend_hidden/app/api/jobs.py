@@ -15,11 +15,11 @@ from app.models import DubbingJob
 from app.middleware.rate_limit import job_rate_limit, user_rate_limit
 from app.utils.security import create_http_exception, sanitize_error_message
 from app.utils.validation import validate_job_id, validate_language_codes, validate_pagination_params
+from app.utils.media import MediaProcessor, FileTooLargeError
 from app.config import settings
 from sqlalchemy.orm import Session
 from pathlib import Path
 import logging
-import aiofiles
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -175,7 +175,7 @@ async def list_user_jobs(
         job_service = SupabaseJobService()
         
         # Get user's jobs from Supabase
-        jobs = job_service.db_service.get_user_jobs(current_user.id, validated_limit)
+        jobs = await job_service.db_service.get_user_jobs(current_user.id, validated_limit)
         
         # Convert to response format
         job_responses = []
@@ -356,36 +356,43 @@ async def mock_file_upload(
     Mock endpoint for file uploads in development mode.
     Saves files to the backend/uploads directory.
     """
+    max_size = settings.get_max_file_size_bytes()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds maximum size of {settings.max_file_size}"
+        )
+
     try:
         logger.info(f"Mock upload: Receiving file for path: {file_path}")
 
-        # Read the file content from the request body
-        file_content = await request.body()
-
         # Create the full path in the backend uploads directory
         # Remove leading "uploads/" from file_path if present to avoid duplication
         clean_path = file_path.replace("uploads/", "", 1) if file_path.startswith("uploads/") else file_path
         upload_dir = Path("backend/uploads") if Path("backend").exists() else Path("uploads")
         full_path = upload_dir / clean_path
 
-        # Ensure the directory exists
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Write the file
-        async with aiofiles.open(full_path, 'wb') as f:
-            await f.write(file_content)
+        # Stream the request body to disk, hashing it as it is written
+        size, checksum = await MediaProcessor.save_stream(request.stream(), full_path, max_size=max_size)
 
         logger.info(f"Mock upload: Successfully saved file to {full_path}")
 
         return {
             "message": "File uploaded successfully",
             "path": str(full_path),
-            "size": len(file_content)
+            "size": size,
+            "checksum": checksum
         }
 
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds maximum size of {settings.max_file_size}"
+        )
     except Exception as e:
         logger.error(f"Mock upload error: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
-        )
\ No newline at end of file
+        )
@@ -4,13 +4,15 @@ Supabase authentication and JWT validation middleware
 import jwt
 from fastapi import HTTPException, Depends, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
+from supabase import Client
+from app.services.clients import get_client_registry
+from app.services.supabase_db_service import run_blocking
 from app.config import settings
 from app.schemas import UserResponse
 from app.database import get_db
 from sqlalchemy.orm import Session
 from app.models import User
-from typing import Optional
+from typing import Dict, Optional
 import logging
 import time
 from app.utils.audit_logger import (
@@ -18,27 +20,32 @@ from app.utils.audit_logger import (
     AuditEventType,
     AuditSeverity
 )
+from app.utils.token_cache import VerifiedTokenCache
+from app.utils.jwks_cache import JWKSCache
+from app.utils.ttl_cache import TTLCache
+from app.utils.downloads import ProgressCallback, download_to_file
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Supabase client will be initialized lazily
-supabase: Client = None
-
 def get_supabase_client() -> Client:
-    """Get Supabase client, initializing if needed"""
-    global supabase
-    if supabase is None:
-        supabase = create_client(settings.supabase_url, settings.supabase_service_key)
-    return supabase
+    """Get the shared Supabase client from the client registry"""
+    return get_client_registry().supabase
 
 # HTTP Bearer token scheme
 security = HTTPBearer(auto_error=False)
 
-# Simple in-memory JWKS cache
-_jwks_cache = None
-_jwks_cache_time = 0
-_JWKS_CACHE_TTL = 3600  # 1 hour in seconds
+# Parsed public keys by kid, and claims of already verified tokens
+_signing_keys: Dict[str, tuple] = {}
+_token_cache = VerifiedTokenCache(settings.jwt_cache_size)
+
+# User rows by user ID, so authenticated requests don't hit the database
+_user_cache = TTLCache(max_size=settings.user_cache_size, ttl=settings.user_cache_ttl)
+
+
+def invalidate_cached_user(user_id: str):
+    """Forget a cached user row (e.g. after the user is changed or deleted)"""
+    _user_cache.invalidate(user_id)
 
 
 class AuthError(HTTPException):
@@ -51,30 +58,64 @@ class AuthError(HTTPException):
         )
 
 
+def _on_jwks_refreshed(jwks: dict):
+    """Drop parsed keys and cached tokens for keys that were rotated out"""
+    published = {jwk['kid']: jwk for jwk in jwks.get('keys', []) if jwk.get('kid')}
+
+    for kid in list(_signing_keys):
+        cached = _signing_keys.get(kid)
+        if cached and (kid not in published or cached[0] != published[kid]):
+            _signing_keys.pop(kid, None)
+
+    _token_cache.retain_kids(published)
+
+
+# JWKS cache, refreshed in the background once the app has started
+_jwks_cache = JWKSCache(
+    url=f"{settings.supabase_url}/auth/v1/jwks",
+    ttl=settings.jwks_refresh_interval,
+    min_forced_interval=settings.jwks_forced_refresh_interval,
+    on_refresh=_on_jwks_refreshed
+)
+
+
+def get_jwks_cache() -> JWKSCache:
+    """Get the JWKS cache (started and stopped with the application)"""
+    return _jwks_cache
+
+
 def get_jwks() -> dict:
-    """Get JWKS from cache or fetch if expired"""
-    global _jwks_cache, _jwks_cache_time
+    """Get the current JWKS, serving the last good set if a refresh fails"""
+    return _jwks_cache.get()
+
 
-    current_time = time.time()
+def get_signing_key(kid: str):
+    """Get the parsed public key for a key ID, parsing each JWK only once"""
+    # Cheap while the JWKS is cached; a refresh prunes rotated-out keys first
+    jwks = get_jwks()
 
-    # Return cached JWKS if still valid
-    if _jwks_cache and (current_time - _jwks_cache_time) < _JWKS_CACHE_TTL:
-        return _jwks_cache
+    cached = _signing_keys.get(kid)
+    if cached:
+        return cached[1]
 
-    # Fetch fresh JWKS
-    import httpx
-    jwks_url = f"{settings.supabase_url}/auth/v1/jwks"
+    jwk = _find_jwk(jwks, kid)
+    # The key may have just been rotated in. On the event loop the refresh only
+    # starts in the background; this token is rejected and later ones verify.
+    if jwk is None and _jwks_cache.refresh_for_unknown_kid():
+        jwk = _find_jwk(get_jwks(), kid)
+    if jwk is None:
+        return None
 
-    with httpx.Client() as client:
-        response = client.get(jwks_url)
-        jwks = response.json()
+    key = jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+    _signing_keys[kid] = (jwk, key)
+    return key
 
-    # Update cache
-    _jwks_cache = jwks
-    _jwks_cache_time = current_time
 
-    logger.info("JWKS cache refreshed")
-    return jwks
+def _find_jwk(jwks: dict, kid: str) -> Optional[dict]:
+    for jwk in jwks.get('keys', []):
+        if jwk.get('kid') == kid:
+            return jwk
+    return None
 
 
 def verify_jwt_token(token: str, ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> dict:
@@ -82,6 +123,11 @@ def verify_jwt_token(token: str, ip_address: Optional[str] = None, user_agent: O
     Verify JWT token and return payload
     """
     try:
+        # Tokens verified earlier are trusted until they expire
+        cached_payload = _token_cache.get(token)
+        if cached_payload is not None:
+            return cached_payload
+
         # Decode JWT token without verification first to get the header
         unverified_header = jwt.get_unverified_header(token)
 
@@ -90,15 +136,8 @@ def verify_jwt_token(token: str, ip_address: Optional[str] = None, user_agent: O
         if not kid:
             raise AuthError("Invalid token: missing key ID")
 
-        # Get cached JWKS
-        jwks = get_jwks()
-
         # Find the correct key
-        key = None
-        for jwk in jwks['keys']:
-            if jwk['kid'] == kid:
-                key = jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
-                break
+        key = get_signing_key(kid)
 
         if not key:
             raise AuthError("Invalid token: key not found")
@@ -116,6 +155,8 @@ def verify_jwt_token(token: str, ip_address: Optional[str] = None, user_agent: O
         if not payload.get('sub'):
             raise AuthError("Invalid token: missing subject")
 
+        _token_cache.put(token, payload, kid)
+
         # Log successful token verification
         from app.services.supabase_db_service import SupabaseDBService
         audit_logger = get_audit_logger(db_service=SupabaseDBService())
@@ -201,8 +242,12 @@ async def get_current_user(
             )
             raise AuthError("Not authenticated")
 
+        # A token whose claims aren't cached yet is being used for the first time
+        token = credentials.credentials
+        first_use = _token_cache.get(token) is None
+
         # Verify the JWT token
-        payload = verify_jwt_token(credentials.credentials, ip_address, user_agent)
+        payload = verify_jwt_token(token, ip_address, user_agent)
 
         # Extract user information
         user_id = payload.get('sub')
@@ -236,45 +281,18 @@ async def get_current_user(
                 headers={"X-Email-Verified": "false"}
             )
 
-        # Use Supabase to check/create user
         from app.services.supabase_db_service import SupabaseDBService
-        db_service = SupabaseDBService()
-        audit_logger = get_audit_logger(db_service=db_service)
+        audit_logger = get_audit_logger(db_service=SupabaseDBService())
 
-        user = db_service.get_user(user_id)
+        # Cached user rows are only trusted while the token's email still matches
+        user = _user_cache.get(user_id)
+        created = False
 
-        if not user:
-            # Create new user
-            user = db_service.create_user(user_id, email)
-            logger.info(f"Created new user: {user_id}")
+        if user is None or user['email'] != email:
+            user, created = await _load_user(user_id, email, audit_logger, ip_address, user_agent)
 
-            # Log account creation
-            audit_logger.log_account_created(
-                user_id=user_id,
-                email=email,
-                ip_address=ip_address,
-                user_agent=user_agent
-            )
-        else:
-            # Update email if it has changed
-            if user['email'] != email:
-                db_service.update_user(user_id, {'email': email})
-                logger.info(f"Updated user email: {user_id}")
-
-                # Log email change
-                audit_logger.log_event(
-                    event_type=AuditEventType.EMAIL_CHANGED,
-                    user_id=user_id,
-                    email=email,
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    status="success",
-                    severity=AuditSeverity.INFO,
-                    message="User email updated",
-                    metadata={"old_email": user['email'], "new_email": email}
-                )
-
-            # Log successful login
+        # Log successful login once per token rather than on every request
+        if first_use and not created:
             audit_logger.log_login_success(
                 user_id=user_id,
                 email=email,
@@ -311,6 +329,59 @@ async def get_current_user(
         raise AuthError("Authentication failed")
 
 
+async def _load_user(user_id: str, email: str, audit_logger, ip_address=None, user_agent=None):
+    """
+    Fetch (or create) a user row in Supabase and cache it
+
+    Returns:
+        (user, created) - created is True if the user was just created
+    """
+    from app.services.supabase_db_service import AsyncSupabaseDBService
+    db_service = AsyncSupabaseDBService()
+    created = False
+
+    user = await db_service.get_user(user_id)
+
+    if not user:
+        # Create new user
+        user = await db_service.create_user(user_id, email)
+        created = True
+        logger.info(f"Created new user: {user_id}")
+
+        # Log account creation
+        audit_logger.log_account_created(
+            user_id=user_id,
+            email=email,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+    else:
+        # Update email if it has changed
+        if user['email'] != email:
+            old_email = user['email']
+            user = await db_service.update_user(user_id, {'email': email}) or {**user, 'email': email}
+            logger.info(f"Updated user email: {user_id}")
+
+            # Log email change
+            audit_logger.log_event(
+                event_type=AuditEventType.EMAIL_CHANGED,
+                user_id=user_id,
+                email=email,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                status="success",
+                severity=AuditSeverity.INFO,
+                message="User email updated",
+                metadata={"old_email": old_email, "new_email": email}
+            )
+
+    if user:
+        # Replaces any cached row, so an email change invalidates the old entry
+        _user_cache.put(user_id, user)
+
+    return user, created
+
+
 async def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Optional[UserResponse]:
@@ -349,7 +420,11 @@ def get_current_user_unverified():
 
 # Storage service for Supabase Storage
 class SupabaseStorageService:
-    """Service for interacting with Supabase Storage"""
+    """Service for interacting with Supabase Storage
+
+    supabase-py storage calls are blocking, so each one runs in the shared
+    Supabase thread pool.
+    """
     
     def __init__(self):
         self.client = get_supabase_client()
@@ -364,7 +439,8 @@ class SupabaseStorageService:
         Generate a signed URL for file upload
         """
         try:
-            response = self.client.storage.from_(bucket).create_signed_upload_url(
+            response = await run_blocking(
+                self.client.storage.from_(bucket).create_signed_upload_url,
                 file_path,
                 expires_in
             )
@@ -388,7 +464,8 @@ class SupabaseStorageService:
         Generate a signed URL for file download
         """
         try:
-            response = self.client.storage.from_(bucket).create_signed_url(
+            response = await run_blocking(
+                self.client.storage.from_(bucket).create_signed_url,
                 file_path,
                 expires_in
             )
@@ -407,7 +484,7 @@ class SupabaseStorageService:
         Download a file from storage
         """
         try:
-            response = self.client.storage.from_(bucket).download(file_path)
+            response = await run_blocking(self.client.storage.from_(bucket).download, file_path)
 
             if not response:
                 raise Exception(f"Failed to download file: {file_path}")
@@ -418,6 +495,68 @@ class SupabaseStorageService:
             logger.error(f"Error downloading file: {e}")
             raise Exception(f"Failed to download file: {str(e)}")
 
+    async def download_to_file(
+        self,
+        bucket: str,
+        file_path: str,
+        output_path: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Stream a file from storage to a local path without holding it in memory
+
+        Interrupted transfers resume with a Range request.
+
+        Returns:
+            int: Size of the downloaded file in bytes
+        """
+        try:
+            url, headers = self._object_request(bucket, file_path)
+            return await download_to_file(
+                get_client_registry().http,
+                url,
+                output_path,
+                headers=headers,
+                progress=progress,
+                max_retries=settings.storage_download_retries
+            )
+
+        except Exception as e:
+            logger.error(f"Error downloading file: {e}")
+            raise Exception(f"Failed to download file: {str(e)}")
+
+    async def get_object_version(self, bucket: str, file_path: str) -> Optional[str]:
+        """
+        Return an identifier that changes whenever the stored object changes
+
+        Uses the object's ETag, falling back to its size and modification
+        time. Returns None if the object metadata can't be read.
+        """
+        try:
+            url, headers = self._object_request(bucket, file_path)
+            response = await get_client_registry().http.head(url, headers=headers)
+            response.raise_for_status()
+
+            etag = response.headers.get("etag")
+            if etag:
+                return etag.strip('"')
+            size = response.headers.get("content-length")
+            modified = response.headers.get("last-modified")
+            return f"{size}:{modified}" if size and modified else None
+
+        except Exception as e:
+            logger.warning(f"Could not read object metadata for {file_path}: {e}")
+            return None
+
+    def _object_request(self, bucket: str, file_path: str):
+        """URL and auth headers for the storage object endpoint"""
+        url = f"{settings.supabase_url}/storage/v1/object/{bucket}/{file_path.lstrip('/')}"
+        headers = {
+            "Authorization": f"Bearer {settings.supabase_service_key}",
+            "apikey": settings.supabase_service_key
+        }
+        return url, headers
+
     async def upload_file(
         self,
         bucket: str,
@@ -433,7 +572,8 @@ class SupabaseStorageService:
             if content_type:
                 options['content-type'] = content_type
 
-            response = self.client.storage.from_(bucket).upload(
+            response = await run_blocking(
+                self.client.storage.from_(bucket).upload,
                 file_path,
                 file_data,
                 options
@@ -451,12 +591,45 @@ class SupabaseStorageService:
             logger.error(f"Error uploading file: {e}")
             raise Exception(f"Failed to upload file: {str(e)}")
 
+    async def upload_from_path(
+        self,
+        bucket: str,
+        file_path: str,
+        local_path: str,
+        content_type: str = None
+    ) -> str:
+        """
+        Upload a local file to storage, streaming it from disk
+        """
+        def upload():
+            with open(local_path, 'rb') as f:
+                return self.client.storage.from_(bucket).upload(file_path, f, options)
+
+        try:
+            options = {}
+            if content_type:
+                options['content-type'] = content_type
+
+            response = await run_blocking(upload)
+
+            if not response:
+                raise Exception(f"Failed to upload file: {file_path}")
+
+            # Get public URL
+            public_url = self.client.storage.from_(bucket).get_public_url(file_path)
+
+            return public_url
+
+        except Exception as e:
+            logger.error(f"Error uploading file: {e}")
+            raise Exception(f"Failed to upload file: {str(e)}")
+
     async def delete_file(self, bucket: str, file_path: str) -> bool:
         """
         Delete a file from storage
         """
         try:
-            response = self.client.storage.from_(bucket).remove([file_path])
+            response = await run_blocking(self.client.storage.from_(bucket).remove, [file_path])
 
             if response.get('error'):
                 logger.error(f"Failed to delete file: {response['error']}")
@@ -2,7 +2,7 @@
 Configuration management for YT Dubber API
 """
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 
@@ -13,10 +13,21 @@ class Settings(BaseSettings):
     database_url: str
     supabase_url: Optional[str] = None  # Optional, using local SQLite
     supabase_service_key: Optional[str] = None  # Optional, using local SQLite
+    supabase_executor_threads: int = 16  # Threads for blocking supabase-py calls made from async code
     
     # AI Services (optional in dev mode)
     deepgram_api_key: Optional[str] = None
+    stt_ingest_codec: str = "flac"  # Audio is transcoded to 16 kHz mono flac or opus before transcription; "" sends files as-is
+    stt_chunk_threshold_mb: int = 25  # Transcription audio larger than this is sent in concurrent chunks; 0 disables chunking
+    stt_chunk_seconds: int = 45  # Target chunk length for chunked transcription
+    stt_concurrency: int = 4  # Chunks of one file transcribed at the same time
+    stt_retries: int = 2  # Retries per failed transcription chunk
     openai_api_key: Optional[str] = None
+    openai_requests_per_minute: int = 500  # Request budget shared by the process's OpenAI calls; 0 disables it
+    translation_concurrency: int = 8  # Chunks of one text translated at the same time
+    translation_retries: int = 3  # Retries per translation request on rate-limit, timeout and server errors
+    tts_concurrency: int = 4  # Chunks of one text synthesized at the same time
+    tts_retries: int = 2  # Retries per failed TTS chunk
     
     # Application Configuration
     app_name: str = "YT Dubber API"
@@ -28,11 +39,26 @@ class Settings(BaseSettings):
     storage_bucket: str = "yt-dubber-uploads"
     max_file_size: str = "100MB"
     allowed_audio_types: str = "audio/mpeg,audio/wav,audio/mp3,audio/m4a,video/mp4"
+    storage_download_retries: int = 3  # Times an interrupted storage download is resumed
+    media_cache_dir: str = ""  # Worker media cache directory (default: <tmp>/ytdubber-media-cache)
+    media_cache_size_mb: int = 2048  # Worker media cache capacity; 0 disables the cache
+    tts_artifact_dir: Optional[str] = None  # Set (e.g. "downloads") to keep a copy of every TTS output for /download
     
     # Worker Configuration
-    worker_poll_interval: int = 5
+    worker_poll_interval: int = 60  # Fallback rescan interval; job notifications wake workers immediately
+    worker_unnotified_poll_interval: int = 5  # Rescan interval while notifications can't reach workers (memory backend or listener down)
+    job_notify_backend: str = "auto"  # auto, postgres, redis or memory
+    job_notify_channel: str = "dubbing_jobs"
     max_concurrent_jobs: int = 3
     job_timeout: int = 3600
+    worker_batch_size: int = 100  # Claimable tasks fetched per query page
+    worker_lease_seconds: int = 120  # Language task lease length; renewed while a task runs
+    pipeline_stage_concurrency: str = "download=4,transcribe=2,translate=8,synthesize=4,mix=2,upload=4"  # Workers per pipeline stage
+    pipeline_queue_size: int = 16  # Items buffered in front of each pipeline stage
+    media_max_processes: int = 4  # FFmpeg/FFprobe processes allowed to run at once
+    media_command_timeout: int = 300  # Default FFmpeg/FFprobe timeout in seconds
+    audio_chunk_silence_search: float = 5.0  # Seconds either side of each chunk cut searched for a pause; 0 = fixed-length chunks
+    audio_analysis_mmap_mb: int = 64  # Memory-map silence-analysis PCM larger than this instead of loading it
     
     # Security Configuration
     rate_limit_enabled: bool = True
@@ -41,6 +67,17 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     secure_cookies: bool = False
     https_only: bool = False
+    jwt_cache_size: int = 1024  # Verified JWTs cached (by hash) until they expire
+    jwks_refresh_interval: int = 3600  # JWKS lifetime; refreshed in the background before it runs out
+    jwks_forced_refresh_interval: int = 30  # Minimum seconds between refreshes triggered by unknown key IDs
+    user_cache_ttl: int = 300  # Seconds a user row is served from memory in get_current_user
+    user_cache_size: int = 4096
+    audit_buffer_size: int = 10000  # Audit events held in memory before the overflow policy applies
+    audit_batch_size: int = 100  # Audit rows per bulk insert
+    audit_flush_interval: float = 2.0  # Maximum seconds an audit event waits before being written
+    audit_overflow_policy: str = "drop_oldest"  # drop_oldest or spill
+    audit_write_attempts: int = 5  # Failed inserts of one batch before the overflow policy spills or drops it
+    audit_spill_path: str = "audit_spill.jsonl"  # Used by the spill overflow policy
 
     # CAPTCHA Configuration
     hcaptcha_secret_key: Optional[str] = None  # hCaptcha secret key for bot protection
@@ -56,6 +93,8 @@ class Settings(BaseSettings):
     sentry_dsn: Optional[str] = None
     health_check_interval: int = 30
     metrics_enabled: bool = False
+    api_log_body_bytes: int = 2048  # Leading bytes of JSON request bodies written to the API call log
+    api_log_body_sample_rate: float = 1.0  # Fraction of JSON requests whose body is logged (0 disables)
     
     # Payment Configuration
     stripe_secret_key: Optional[str] = "sk_test_dummy_key_for_development_only"
@@ -92,6 +131,23 @@ class Settings(BaseSettings):
         if isinstance(self.allowed_audio_types, str):
             return [mime_type.strip() for mime_type in self.allowed_audio_types.split(',')]
         return self.allowed_audio_types
+    
+    def get_pipeline_stage_concurrency(self) -> Dict[str, int]:
+        """Parse per-stage worker counts from a comma-separated stage=count string"""
+        concurrency = {
+            "download": 4,
+            "transcribe": 2,
+            "translate": 8,
+            "synthesize": 4,
+            "mix": 2,
+            "upload": 4,
+        }
+        for entry in self.pipeline_stage_concurrency.split(','):
+            if '=' not in entry:
+                continue
+            stage, count = entry.split('=', 1)
+            concurrency[stage.strip()] = max(int(count), 1)
+        return concurrency
 
 
 # Global settings instance
@@ -1,6 +1,7 @@
 """
 Main FastAPI application
 """
+import asyncio
 from fastapi import FastAPI, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -10,9 +11,9 @@ from app.api import jobs, payments, auth_endpoints, account
 from app.schemas import HealthResponse, BackendErrorResponse
 # from app.database import create_tables  # Removed - using Supabase REST API
 from app.middleware.rate_limit import limiter, rate_limit_handler, RateLimitExceeded, health_rate_limit
-from app.middleware.security import SecurityHeadersMiddleware, RequestLoggingMiddleware, get_cors_middleware, RateLimitHeadersMiddleware
-from app.middleware.api_logging import APILoggingMiddleware
+from app.middleware.api_middleware import APIMiddleware, stop_api_call_logging
 from app.utils.security import create_safe_error_response, sanitize_error_message
+from app.utils.media import MediaProcessor, FileTooLargeError
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -38,11 +39,8 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 
-# Add security middleware (order matters - first added is outermost)
-app.add_middleware(APILoggingMiddleware)  # Add comprehensive API logging
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RequestLoggingMiddleware)
-app.add_middleware(RateLimitHeadersMiddleware)
+# Security headers, API logging and request metrics in a single ASGI pass
+app.add_middleware(APIMiddleware)
 
 # CORS middleware configuration
 logger.info(f"CORS Origins: {settings.get_cors_origins()}")
@@ -108,23 +106,21 @@ async def mock_upload(file_path: str, request: Request):
     """
     Mock upload endpoint for development - actually saves files to disk
     """
+    max_size = settings.get_max_file_size_bytes()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size:
+        raise HTTPException(status_code=413, detail="File too large")
+    
     try:
-        # Read the uploaded file data
-        body = await request.body()
-        
-        logger.info(f"Mock upload received: {file_path}, size: {len(body)} bytes")
-        
         # Create uploads directory if it doesn't exist
         uploads_dir = Path("uploads")
         uploads_dir.mkdir(exist_ok=True)
         
-        # Save file to disk
+        # Stream the body to disk, hashing as it is written
         file_path_full = uploads_dir / file_path
-        file_path_full.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(file_path_full, "wb") as f:
-            f.write(body)
+        size, checksum = await MediaProcessor.save_stream(request.stream(), file_path_full, max_size=max_size)
         
+        logger.info(f"Mock upload received: {file_path}, size: {size} bytes")
         logger.info(f"File saved to: {file_path_full}")
         
         # Log file upload details to dedicated log file
@@ -132,15 +128,18 @@ async def mock_upload(file_path: str, request: Request):
         with open(upload_log_path, "a") as log_file:
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_file.write(f"[{timestamp}] UPLOAD: {file_path} | Size: {len(body)} bytes | Saved to: {file_path_full}\n")
+            log_file.write(f"[{timestamp}] UPLOAD: {file_path} | Size: {size} bytes | SHA256: {checksum} | Saved to: {file_path_full}\n")
         
         # Return success response
         return {
             "message": "File uploaded successfully (mock)",
             "file_path": file_path,
-            "size": len(body),
+            "size": size,
+            "checksum": checksum,
             "saved_to": str(file_path_full)
         }
+    except FileTooLargeError:
+        raise HTTPException(status_code=413, detail="File too large")
     except Exception as e:
         logger.error(f"Mock upload error: {e}")
         raise HTTPException(status_code=500, detail="Mock upload failed")
@@ -160,7 +159,7 @@ async def download_file(filename: str):
             raise HTTPException(status_code=400, detail="Invalid file type")
         
         # Construct file path
-        file_path = Path("downloads") / filename
+        file_path = Path(settings.tts_artifact_dir or "downloads") / filename
         
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="File not found")
@@ -185,7 +184,7 @@ async def list_downloads():
     List available download files
     """
     try:
-        downloads_dir = Path("downloads")
+        downloads_dir = Path(settings.tts_artifact_dir or "downloads")
         if not downloads_dir.exists():
             return {"files": []}
         
@@ -216,11 +215,11 @@ async def test_supabase():
     Test Supabase connection
     """
     try:
-        from app.services.supabase_db_service import SupabaseDBService
+        from app.services.supabase_db_service import AsyncSupabaseDBService
         
-        db_service = SupabaseDBService()
+        db_service = AsyncSupabaseDBService()
         # Test by getting a specific user
-        test_user = db_service.get_user("dev-user-123")
+        test_user = await db_service.get_user("dev-user-123")
         
         return {
             "status": "success",
@@ -278,12 +277,12 @@ async def worker_health():
     Note: This checks if there are pending jobs in the queue
     """
     try:
-        from app.services.supabase_db_service import SupabaseDBService
+        from app.services.supabase_db_service import AsyncSupabaseDBService
 
-        db_service = SupabaseDBService()
+        db_service = AsyncSupabaseDBService()
 
         # Get jobs with processing status
-        processing_jobs = db_service.get_jobs_by_status("processing")
+        processing_jobs = await db_service.get_jobs_by_status("processing")
 
         # Get some recent jobs to see worker activity
         jobs_count = len(processing_jobs) if processing_jobs else 0
@@ -349,6 +348,23 @@ async def startup_event():
     # Database tables are managed by Supabase - no need to create them here
     logger.info("Using Supabase REST API for database operations")
     
+    # Create the shared, pooled service clients up front
+    from app.services.clients import get_client_registry
+    get_client_registry()
+    
+    if settings.supabase_url:
+        # Persist audit events in batches off the request path
+        from app.services.supabase_db_service import SupabaseDBService
+        from app.utils.audit_logger import get_audit_logger
+        get_audit_logger(db_service=SupabaseDBService()).start()
+        
+        # Keep signing keys fresh in the background instead of on the request path
+        from app.auth import get_jwks_cache
+        jwks_cache = get_jwks_cache()
+        # Fetch the keys once before serving, off the event loop, so the first requests can be verified
+        await asyncio.to_thread(jwks_cache.refresh)
+        jwks_cache.start()
+    
     logger.info("YT Dubber API started successfully")
 
 
@@ -358,6 +374,22 @@ async def shutdown_event():
     Application shutdown event
     """
     logger.info("Shutting down YT Dubber API...")
+    
+    from app.services.job_notifier import get_job_notifier
+    await get_job_notifier().close()
+    
+    from app.auth import get_jwks_cache
+    await get_jwks_cache().stop()
+    
+    # Flush buffered audit events before the database clients close
+    from app.utils.audit_logger import get_audit_logger
+    await get_audit_logger().stop()
+    
+    from app.services.clients import close_client_registry
+    await close_client_registry()
+    
+    # Write out API call log entries still queued
+    stop_api_call_logging()
 
 
 # Development endpoints (only in debug mode)
@@ -0,0 +1,349 @@
+"""
+Pure ASGI middleware for API logging, security headers and request metrics
+
+Replaces the APILoggingMiddleware, SecurityHeadersMiddleware,
+RequestLoggingMiddleware and RateLimitHeadersMiddleware stack. Those were
+BaseHTTPMiddleware subclasses, each adding a task and response stream
+wrapper per request. This middleware does the same work in a single pass
+over the ASGI messages and never buffers request or response bodies.
+
+API call log entries go through a QueueHandler; JSON formatting and file
+writes happen on the listener thread, off the request path. Only the first
+api_log_body_bytes of a sampled share of JSON request bodies are logged;
+uploads and other non-JSON bodies are never read by the middleware.
+"""
+import json
+import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils import monitoring
+
+logger = logging.getLogger(__name__)
+security_logger = logging.getLogger("app.middleware.security")
+
+SUSPICIOUS_PATTERNS = (
+    "admin", "login", "password", "sql", "script", "eval", "exec",
+    "union", "select", "drop", "delete", "insert", "update",
+    "javascript:", "vbscript:", "onload", "onerror", "alert"
+)
+
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "img-src 'self' data: https:; "
+    "font-src 'self' data:; "
+    "connect-src 'self' https://api.supabase.co https://api.openai.com https://api.deepgram.com; "
+    "frame-ancestors 'none'; "
+    "base-uri 'self'; "
+    "form-action 'self'"
+)
+
+
+def build_security_headers() -> List[Tuple[str, str]]:
+    """Headers added to every response"""
+    headers = [
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "DENY"),
+        ("X-XSS-Protection", "1; mode=block"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        ("Permissions-Policy", "geolocation=(), microphone=(), camera=()"),
+        ("Content-Security-Policy", CONTENT_SECURITY_POLICY),
+    ]
+    if settings.https_only:
+        headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload"))
+    return headers
+
+
+NO_CACHE_HEADERS = [
+    ("Cache-Control", "no-store, no-cache, must-revalidate, private"),
+    ("Pragma", "no-cache"),
+    ("Expires", "0"),
+]
+
+
+class _JSONMessage:
+    """Log argument rendered as indented JSON only when the record is formatted"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, indent=2, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_api_log_listener: Optional[QueueListener] = None
+
+
+def setup_api_call_logging(log_file_path: str) -> logging.Logger:
+    """
+    Route the api_calls logger through a queue to a background file writer
+
+    Args:
+        log_file_path: File the listener thread writes to
+
+    Returns:
+        The api_calls logger
+    """
+    global _api_log_listener
+
+    api_logger = logging.getLogger('api_calls')
+    api_logger.setLevel(logging.INFO)
+    if _api_log_listener is not None:
+        return api_logger
+
+    file_handler = logging.FileHandler(log_file_path)
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    api_logger.addHandler(_DeferredQueueHandler(log_queue))
+    # Root handlers (logging.basicConfig) would format and write on the request path
+    api_logger.propagate = False
+    _api_log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _api_log_listener.start()
+    return api_logger
+
+
+def stop_api_call_logging():
+    """Flush queued API call log entries and stop the writer thread"""
+    global _api_log_listener
+
+    if _api_log_listener is None:
+        return
+    _api_log_listener.stop()
+    for handler in _api_log_listener.handlers:
+        handler.close()
+    api_logger = logging.getLogger('api_calls')
+    api_logger.handlers = [
+        handler for handler in api_logger.handlers
+        if not isinstance(handler, _DeferredQueueHandler)
+    ]
+    api_logger.propagate = True
+    _api_log_listener = None
+
+
+def is_json_content_type(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+class APIMiddleware:
+    """
+    Single-pass ASGI middleware for every HTTP request:
+
+    - adds security, cache-control and rate-limit headers to the response
+    - logs requests and responses to the api_calls log and the console
+    - flags suspicious paths and user agents
+    - records timing in monitoring.metrics
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        log_file_path: str = None,
+        body_log_bytes: int = None,
+        body_sample_rate: float = None
+    ):
+        self.app = app
+        self.log_file_path = log_file_path or "/tmp/api_calls.log"
+        self.body_log_bytes = settings.api_log_body_bytes if body_log_bytes is None else body_log_bytes
+        self.body_sample_rate = settings.api_log_body_sample_rate if body_sample_rate is None else body_sample_rate
+        self.security_headers = build_security_headers()
+        self.api_logger = setup_api_call_logging(self.log_file_path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        user_agent = headers.get("user-agent", "unknown")
+        is_api = path.startswith("/api/")
+
+        self._check_suspicious(client_ip, method, path, user_agent)
+        if is_api:
+            security_logger.info(
+                f"API request - IP: {client_ip}, Method: {method}, "
+                f"Path: {path}, User-Agent: {user_agent[:100]}"
+            )
+        logger.info(f"🌐 {method} {path} from {client_ip}")
+
+        # Peek at the start of sampled JSON bodies as the application reads them
+        content_type = headers.get("content-type", "")
+        captures_body = (
+            method in ("POST", "PUT", "PATCH")
+            and self.body_log_bytes > 0
+            and is_json_content_type(content_type)
+            and random.random() < self.body_sample_rate
+        )
+        body_chunks: List[bytes] = []
+        body_state = {"size": 0, "complete": not captures_body, "logged": False}
+        status_code = 500
+        response_length: Optional[str] = None
+        response_headers: Dict[str, str] = {}
+
+        def log_request():
+            if body_state["logged"]:
+                return
+            body_state["logged"] = True
+            self._log_request(scope, headers, client_ip, body_chunks, body_state)
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and not body_state["logged"]:
+                chunk = message.get("body", b"")
+                room = self.body_log_bytes - body_state["size"]
+                if chunk:
+                    body_chunks.append(chunk[:room])
+                body_state["size"] += len(chunk)
+                body_state["complete"] = not message.get("more_body", False)
+                if body_state["complete"] or body_state["size"] >= self.body_log_bytes:
+                    log_request()
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_length, response_headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers_mutable = MutableHeaders(scope=message)
+                for name, value in self.security_headers:
+                    response_headers_mutable[name] = value
+                if is_api:
+                    for name, value in NO_CACHE_HEADERS:
+                        response_headers_mutable[name] = value
+                state = scope.get("state") or {}
+                if "rate_limit_remaining" in state:
+                    response_headers_mutable["X-Rate-Limit-Remaining"] = str(state["rate_limit_remaining"])
+                if "rate_limit_reset" in state:
+                    response_headers_mutable["X-Rate-Limit-Reset"] = str(state["rate_limit_reset"])
+                response_length = response_headers_mutable.get("content-length")
+                response_headers = dict(response_headers_mutable.items())
+                log_request()
+            await send(message)
+
+        monitoring.metrics.in_flight += 1
+        try:
+            if captures_body:
+                await self.app(scope, receive_wrapper, send_wrapper)
+            else:
+                log_request()
+                await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            process_time = time.perf_counter() - start_time
+            monitoring.metrics.record_request(process_time, 500)
+            log_request()
+
+            error_log = {
+                "type": "ERROR",
+                "timestamp": time.time(),
+                "method": method,
+                "path": path,
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "process_time_ms": round(process_time * 1000, 2),
+                "client_ip": client_ip
+            }
+            self.api_logger.error("ERROR: %s", _JSONMessage(error_log))
+            logger.error(f"💥 {method} {path} -> ERROR: {str(e)} ({process_time:.3f}s)")
+            raise
+        finally:
+            monitoring.metrics.in_flight -= 1
+
+        process_time = time.perf_counter() - start_time
+        monitoring.metrics.record_request(process_time, status_code)
+
+        response_log = {
+            "type": "RESPONSE",
+            "timestamp": time.time(),
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "response_headers": response_headers,
+            "response_body": (
+                f"Response body present ({response_length} bytes)"
+                if response_length and int(response_length) > 0 else "No response body"
+            ),
+            "process_time_ms": round(process_time * 1000, 2),
+            "client_ip": client_ip
+        }
+        self.api_logger.info("OUTGOING: %s", _JSONMessage(response_log))
+
+        # Log to console with color coding
+        if status_code >= 500:
+            logger.error(f"❌ {method} {path} -> {status_code} ({process_time:.3f}s)")
+        elif status_code >= 400:
+            logger.warning(f"⚠️  {method} {path} -> {status_code} ({process_time:.3f}s)")
+        else:
+            logger.info(f"✅ {method} {path} -> {status_code} ({process_time:.3f}s)")
+
+        if status_code >= 400:
+            security_logger.warning(
+                f"Error response - IP: {client_ip}, Method: {method}, "
+                f"Path: {path}, Status: {status_code}"
+            )
+
+    def _check_suspicious(self, client_ip: str, method: str, path: str, user_agent: str):
+        """Flag requests whose path or user agent contains a suspicious pattern"""
+        path_lower = path.lower()
+        user_agent_lower = user_agent.lower()
+        if any(pattern in path_lower or pattern in user_agent_lower for pattern in SUSPICIOUS_PATTERNS):
+            security_logger.warning(
+                f"Suspicious request detected - IP: {client_ip}, "
+                f"Method: {method}, Path: {path}, User-Agent: {user_agent}"
+            )
+
+    def _log_request(self, scope: Scope, headers: Dict[str, str], client_ip: str, body_chunks: List[bytes], body_state: dict):
+        """Queue the INCOMING entry for a request"""
+        body = None
+        truncated = False
+        if body_chunks:
+            body_bytes = b"".join(body_chunks)
+            truncated = body_state["size"] > len(body_bytes) or not body_state["complete"]
+            try:
+                if truncated:
+                    raise ValueError("partial body")
+                body = json.loads(body_bytes.decode('utf-8'))
+            except (ValueError, UnicodeDecodeError):
+                # Invalid or partly read JSON is logged as the text prefix
+                body = body_bytes.decode('utf-8', errors='ignore')
+
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        server = scope.get("server")
+        host = headers.get("host") or (f"{server[0]}:{server[1]}" if server else "")
+        url = f"{scope.get('scheme', 'http')}://{host}{scope['path']}" + (f"?{query_string}" if query_string else "")
+
+        request_log = {
+            "type": "REQUEST",
+            "timestamp": time.time(),
+            "method": scope["method"],
+            "url": url,
+            "path": scope["path"],
+            "query_params": dict(parse_qsl(query_string)),
+            "headers": {k: v for k, v in headers.items() if k.lower() not in ['authorization', 'cookie']},
+            "client_ip": client_ip,
+            "body": body,
+            "body_truncated": truncated
+        }
+        self.api_logger.info("INCOMING: %s", _JSONMessage(request_log))
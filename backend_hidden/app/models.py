@@ -75,6 +75,10 @@ class LanguageTask(Base):
     audio_duration = Column(Integer)  # Duration in seconds
     word_count = Column(Integer)
     
+    # Worker lease (set while a worker process owns the task)
+    claimed_by = Column(String, index=True)  # Worker ID holding the lease
+    lease_expires_at = Column(DateTime(timezone=True), index=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -5,7 +5,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import uuid
 import logging
-from app.services.supabase_db_service import SupabaseDBService
+from app.services.supabase_db_service import AsyncSupabaseDBService
 from app.auth import SupabaseStorageService
 from app.schemas import (
     AccountDeletionRequest,
@@ -21,7 +21,7 @@ class AccountDeletionService:
     """Service for handling GDPR-compliant account deletion"""
 
     def __init__(self):
-        self.db_service = SupabaseDBService()
+        self.db_service = AsyncSupabaseDBService()
         self.storage_service = SupabaseStorageService()
 
     async def initiate_deletion(
@@ -42,7 +42,7 @@ class AccountDeletionService:
                 raise ValueError("Confirmation text must be 'DELETE MY ACCOUNT'")
 
             # Count all user data
-            data_counts = self.db_service.count_user_data(user_id)
+            data_counts = await self.db_service.count_user_data(user_id)
 
             # Estimate storage files (this is an approximation)
             storage_file_count = self._estimate_storage_files(user_id, data_counts)
@@ -64,10 +64,10 @@ class AccountDeletionService:
                 'expires_at': expires_at.isoformat()
             }
 
-            self.db_service.create_deletion_token(token_data)
+            await self.db_service.create_deletion_token(token_data)
 
             # Clean up expired tokens
-            self.db_service.cleanup_expired_deletion_tokens()
+            await self.db_service.cleanup_expired_deletion_tokens()
 
             return AccountDeletionInitiationResponse(
                 deletionToken=deletion_token,
@@ -95,7 +95,7 @@ class AccountDeletionService:
                 raise ValueError("Final confirmation must be true")
 
             # Retrieve and validate deletion token
-            token_data = self.db_service.get_deletion_token(confirmation_request.deletionToken)
+            token_data = await self.db_service.get_deletion_token(confirmation_request.deletionToken)
 
             if not token_data:
                 raise ValueError("Invalid or expired deletion token")
@@ -114,14 +114,18 @@ class AccountDeletionService:
             deletion_completed_at = datetime.utcnow()
 
             # Count data before deletion
-            data_counts = self.db_service.count_user_data(user_id)
+            data_counts = await self.db_service.count_user_data(user_id)
 
             # Delete all user files from storage
             storage_deleted_count = await self._delete_user_storage_files(user_id)
             data_counts['storageFiles'] = storage_deleted_count
 
             # Delete all database records
-            deleted_data = self.db_service.delete_user_data(user_id)
+            deleted_data = await self.db_service.delete_user_data(user_id)
+
+            # Don't keep serving the deleted user from the auth cache
+            from app.auth import invalidate_cached_user
+            invalidate_cached_user(user_id)
             deleted_data['storageFiles'] = storage_deleted_count
             deleted_data['auditLogCreated'] = False
 
@@ -140,12 +144,12 @@ class AccountDeletionService:
                 'user_agent': token_data.get('user_agent')
             }
 
-            audit_log = self.db_service.create_deletion_audit_log(audit_log_data)
+            audit_log = await self.db_service.create_deletion_audit_log(audit_log_data)
             if audit_log:
                 deleted_data['auditLogCreated'] = True
 
             # Delete the deletion token
-            self.db_service.delete_deletion_token(confirmation_request.deletionToken)
+            await self.db_service.delete_deletion_token(confirmation_request.deletionToken)
 
             # Also try to delete user from Supabase Auth
             try:
@@ -185,7 +189,7 @@ class AccountDeletionService:
             # We need to use the REST API directly or delete based on known paths
 
             # Get all user jobs to find file paths
-            jobs = self.db_service.get_user_jobs(user_id, limit=1000)
+            jobs = await self.db_service.get_user_jobs(user_id, limit=1000)
 
             file_paths = []
             for job in jobs:
@@ -196,7 +200,7 @@ class AccountDeletionService:
                     file_paths.append(self._extract_file_path(job['background_track_url']))
 
                 # Get language tasks for this job
-                tasks = self.db_service.get_language_tasks_by_job_id(job['id'])
+                tasks = await self.db_service.get_language_tasks_by_job_id(job['id'])
                 for task in tasks:
                     if task.get('transcript_url'):
                         file_paths.append(self._extract_file_path(task['transcript_url']))
@@ -2,69 +2,386 @@
 AI service for integrating with external AI providers
 """
 import asyncio
+import io
 import logging
-from typing import Dict, List, Optional, Tuple
+import random
+import shutil
+import threading
+import uuid
+from typing import Awaitable, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Type, TypeVar
 from app.config import settings
+from app.services.clients import get_client_registry
+from app.utils.audio_chunker import AudioChunker
+from app.utils.audio_concat import concat_audio
+from app.utils.media import STT_INGEST_PROFILES, STT_SAMPLE_RATE, MediaProcessor
+from app.utils.media_cache import MediaCache, get_media_cache
+from app.utils.media_exec import run_media_command
+from app.utils.rate_budget import RateBudget
 import openai
-from deepgram import DeepgramClient
 import tempfile
 import os
 
 logger = logging.getLogger(__name__)
 
+# Bytes per read when streaming TTS responses
+TTS_CHUNK_SIZE = 64 * 1024
+
+# Bytes per read when streaming audio to Deepgram
+STT_CHUNK_SIZE = 64 * 1024
+
+# Words from adjacent chunks closer than this (in seconds) can be duplicates of each other
+WORD_OVERLAP_TOLERANCE = 0.05
+
+# OpenAI errors worth retrying; anything else (bad request, auth) fails immediately
+RETRYABLE_OPENAI_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+# Map language codes to language names for better translation
+LANGUAGE_NAMES = {
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "ja": "Japanese",
+    "zh": "Chinese",
+    "ko": "Korean",
+    "pt": "Portuguese",
+    "it": "Italian",
+    "ru": "Russian",
+    "ar": "Arabic",
+    "hi": "Hindi"
+}
+
+# Process-wide OpenAI request budget shared by every AIService instance
+_openai_budget = RateBudget(settings.openai_requests_per_minute)
+
+T = TypeVar("T")
+
+
+async def _retry_with_backoff(
+    call: Callable[[], Awaitable[T]],
+    retries: int,
+    description: str,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+) -> T:
+    """
+    Await call(), retrying retry_on errors with jittered exponential backoff
+    
+    Args:
+        call: Starts a fresh attempt each time it is called
+        retries: Retries after the first attempt
+        description: What is being retried, for log messages
+        retry_on: Exception types worth retrying; anything else is raised at once
+    
+    Returns:
+        The result of the first successful attempt
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except retry_on as e:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            delay = min(2 ** attempt, 30) * random.uniform(0.5, 1.0)
+            logger.warning(f"{description} failed ({e}); retrying in {delay:.1f}s (attempt {attempt}/{retries})")
+            await asyncio.sleep(delay)
+
+
+async def _gather_chunks_with_retry(
+    calls: List[Callable[[], Awaitable[T]]],
+    concurrency: int,
+    retries: int,
+    description: str,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+) -> List[T]:
+    """
+    Run per-chunk calls concurrently, retrying each chunk on its own
+    
+    At most concurrency chunks run at once. If a chunk still fails after its
+    retries, the other chunks are cancelled and awaited before the error is
+    raised. Calls that hand work to threads must not finish cancelling until
+    those threads stop (as _stream_speech does), so that nothing keeps
+    writing files in the background.
+    
+    Args:
+        calls: One call per chunk; each call starts a fresh attempt
+        concurrency: Chunks in flight at once
+        retries: Retries per chunk after its first attempt
+        description: Chunk kind, for log messages (e.g. "Speech chunk")
+        retry_on: Exception types worth retrying
+    
+    Returns:
+        Chunk results in the order of calls
+    """
+    slots = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def run_chunk(i: int, call: Callable[[], Awaitable[T]]) -> T:
+        async with slots:
+            logger.info(f"{description} {i+1}/{len(calls)} started")
+            return await _retry_with_backoff(call, retries, f"{description} {i+1}", retry_on)
+    
+    tasks = [asyncio.create_task(run_chunk(i, call)) for i, call in enumerate(calls)]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # A chunk failed for good (or we were cancelled); stop the others
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
 
 class AIService:
     """Service for AI operations (STT, Translation, TTS)"""
 
     def __init__(self):
-        # Initialize OpenAI client with new API
-        from openai import AsyncOpenAI
-        self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
-
-        # Initialize Deepgram client
-        self.deepgram = DeepgramClient(api_key=settings.deepgram_api_key)
+        # Shared, pooled clients from the process-wide registry
+        clients = get_client_registry()
+        self.openai_client = clients.openai
+        self.deepgram = clients.deepgram
     
     async def transcribe_audio(
         self,
         audio_file_path: str,
-        language: str = "en"
+        language: str = "en",
+        chunked: Optional[bool] = None
     ) -> Dict[str, any]:
         """
         Transcribe audio using Deepgram v5
-        Returns dict with transcript, confidence, and duration
+        
+        Audio or video is first transcoded to the 16 kHz mono STT ingest
+        profile (settings.stt_ingest_codec), cached per source checksum.
+        Audio still larger than settings.stt_chunk_threshold_mb is
+        transcribed in concurrent chunks (see transcribe_audio_chunked)
+        unless `chunked` says otherwise.
+        
+        Returns dict with transcript, confidence, duration and word timings
         """
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                buffer_data = audio_file.read()
-
-            # Deepgram v5 API with simplified parameters to avoid Pydantic issues
-            response = self.deepgram.listen.v1.media.transcribe_file(
-                request=buffer_data,
-                model="nova-2",
-                language=language,
-                smart_format=True,
-                punctuate=True
+            ingest_path = await self._prepare_stt_audio(audio_file_path)
+        except Exception as e:
+            logger.error(f"Error preparing audio for transcription: {e}")
+            raise Exception("Failed to transcribe audio")
+        
+        source_path = ingest_path or audio_file_path
+        try:
+            if chunked is None:
+                threshold = settings.stt_chunk_threshold_mb * 1024 * 1024
+                chunked = threshold > 0 and os.path.getsize(source_path) > threshold
+            if chunked:
+                return await self.transcribe_audio_chunked(source_path, language)
+            
+            result = await asyncio.to_thread(self._transcribe_file, source_path, language)
+            logger.info(f"Transcribed audio: {len(result['transcript'])} characters, confidence: {result['confidence']:.2f}")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error transcribing audio: {e}")
+            raise Exception("Failed to transcribe audio")
+        finally:
+            if ingest_path and os.path.exists(ingest_path):
+                os.remove(ingest_path)
+    
+    async def _prepare_stt_audio(self, audio_file_path: str) -> Optional[str]:
+        """
+        Transcode a file to the STT ingest profile, reusing the cached result for the same content
+        
+        Returns:
+            Path of a temporary file the caller removes, or None when
+            settings.stt_ingest_codec is empty
+        """
+        codec = settings.stt_ingest_codec
+        if not codec:
+            return None
+        if codec not in STT_INGEST_PROFILES:
+            raise ValueError(f"Unknown STT ingest codec: {codec}")
+        
+        extension = STT_INGEST_PROFILES[codec][0]
+        temp_file = tempfile.NamedTemporaryFile(suffix=extension, delete=False)
+        temp_file.close()
+        
+        try:
+            cache = get_media_cache()
+            if cache is None:
+                await MediaProcessor.transcode_for_stt(audio_file_path, temp_file.name, codec)
+                return temp_file.name
+            
+            checksum = await asyncio.to_thread(MediaProcessor.calculate_checksum, audio_file_path)
+            cache_key = MediaCache.make_key(checksum, "sha256", variant=f"stt-{codec}-{STT_SAMPLE_RATE}-1ch")
+            await cache.fetch(
+                cache_key,
+                temp_file.name,
+                lambda target_path: MediaProcessor.transcode_for_stt(audio_file_path, target_path, codec),
+                suffix=extension
             )
+            return temp_file.name
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+    
+    def _transcribe_file(self, audio_file_path: str, language: str) -> Dict[str, any]:
+        """Send one file to Deepgram, streaming it from disk, and return its transcript and words"""
+        def read_blocks() -> Iterator[bytes]:
+            with open(audio_file_path, "rb") as audio_file:
+                while block := audio_file.read(STT_CHUNK_SIZE):
+                    yield block
 
-            # Extract transcript and metadata
-            channel = response.results.channels[0]
-            alternative = channel.alternatives[0]
-            transcript = alternative.transcript
-            confidence = alternative.confidence if hasattr(alternative, 'confidence') else 0.0
-            duration = response.results.metadata.duration if hasattr(response.results, 'metadata') else 0.0
+        # Deepgram v5 API with simplified parameters to avoid Pydantic issues
+        response = self.deepgram.listen.v1.media.transcribe_file(
+            request=read_blocks(),
+            model="nova-2",
+            language=language,
+            smart_format=True,
+            punctuate=True
+        )
 
-            logger.info(f"Transcribed audio: {len(transcript)} characters, confidence: {confidence:.2f}")
+        # Extract transcript and metadata
+        channel = response.results.channels[0]
+        alternative = channel.alternatives[0]
+        transcript = alternative.transcript
+        confidence = alternative.confidence if hasattr(alternative, 'confidence') else 0.0
+        duration = response.results.metadata.duration if hasattr(response.results, 'metadata') else 0.0
+        words = [
+            {
+                "word": word.word,
+                "punctuated_word": getattr(word, "punctuated_word", None) or word.word,
+                "start": word.start or 0.0,
+                "end": word.end or 0.0,
+                "confidence": word.confidence or 0.0
+            }
+            for word in (alternative.words or [])
+        ]
 
+        return {
+            "transcript": transcript,
+            "confidence": confidence,
+            "duration": duration,
+            "words": words
+        }
+    
+    async def transcribe_audio_chunked(
+        self,
+        audio_file_path: str,
+        language: str = "en",
+        chunk_duration: int = None
+    ) -> Dict[str, any]:
+        """
+        Transcribe long audio as concurrent chunks and merge the results
+        
+        The file is split by AudioChunker at pauses near every chunk_duration
+        seconds into 16 kHz mono chunks, each encoded to the STT ingest
+        profile. Up to settings.stt_concurrency chunks are transcribed at
+        once, and failed chunks are retried on their own. Word timestamps are
+        shifted by each chunk's start time, and words reported on both sides
+        of a cut are kept only once.
+        
+        Args:
+            audio_file_path: Audio file to transcribe
+            language: Source language code
+            chunk_duration: Target chunk length in seconds (default: settings.stt_chunk_seconds)
+        
+        Returns:
+            Dict with transcript, confidence, duration and words (start/end in seconds from the start of the file)
+        """
+        try:
+            chunker = AudioChunker(
+                chunk_duration or settings.stt_chunk_seconds,
+                sample_rate=STT_SAMPLE_RATE,
+                channels=1
+            )
+            chunk_job_id = f"stt_{uuid.uuid4().hex[:12]}"
+            chunks = await chunker.chunk_audio(audio_file_path, chunk_job_id)
+            
+            try:
+                results = await _gather_chunks_with_retry(
+                    [lambda chunk=chunk: self._transcribe_chunk(chunk["file_path"], language) for chunk in chunks],
+                    settings.stt_concurrency,
+                    settings.stt_retries,
+                    "Transcription chunk"
+                )
+            finally:
+                chunker.cleanup_chunks(chunk_job_id)
+            
+            words = self._merge_chunk_words(
+                [(chunk["start_time"], result["words"]) for chunk, result in zip(chunks, results)]
+            )
+            duration = chunks[-1]["end_time"] if chunks else 0.0
+            # Chunk confidences weighted by chunk length
+            total_duration = sum(chunk["duration"] for chunk in chunks)
+            confidence = (
+                sum(result["confidence"] * chunk["duration"] for chunk, result in zip(chunks, results)) / total_duration
+                if total_duration > 0 else 0.0
+            )
+            transcript = " ".join(word["punctuated_word"] for word in words)
+            
+            logger.info(f"Transcribed {len(chunks)} chunks: {len(transcript)} characters, {len(words)} words, confidence: {confidence:.2f}")
+            
             return {
                 "transcript": transcript,
                 "confidence": confidence,
-                "duration": duration
+                "duration": duration,
+                "words": words
             }
-
+            
         except Exception as e:
-            logger.error(f"Error transcribing audio: {e}")
+            logger.error(f"Error transcribing audio in chunks: {e}")
             raise Exception("Failed to transcribe audio")
     
+    async def _transcribe_chunk(self, chunk_path: str, language: str) -> Dict[str, any]:
+        """Encode one chunk to the STT ingest profile and transcribe it"""
+        upload_path = chunk_path
+        codec = settings.stt_ingest_codec
+        if codec:
+            upload_path = os.path.splitext(chunk_path)[0] + STT_INGEST_PROFILES[codec][0]
+            await MediaProcessor.transcode_for_stt(chunk_path, upload_path, codec)
+        
+        try:
+            return await asyncio.to_thread(self._transcribe_file, upload_path, language)
+        finally:
+            if upload_path != chunk_path and os.path.exists(upload_path):
+                os.remove(upload_path)
+    
+    def _merge_chunk_words(self, chunk_words: List[Tuple[float, List[Dict]]]) -> List[Dict]:
+        """
+        Shift each chunk's words to file time and drop duplicates across cuts
+        
+        A word from an earlier chunk with the same text that overlaps or
+        touches it is the same word heard on both sides of a cut; the
+        higher-confidence copy is kept.
+        
+        Args:
+            chunk_words: (chunk start time, chunk words) for each chunk, in order
+        """
+        def normalize(word: Dict) -> str:
+            return "".join(c for c in word["word"].lower() if c.isalnum())
+        
+        merged = []
+        for offset, words in chunk_words:
+            # Only words from earlier chunks can be duplicates of this chunk's words
+            earlier = len(merged)
+            for word in words:
+                shifted = {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                
+                duplicate = None
+                i = earlier - 1
+                while i >= 0 and merged[i]["end"] + WORD_OVERLAP_TOLERANCE >= shifted["start"]:
+                    if normalize(merged[i]) == normalize(shifted):
+                        duplicate = i
+                        break
+                    i -= 1
+                
+                if duplicate is None:
+                    merged.append(shifted)
+                elif shifted["confidence"] > merged[duplicate]["confidence"]:
+                    merged[duplicate] = shifted
+        
+        return merged
+    
     async def translate_text(
         self,
         text: str,
@@ -73,48 +390,74 @@ class AIService:
     ) -> str:
         """
         Translate text using OpenAI
+
+        Requests wait for the shared OpenAI rate budget, and rate-limit,
+        timeout, connection and server errors are retried with backoff.
         """
+        target_lang_name = LANGUAGE_NAMES.get(target_language, target_language)
+        source_lang_name = LANGUAGE_NAMES.get(source_language, source_language)
+
         try:
-            # Map language codes to language names for better translation
-            language_names = {
-                "es": "Spanish",
-                "fr": "French", 
-                "de": "German",
-                "ja": "Japanese",
-                "zh": "Chinese",
-                "ko": "Korean",
-                "pt": "Portuguese",
-                "it": "Italian",
-                "ru": "Russian",
-                "ar": "Arabic",
-                "hi": "Hindi"
-            }
-            
-            target_lang_name = language_names.get(target_language, target_language)
-            source_lang_name = language_names.get(source_language, source_language)
-
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",  # Using latest efficient model
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a professional translator. Translate the following text from {source_lang_name} to {target_lang_name}. Maintain the original tone, style, and meaning. Return only the translated text."
-                    },
-                    {
-                        "role": "user",
-                        "content": text
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.3
+            return await _retry_with_backoff(
+                lambda: self._request_translation(text, source_lang_name, target_lang_name),
+                settings.translation_retries,
+                "Translation request",
+                RETRYABLE_OPENAI_ERRORS
             )
-
-            return response.choices[0].message.content.strip()
-            
         except Exception as e:
             logger.error(f"Error translating text: {e}")
             raise Exception("Failed to translate text")
     
+    async def _request_translation(self, text: str, source_lang_name: str, target_lang_name: str) -> str:
+        """Make one translation request against the shared OpenAI rate budget"""
+        await _openai_budget.acquire()
+        response = await self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",  # Using latest efficient model
+            messages=[
+                {
+                    "role": "system",
+                    "content": f"You are a professional translator. Translate the following text from {source_lang_name} to {target_lang_name}. Maintain the original tone, style, and meaning. Return only the translated text."
+                },
+                {
+                    "role": "user",
+                    "content": text
+                }
+            ],
+            max_tokens=2000,
+            temperature=0.3
+        )
+        return response.choices[0].message.content.strip()
+    
+    def _split_text_for_translation(self, text: str, max_chunk_length: int) -> List[str]:
+        """Split text into chunks of about max_chunk_length characters at sentence boundaries"""
+        # Split text into sentences for better chunking
+        sentences = text.split('. ')
+        chunks = []
+        current_chunk = ""
+        
+        for sentence in sentences:
+            # Add period back if it's not the last sentence
+            if not sentence.endswith('.') and sentence != sentences[-1]:
+                sentence += '.'
+            
+            # Check if adding this sentence would exceed the limit
+            if len(current_chunk) + len(sentence) + 1 <= max_chunk_length:
+                if current_chunk:
+                    current_chunk += " " + sentence
+                else:
+                    current_chunk = sentence
+            else:
+                # Current chunk is full, save it and start a new one
+                if current_chunk:
+                    chunks.append(current_chunk)
+                current_chunk = sentence
+        
+        # Add the last chunk if it has content
+        if current_chunk:
+            chunks.append(current_chunk)
+        
+        return chunks
+    
     async def translate_text_chunked(
         self,
         text: str,
@@ -123,13 +466,17 @@ class AIService:
         max_chunk_length: int = 1000
     ) -> str:
         """
-        Translate long text by breaking it into chunks and translating each chunk
+        Translate long text by breaking it into chunks and translating the chunks concurrently
+        
+        Up to settings.translation_concurrency chunks are in flight at once,
+        each retried on its own; the translations are joined back in their
+        original order.
         
         Args:
             text: Text to translate
             target_language: Target language code
             source_language: Source language code
-            max_chunk_length: Maximum characters per chunk (default: 1500 to stay under 2000 limit)
+            max_chunk_length: Maximum characters per chunk (default: 1000 to stay under the 2000 token limit)
         
         Returns:
             Translated text
@@ -141,40 +488,19 @@ class AIService:
             
             logger.info(f"Translating long text ({len(text)} chars) in chunks of {max_chunk_length}")
             
-            # Split text into sentences for better chunking
-            sentences = text.split('. ')
-            chunks = []
-            current_chunk = ""
-            
-            for sentence in sentences:
-                # Add period back if it's not the last sentence
-                if not sentence.endswith('.') and sentence != sentences[-1]:
-                    sentence += '.'
-                
-                # Check if adding this sentence would exceed the limit
-                if len(current_chunk) + len(sentence) + 1 <= max_chunk_length:
-                    if current_chunk:
-                        current_chunk += " " + sentence
-                    else:
-                        current_chunk = sentence
-                else:
-                    # Current chunk is full, save it and start a new one
-                    if current_chunk:
-                        chunks.append(current_chunk)
-                    current_chunk = sentence
-            
-            # Add the last chunk if it has content
-            if current_chunk:
-                chunks.append(current_chunk)
-            
+            chunks = self._split_text_for_translation(text, max_chunk_length)
             logger.info(f"Split text into {len(chunks)} chunks")
             
-            # Translate each chunk
-            translated_chunks = []
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Translating chunk {i+1}/{len(chunks)} ({len(chunk)} chars)")
-                translated_chunk = await self.translate_text(chunk, target_language, source_language)
-                translated_chunks.append(translated_chunk)
+            # Translate chunks concurrently; results come back in chunk order
+            target_lang_name = LANGUAGE_NAMES.get(target_language, target_language)
+            source_lang_name = LANGUAGE_NAMES.get(source_language, source_language)
+            translated_chunks = await _gather_chunks_with_retry(
+                [lambda chunk=chunk: self._request_translation(chunk, source_lang_name, target_lang_name) for chunk in chunks],
+                settings.translation_concurrency,
+                settings.translation_retries,
+                "Translation chunk",
+                RETRYABLE_OPENAI_ERRORS
+            )
             
             # Combine translated chunks
             translated_text = " ".join(translated_chunks)
@@ -186,13 +512,14 @@ class AIService:
             logger.error(f"Error translating chunked text: {e}")
             raise Exception("Failed to translate chunked text")
     
-    async def _generate_speech_openai(
+    async def _stream_speech_openai(
         self,
         text: str,
-        language: str
-    ) -> bytes:
+        language: str,
+        output: BinaryIO
+    ):
         """
-        Generate speech using OpenAI TTS (better quality for Chinese)
+        Generate speech using OpenAI TTS (better quality for Chinese), writing audio to `output` as it arrives
         """
         try:
             # Map language codes to OpenAI voice models
@@ -203,242 +530,296 @@ class AIService:
             
             logger.info(f"Using OpenAI TTS for Chinese: {language}, voice: {voice_name}")
             
-            # OpenAI TTS API
-            response = await self.openai_client.audio.speech.create(
+            # OpenAI TTS API, streamed instead of buffered in the response
+            await _openai_budget.acquire()
+            async with self.openai_client.audio.speech.with_streaming_response.create(
                 model="tts-1",  # Use tts-1 for faster generation, or tts-1-hd for higher quality
                 voice=voice_name,
                 input=text,
                 response_format="mp3"
-            )
-            
-            # Get audio data - OpenAI returns content directly
-            audio_data = response.content
-            
-            # Save to downloads directory
-            import os
-            from datetime import datetime
-            
-            downloads_path = "downloads"
-            os.makedirs(downloads_path, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ytdubber_{language}_{timestamp}.mp3"
-            file_path = os.path.join(downloads_path, filename)
-            
-            try:
-                with open(file_path, 'wb') as f:
-                    f.write(audio_data)
-                logger.info(f"?? Generated Chinese audio saved to downloads: {filename}")
-            except Exception as e:
-                logger.warning(f"Could not save to downloads: {e}")
-            
-            return audio_data
+            ) as response:
+                async for chunk in response.iter_bytes(TTS_CHUNK_SIZE):
+                    # File writes stay off the event loop
+                    await asyncio.to_thread(output.write, chunk)
             
         except Exception as e:
             logger.error(f"Error generating speech with OpenAI TTS: {e}", exc_info=True)
             raise Exception(f"Failed to generate speech with OpenAI: {str(e)}")
     
-    async def generate_speech(
+    async def _stream_speech(
         self,
         text: str,
         language: str,
+        output: BinaryIO,
         voice: str = None
-    ) -> bytes:
+    ):
         """
         Generate speech using Deepgram TTS or OpenAI TTS (for better Chinese quality)
+
+        Audio chunks are written to `output` as they arrive, so nothing is
+        concatenated in memory. If the call is cancelled, it returns only once
+        nothing writes to `output` any more, so the caller may close it.
         """
-        try:
-            # Use OpenAI TTS for Chinese - much better quality than Deepgram
-            if language in ["zh", "zh-CN", "zh-TW"]:
-                return await self._generate_speech_openai(text, language)
-            
-            # Map language codes to Deepgram voices (using available Aura models)
-            voice_mapping = {
-                "en": "aura-asteria-en",      # English - Asteria (female, conversational)
-                "es": "aura-2-sirio-es",      # Spanish - Sirio (male, professional) - confirmed working
-                "fr": "aura-asteria-en",      # French - fallback to English (no French model available)
-                "de": "aura-asteria-en",      # German - fallback to English (no German model available)
-                "ja": "aura-asteria-en",      # Japanese - fallback to English (no Japanese model available)
-                "ko": "aura-asteria-en",      # Korean - fallback to English (no Korean model available)
-                "pt": "aura-asteria-en",      # Portuguese - fallback to English (no Portuguese model available)
-                "it": "aura-asteria-en",      # Italian - fallback to English (no Italian model available)
-                "ru": "aura-asteria-en",      # Russian - fallback to English (no Russian model available)
-                "ar": "aura-asteria-en",      # Arabic - fallback to English (no Arabic model available)
-                "hi": "aura-asteria-en"       # Hindi - fallback to English (no Hindi model available)
-            }
+        # Use OpenAI TTS for Chinese - much better quality than Deepgram
+        if language in ["zh", "zh-CN", "zh-TW"]:
+            await self._stream_speech_openai(text, language, output)
+            return
+        
+        # Map language codes to Deepgram voices (using available Aura models)
+        voice_mapping = {
+            "en": "aura-asteria-en",      # English - Asteria (female, conversational)
+            "es": "aura-2-sirio-es",      # Spanish - Sirio (male, professional) - confirmed working
+            "fr": "aura-asteria-en",      # French - fallback to English (no French model available)
+            "de": "aura-asteria-en",      # German - fallback to English (no German model available)
+            "ja": "aura-asteria-en",      # Japanese - fallback to English (no Japanese model available)
+            "ko": "aura-asteria-en",      # Korean - fallback to English (no Korean model available)
+            "pt": "aura-asteria-en",      # Portuguese - fallback to English (no Portuguese model available)
+            "it": "aura-asteria-en",      # Italian - fallback to English (no Italian model available)
+            "ru": "aura-asteria-en",      # Russian - fallback to English (no Russian model available)
+            "ar": "aura-asteria-en",      # Arabic - fallback to English (no Arabic model available)
+            "hi": "aura-asteria-en"       # Hindi - fallback to English (no Hindi model available)
+        }
+
+        selected_voice = voice or voice_mapping.get(language, "aura-asteria-en")
 
-            selected_voice = voice or voice_mapping.get(language, "aura-asteria-en")
+        stop = threading.Event()
 
-            # Generate speech using Deepgram TTS
+        def write_deepgram_speech():
+            # The Deepgram client is synchronous; stream its chunks from a worker thread
             response = self.deepgram.speak.v1.audio.generate(
                 text=text,
                 model=selected_voice,
                 encoding="mp3"
             )
-
-            # Collect all audio data from the iterator
-            audio_data = b""
             for chunk in response:
-                audio_data += chunk
+                if stop.is_set():
+                    return
+                output.write(chunk)
+
+        writer = asyncio.ensure_future(asyncio.to_thread(write_deepgram_speech))
+        try:
+            await asyncio.shield(writer)
+        except asyncio.CancelledError:
+            # Cancelling doesn't stop the thread; ask it to stop and wait so it
+            # never writes to `output` after the caller has closed it
+            stop.set()
+            await asyncio.gather(writer, return_exceptions=True)
+            raise
+    
+    async def generate_speech_to_file(
+        self,
+        text: str,
+        language: str,
+        output_path: str,
+        voice: str = None
+    ) -> int:
+        """
+        Generate speech straight into a file
 
-            # Save to downloads directory for frontend access
-            import os
-            from datetime import datetime
+        Args:
+            text: Text to convert to speech
+            language: Target language code
+            output_path: File to write the MP3 audio to
+            voice: Voice to use (optional)
+
+        Returns:
+            int: Size of the generated audio in bytes
+        """
+        try:
+            with open(output_path, 'wb') as f:
+                await self._stream_speech(text, language, f, voice)
             
-            downloads_path = "downloads"
-            os.makedirs(downloads_path, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ytdubber_{language}_{timestamp}.mp3"
-            file_path = os.path.join(downloads_path, filename)
+            await self._save_artifact(output_path, language)
+            return os.path.getsize(output_path)
+
+        except Exception as e:
+            logger.error(f"Error generating speech: {e}", exc_info=True)
+            raise Exception(f"Failed to generate speech: {str(e)}")
+    
+    async def generate_speech(
+        self,
+        text: str,
+        language: str,
+        voice: str = None
+    ) -> bytes:
+        """
+        Generate speech and return the audio bytes
+
+        Prefer generate_speech_to_file for long texts; this keeps the whole
+        output in memory.
+        """
+        try:
+            buffer = io.BytesIO()
+            await self._stream_speech(text, language, buffer, voice)
+            audio_data = buffer.getvalue()
             
-            try:
-                with open(file_path, 'wb') as f:
-                    f.write(audio_data)
-                logger.info(f"?? Generated audio saved to downloads: {filename}")
-            except Exception as e:
-                logger.warning(f"Could not save to downloads: {e}")
-                
+            if settings.tts_artifact_dir:
+                await self._write_artifact(audio_data, language)
             return audio_data
 
         except Exception as e:
             logger.error(f"Error generating speech: {e}", exc_info=True)
             raise Exception(f"Failed to generate speech: {str(e)}")
     
+    def _artifact_path(self, language: str) -> Optional[str]:
+        """Path for a copy of a TTS output in the artifact directory, or None when disabled"""
+        if not settings.tts_artifact_dir:
+            return None
+        
+        from datetime import datetime
+        
+        os.makedirs(settings.tts_artifact_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"ytdubber_{language}_{timestamp}.mp3"
+        return os.path.join(settings.tts_artifact_dir, filename)
+    
+    async def _save_artifact(self, audio_path: str, language: str):
+        """Copy a generated audio file into the artifact directory (opt-in via tts_artifact_dir)"""
+        try:
+            artifact_path = self._artifact_path(language)
+            if artifact_path:
+                await asyncio.to_thread(shutil.copyfile, audio_path, artifact_path)
+                logger.info(f"Generated audio saved to artifacts: {artifact_path}")
+        except Exception as e:
+            logger.warning(f"Could not save TTS artifact: {e}")
+    
+    async def _write_artifact(self, audio_data: bytes, language: str):
+        def write(path: str):
+            with open(path, 'wb') as f:
+                f.write(audio_data)
+
+        try:
+            artifact_path = self._artifact_path(language)
+            if artifact_path:
+                await asyncio.to_thread(write, artifact_path)
+                logger.info(f"Generated audio saved to artifacts: {artifact_path}")
+        except Exception as e:
+            logger.warning(f"Could not save TTS artifact: {e}")
+    
+    def _split_text_for_speech(self, text: str, max_chunk_length: int) -> List[str]:
+        """Split text into chunks of at most max_chunk_length characters, preferring sentence boundaries"""
+        chunks = []
+        current_chunk = ""
+        
+        # Split by sentences first
+        sentences = text.split('. ')
+        
+        for sentence in sentences:
+            # Add period back if it's not the last sentence
+            if not sentence.endswith('.') and sentence != sentences[-1]:
+                sentence += '.'
+            
+            # If a single sentence is too long, split it by words
+            if len(sentence) > max_chunk_length:
+                words = sentence.split(' ')
+                for word in words:
+                    if len(current_chunk) + len(word) + 1 <= max_chunk_length:
+                        if current_chunk:
+                            current_chunk += " " + word
+                        else:
+                            current_chunk = word
+                    else:
+                        # Current chunk is full, save it and start a new one
+                        if current_chunk:
+                            chunks.append(current_chunk)
+                        current_chunk = word
+            else:
+                # Check if adding this sentence would exceed the limit
+                if len(current_chunk) + len(sentence) + 1 <= max_chunk_length:
+                    if current_chunk:
+                        current_chunk += " " + sentence
+                    else:
+                        current_chunk = sentence
+                else:
+                    # Current chunk is full, save it and start a new one
+                    if current_chunk:
+                        chunks.append(current_chunk)
+                    current_chunk = sentence
+        
+        # Add the last chunk if it has content
+        if current_chunk:
+            chunks.append(current_chunk)
+        
+        return chunks
+    
     async def generate_speech_chunked(
         self,
         text: str,
         language: str,
+        output_path: str,
         voice: str = None,
         max_chunk_length: int = 1000
-    ) -> bytes:
+    ) -> int:
         """
         Generate speech for long text by breaking it into chunks and combining audio
         
+        Up to settings.tts_concurrency chunks are synthesized at once, each
+        into its own indexed file; failed chunks are retried on their own.
+        
         Args:
             text: Text to convert to speech
             language: Target language code
+            output_path: File to write the combined MP3 audio to
             voice: Voice to use (optional)
-            max_chunk_length: Maximum characters per chunk (default: 1500)
+            max_chunk_length: Maximum characters per chunk (default: 1000)
         
         Returns:
-            Combined audio data as bytes
+            int: Size of the combined audio in bytes
         """
         try:
             if len(text) <= max_chunk_length:
                 # Text is short enough, generate speech directly
-                return await self.generate_speech(text, language, voice)
+                return await self.generate_speech_to_file(text, language, output_path, voice)
             
             logger.info(f"Generating speech for long text ({len(text)} chars) in chunks of {max_chunk_length}")
             
             # Split text into smaller chunks more aggressively
-            chunks = []
-            current_chunk = ""
-            
-            # Split by sentences first
-            sentences = text.split('. ')
-            
-            for sentence in sentences:
-                # Add period back if it's not the last sentence
-                if not sentence.endswith('.') and sentence != sentences[-1]:
-                    sentence += '.'
-                
-                # If a single sentence is too long, split it by words
-                if len(sentence) > max_chunk_length:
-                    words = sentence.split(' ')
-                    for word in words:
-                        if len(current_chunk) + len(word) + 1 <= max_chunk_length:
-                            if current_chunk:
-                                current_chunk += " " + word
-                            else:
-                                current_chunk = word
-                        else:
-                            # Current chunk is full, save it and start a new one
-                            if current_chunk:
-                                chunks.append(current_chunk)
-                            current_chunk = word
-                else:
-                    # Check if adding this sentence would exceed the limit
-                    if len(current_chunk) + len(sentence) + 1 <= max_chunk_length:
-                        if current_chunk:
-                            current_chunk += " " + sentence
-                        else:
-                            current_chunk = sentence
-                    else:
-                        # Current chunk is full, save it and start a new one
-                        if current_chunk:
-                            chunks.append(current_chunk)
-                        current_chunk = sentence
-            
-            # Add the last chunk if it has content
-            if current_chunk:
-                chunks.append(current_chunk)
-            
+            chunks = self._split_text_for_speech(text, max_chunk_length)
             logger.info(f"Split text into {len(chunks)} chunks for speech generation")
             
-            # Generate speech for each chunk
-            audio_chunks = []
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Generating speech for chunk {i+1}/{len(chunks)} ({len(chunk)} chars)")
-                chunk_audio = await self.generate_speech(chunk, language, voice)
-                audio_chunks.append(chunk_audio)
-            
-            # Combine audio chunks using FFmpeg
-            combined_audio = await self._combine_audio_chunks(audio_chunks)
-            logger.info(f"Speech generation complete: {len(combined_audio)} bytes")
+            temp_dir = tempfile.mkdtemp()
+            try:
+                # Generate speech for the chunks concurrently, each into its own indexed file
+                chunk_files = [os.path.join(temp_dir, f"chunk_{i:03d}.mp3") for i in range(len(chunks))]
+                await _gather_chunks_with_retry(
+                    [
+                        lambda i=i: self._synthesize_chunk(chunks[i], language, chunk_files[i], voice)
+                        for i in range(len(chunks))
+                    ],
+                    settings.tts_concurrency,
+                    settings.tts_retries,
+                    "Speech chunk"
+                )
+                
+                # All chunks exist in order; combine them using FFmpeg
+                await self._combine_audio_files(chunk_files, output_path)
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
             
-            return combined_audio
+            size = os.path.getsize(output_path)
+            logger.info(f"Speech generation complete: {size} bytes")
+            await self._save_artifact(output_path, language)
+            return size
             
         except Exception as e:
             logger.error(f"Error generating chunked speech: {e}")
             raise Exception(f"Failed to generate chunked speech: {str(e)}")
     
-    async def _combine_audio_chunks(self, audio_chunks: List[bytes]) -> bytes:
-        """Combine multiple audio chunks into a single audio file"""
+    async def _synthesize_chunk(
+        self,
+        text: str,
+        language: str,
+        output_path: str,
+        voice: str = None
+    ):
+        """Generate speech for one chunk into output_path, overwriting any earlier attempt"""
+        with open(output_path, 'wb') as f:
+            await self._stream_speech(text, language, f, voice)
+    
+    async def _combine_audio_files(self, chunk_files: List[str], output_path: str):
+        """Concatenate audio files into output_path, splicing MP3 frames when the chunks match"""
         try:
-            import tempfile
-            import subprocess
-            from pathlib import Path
-            
-            # Create temporary directory for audio files
-            temp_dir = Path(tempfile.mkdtemp())
-            
-            # Save each chunk to a temporary file
-            chunk_files = []
-            for i, chunk_audio in enumerate(audio_chunks):
-                chunk_file = temp_dir / f"chunk_{i:03d}.mp3"
-                with open(chunk_file, 'wb') as f:
-                    f.write(chunk_audio)
-                chunk_files.append(str(chunk_file))
-            
-            # Create file list for FFmpeg
-            file_list = temp_dir / "file_list.txt"
-            with open(file_list, 'w') as f:
-                for chunk_file in chunk_files:
-                    f.write(f"file '{chunk_file}'\n")
-            
-            # Use FFmpeg to concatenate audio files
-            output_file = temp_dir / "combined.mp3"
-            cmd = [
-                "ffmpeg",
-                "-f", "concat",
-                "-safe", "0",
-                "-i", str(file_list),
-                "-acodec", "mp3",
-                "-y",  # Overwrite output
-                str(output_file)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
-            
-            # Read the combined audio
-            with open(output_file, 'rb') as f:
-                combined_audio = f.read()
-            
-            # Clean up temporary files
-            import shutil
-            shutil.rmtree(temp_dir)
-            
-            return combined_audio
-            
+            await concat_audio(chunk_files, output_path, fallback_codec_args=["-acodec", "mp3"])
         except Exception as e:
             logger.error(f"Error combining audio chunks: {e}")
             raise Exception(f"Failed to combine audio chunks: {str(e)}")
@@ -582,7 +963,8 @@ class AIService:
             if not background_track_path:
                 # No background track, just copy voice track
                 if output_path:
-                    ffmpeg.input(voice_track_path).output(output_path).overwrite_output().run()
+                    output = ffmpeg.input(voice_track_path).output(output_path)
+                    await run_media_command(ffmpeg.compile(output, overwrite_output=True))
                     return output_path
                 return voice_track_path
             
@@ -598,10 +980,11 @@ class AIService:
             mixed = ffmpeg.filter([voice, background], 'amix', inputs=2, duration='shortest')
             output = ffmpeg.output(mixed, output_path, acodec='mp3', audio_bitrate='128k')
             
-            ffmpeg.run(output, overwrite_output=True)
+            # Build the command with ffmpeg-python but run it without blocking the event loop
+            await run_media_command(ffmpeg.compile(output, overwrite_output=True))
             
             return output_path
             
         except Exception as e:
             logger.error(f"Error mixing audio tracks: {e}")
-            raise Exception("Failed to mix audio tracks")
\ No newline at end of file
+            raise Exception("Failed to mix audio tracks")
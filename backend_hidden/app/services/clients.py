@@ -0,0 +1,153 @@
+"""
+Process-wide registry of pooled clients for external services
+
+Supabase, OpenAI, Deepgram, Redis and plain HTTP clients are created once per
+process and shared, so requests and worker tasks reuse keep-alive connections
+instead of opening new HTTP sessions. Connection pools are sized by
+settings.connection_pool_size. The API creates the registry on startup and
+the worker when it starts; both close it on shutdown.
+"""
+import logging
+from typing import Optional
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """Lazily created, shared clients for external services"""
+
+    def __init__(self, pool_size: Optional[int] = None):
+        self.pool_size = pool_size or settings.connection_pool_size
+        self._supabase = None
+        self._supabase_http: Optional[httpx.Client] = None
+        self._openai = None
+        self._deepgram = None
+        self._deepgram_http: Optional[httpx.Client] = None
+        self._redis = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size
+        )
+
+    @property
+    def supabase(self):
+        """Supabase client backed by a pooled HTTP client"""
+        if self._supabase is None:
+            from supabase import create_client
+            from supabase.lib.client_options import SyncClientOptions
+
+            # PostgREST and storage share this connection pool
+            self._supabase_http = httpx.Client(
+                limits=self._limits(),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                follow_redirects=True
+            )
+            self._supabase = create_client(
+                settings.supabase_url,
+                settings.supabase_service_key,
+                options=SyncClientOptions(httpx_client=self._supabase_http)
+            )
+        return self._supabase
+
+    @property
+    def openai(self):
+        """Async OpenAI client with a pooled HTTP client"""
+        if self._openai is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            self._openai = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=DefaultAsyncHttpxClient(limits=self._limits())
+            )
+        return self._openai
+
+    @property
+    def deepgram(self):
+        """Deepgram client with a pooled HTTP client"""
+        if self._deepgram is None:
+            from deepgram import DeepgramClient
+
+            self._deepgram_http = httpx.Client(limits=self._limits(), timeout=60.0)
+            self._deepgram = DeepgramClient(
+                api_key=settings.deepgram_api_key,
+                httpx_client=self._deepgram_http
+            )
+        return self._deepgram
+
+    @property
+    def redis(self):
+        """Async Redis client, or None when Redis is not configured"""
+        redis_url = settings.redis_url or settings.rate_limit_storage_url
+        if self._redis is None and redis_url:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(
+                redis_url,
+                max_connections=self.pool_size,
+                socket_connect_timeout=5
+            )
+        return self._redis
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Async HTTP client for streaming transfers such as storage downloads"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=self._limits(),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                follow_redirects=True
+            )
+        return self._http
+
+    async def close(self):
+        """Close every client that was created"""
+        try:
+            if self._supabase_http is not None:
+                self._supabase_http.close()
+            if self._openai is not None:
+                await self._openai.close()
+            if self._deepgram_http is not None:
+                self._deepgram_http.close()
+            if self._redis is not None:
+                await self._redis.close()
+            if self._http is not None:
+                await self._http.aclose()
+        except Exception as e:
+            logger.error(f"Error closing pooled clients: {e}")
+        finally:
+            self._supabase = None
+            self._supabase_http = None
+            self._openai = None
+            self._deepgram = None
+            self._deepgram_http = None
+            self._redis = None
+            self._http = None
+
+
+# Global registry instance
+_client_registry: Optional[ClientRegistry] = None
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get or create the global client registry"""
+    global _client_registry
+
+    if _client_registry is None:
+        _client_registry = ClientRegistry()
+        logger.info(f"Created client registry (pool size {_client_registry.pool_size})")
+
+    return _client_registry
+
+
+async def close_client_registry():
+    """Close the global client registry's connections"""
+    global _client_registry
+
+    if _client_registry is not None:
+        await _client_registry.close()
+        _client_registry = None
@@ -0,0 +1,251 @@
+"""
+Job notification channel used to wake workers as soon as a job is created
+
+Backends:
+    memory   - asyncio.Event, for a worker running inside the API process
+    redis    - Redis pub/sub (settings.redis_url, via the shared client registry)
+    postgres - Postgres LISTEN/NOTIFY (settings.database_url)
+
+Workers still rescan on a slow timer, so a lost notification only delays a job.
+While notifications can't reach other processes (the memory backend, or a
+Redis/Postgres listener that is down) the rescan uses the short
+worker_unnotified_poll_interval instead.
+"""
+import asyncio
+import logging
+import re
+from typing import Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobNotifier:
+    """In-process job notifier backed by an asyncio.Event"""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._event = asyncio.Event()
+
+    async def start(self):
+        """Start listening for notifications (no-op for the in-process backend)"""
+
+    @property
+    def listening(self) -> bool:
+        """Whether notifications sent by other processes reach this one"""
+        return False
+
+    async def notify(self, job_id: str):
+        """Signal that a job has work available"""
+        self._event.set()
+
+    def wake(self):
+        """Wake a waiting worker in this process (e.g. on shutdown)"""
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for a notification or until the fallback timeout elapses
+
+        Returns:
+            True if woken by a notification, False on timeout
+        """
+        await self.start()
+        if not self.listening:
+            timeout = min(timeout, settings.worker_unnotified_poll_interval)
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            # Notifications that arrive while the worker scans set the event again
+            self._event.clear()
+
+    async def close(self):
+        """Release any connections held by the notifier"""
+
+
+class RedisJobNotifier(JobNotifier):
+    """Job notifier using Redis pub/sub"""
+
+    def __init__(self, channel: str):
+        super().__init__(channel)
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def _get_client(self):
+        from app.services.clients import get_client_registry
+        return get_client_registry().redis
+
+    async def start(self):
+        if self._listener is not None and not self._listener.done():
+            return
+
+        try:
+            self._pubsub = self._get_client().pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(self.channel)
+            self._listener = asyncio.create_task(self._listen())
+            logger.info(f"Listening for job notifications on Redis channel '{self.channel}'")
+        except Exception as e:
+            logger.warning(f"Redis job notifications unavailable ({e}); falling back to polling")
+            self._pubsub = None
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and not self._listener.done()
+
+    async def _listen(self):
+        try:
+            async for message in self._pubsub.listen():
+                if message.get('type') == 'message':
+                    self._event.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Redis job notification listener stopped: {e}")
+            # Trigger a rescan; the next wait() resubscribes
+            self._event.set()
+
+    async def notify(self, job_id: str):
+        self._event.set()
+        try:
+            await self._get_client().publish(self.channel, job_id)
+        except Exception as e:
+            logger.warning(f"Failed to publish job notification for {job_id}: {e}")
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub:
+            await self._pubsub.close()
+        # The Redis client itself belongs to the client registry
+
+
+class PostgresJobNotifier(JobNotifier):
+    """Job notifier using Postgres LISTEN/NOTIFY"""
+
+    def __init__(self, channel: str, dsn: str):
+        super().__init__(channel)
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", channel):
+            raise ValueError(f"Invalid notification channel name: {channel}")
+        # psycopg2 does not understand SQLAlchemy driver suffixes like postgresql+psycopg2://
+        self.dsn = re.sub(r"^postgres(ql)?\+\w+://", "postgresql://", dsn)
+        self._listen_conn = None
+        self._notify_conn = None
+
+    async def start(self):
+        if self._listen_conn is not None:
+            return
+
+        try:
+            import psycopg2
+            import psycopg2.extensions
+
+            conn = await asyncio.to_thread(psycopg2.connect, self.dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+
+            asyncio.get_running_loop().add_reader(conn.fileno(), self._on_readable)
+            self._listen_conn = conn
+            logger.info(f"Listening for job notifications on Postgres channel '{self.channel}'")
+        except Exception as e:
+            logger.warning(f"Postgres job notifications unavailable ({e}); falling back to polling")
+
+    @property
+    def listening(self) -> bool:
+        return self._listen_conn is not None
+
+    def _on_readable(self):
+        try:
+            self._listen_conn.poll()
+            if self._listen_conn.notifies:
+                self._listen_conn.notifies.clear()
+                self._event.set()
+        except Exception as e:
+            logger.warning(f"Postgres job notification listener lost its connection: {e}")
+            self._close_listen_conn()
+            # Trigger a rescan; the next wait() reconnects
+            self._event.set()
+
+    def _close_listen_conn(self):
+        if self._listen_conn is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._listen_conn.fileno())
+            self._listen_conn.close()
+        except Exception:
+            pass
+        self._listen_conn = None
+
+    def _send_notify(self, job_id: str):
+        import psycopg2
+        import psycopg2.extensions
+
+        if self._notify_conn is None or self._notify_conn.closed:
+            self._notify_conn = psycopg2.connect(self.dsn)
+            self._notify_conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._notify_conn.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, job_id))
+
+    async def notify(self, job_id: str):
+        self._event.set()
+        try:
+            await asyncio.to_thread(self._send_notify, job_id)
+        except Exception as e:
+            logger.warning(f"Failed to send job notification for {job_id}: {e}")
+            self._notify_conn = None
+
+    async def close(self):
+        self._close_listen_conn()
+        if self._notify_conn is not None:
+            self._notify_conn.close()
+            self._notify_conn = None
+
+
+def create_job_notifier() -> JobNotifier:
+    """Create a job notifier for the configured backend"""
+    backend = settings.job_notify_backend.lower()
+    channel = settings.job_notify_channel
+    redis_url = settings.redis_url or settings.rate_limit_storage_url
+    database_url = settings.database_url or ""
+
+    if backend == "auto":
+        if database_url.startswith("postgres"):
+            backend = "postgres"
+        elif redis_url:
+            backend = "redis"
+        else:
+            backend = "memory"
+
+    if backend == "postgres":
+        return PostgresJobNotifier(channel, database_url)
+    if backend == "redis":
+        return RedisJobNotifier(channel)
+    return JobNotifier(channel)
+
+
+# Global notifier instance shared by the API and any in-process worker
+_job_notifier: Optional[JobNotifier] = None
+
+
+def get_job_notifier() -> JobNotifier:
+    """Get or create the global job notifier"""
+    global _job_notifier
+
+    if _job_notifier is None:
+        _job_notifier = create_job_notifier()
+        logger.info(f"Using {type(_job_notifier).__name__} for job notifications")
+        if type(_job_notifier) is JobNotifier:
+            logger.warning(
+                "In-process job notifications only reach a worker inside the API process; "
+                f"separate workers poll every {settings.worker_unnotified_poll_interval}s. "
+                "Set JOB_NOTIFY_BACKEND to redis or postgres to wake them immediately"
+            )
+
+    return _job_notifier
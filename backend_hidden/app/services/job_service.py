@@ -11,6 +11,7 @@ from app.schemas import (
     JobStatus, LanguageTaskStatus, get_language_info
 )
 from app.services.storage_service import StorageService
+from app.services.job_notifier import get_job_notifier
 from datetime import datetime
 import logging
 
@@ -118,6 +119,9 @@ class JobService:
             
             logger.info(f"Created job {job_data.job_id} for user {user_id} successfully")
             
+            # Wake workers so the job starts without waiting for the next poll
+            await get_job_notifier().notify(job_data.job_id)
+            
             # Return simple success response instead of calling get_job_status
             from app.schemas import JobStatusResponse, LanguageProgress
             return JobStatusResponse(
@@ -248,18 +252,27 @@ class JobService:
         progress: int = None,
         message: str = None,
         download_url: str = None,
-        db: Session = None
+        db: Session = None,
+        worker_id: str = None
     ) -> bool:
         """
         Update language task status
+        
+        With worker_id set, the task is only updated while that worker holds
+        its lease, so a worker whose lease lapsed can't overwrite the new owner.
         """
         try:
             if db is None:
                 logger.info(f"Task {task_id} status updated to {status}: {message}")
                 return True
             
-            task = db.query(LanguageTask).filter(LanguageTask.id == task_id).first()
+            query = db.query(LanguageTask).filter(LanguageTask.id == task_id)
+            if worker_id:
+                query = query.filter(LanguageTask.claimed_by == worker_id)
+            task = query.first()
             if not task:
+                if worker_id:
+                    logger.warning(f"Task {task_id} not updated to {status}; worker {worker_id} no longer holds its lease")
                 return False
             
             task.status = status
@@ -2,12 +2,13 @@
 Local database service using SQLAlchemy
 """
 from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models import User, DubbingJob, LanguageTask, JobEvent
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -168,4 +169,96 @@ class LocalDBService:
                 } for job in jobs]
         except Exception as e:
             logger.error(f"Error getting jobs for user {user_id}: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    # Language task lease operations
+    def claim_language_tasks(self, job_id: str, worker_id: str, lease_seconds: int) -> List[Dict[str, Any]]:
+        """
+        Claim the claimable language tasks of a job
+
+        Each task is claimed with a conditional UPDATE, so two workers racing
+        for the same row cannot both win. Pending tasks and processing tasks
+        with no live lease are claimable.
+        """
+        try:
+            with self.get_db() as db:
+                now = datetime.utcnow()
+                claimable = or_(
+                    and_(
+                        LanguageTask.status == "pending",
+                        or_(LanguageTask.claimed_by.is_(None), LanguageTask.lease_expires_at < now)
+                    ),
+                    and_(
+                        LanguageTask.status == "processing",
+                        or_(LanguageTask.claimed_by.is_(None), LanguageTask.lease_expires_at < now)
+                    )
+                )
+
+                candidate_ids = [
+                    task_id for (task_id,) in db.query(LanguageTask.id).filter(
+                        LanguageTask.job_id == job_id,
+                        claimable
+                    ).all()
+                ]
+
+                claimed_ids = []
+                for task_id in candidate_ids:
+                    updated = db.query(LanguageTask).filter(
+                        LanguageTask.id == task_id,
+                        claimable
+                    ).update({
+                        LanguageTask.claimed_by: worker_id,
+                        LanguageTask.lease_expires_at: now + timedelta(seconds=lease_seconds)
+                    }, synchronize_session=False)
+                    db.commit()
+                    if updated:
+                        claimed_ids.append(task_id)
+
+                if not claimed_ids:
+                    return []
+
+                tasks = db.query(LanguageTask).filter(LanguageTask.id.in_(claimed_ids)).all()
+                return [{
+                    "id": task.id,
+                    "job_id": task.job_id,
+                    "language_code": task.language_code,
+                    "status": task.status,
+                    "progress": task.progress,
+                    "message": task.message,
+                    "claimed_by": task.claimed_by,
+                    "lease_expires_at": task.lease_expires_at.isoformat() if task.lease_expires_at else None
+                } for task in tasks]
+        except Exception as e:
+            logger.error(f"Error claiming language tasks for job {job_id}: {e}")
+            return []
+
+    def renew_language_task_leases(self, task_ids: List[str], worker_id: str, lease_seconds: int) -> bool:
+        """Extend the leases held by a worker; returns False if any lease was lost"""
+        with self.get_db() as db:
+            updated = db.query(LanguageTask).filter(
+                LanguageTask.id.in_(task_ids),
+                LanguageTask.claimed_by == worker_id
+            ).update({
+                LanguageTask.lease_expires_at: datetime.utcnow() + timedelta(seconds=lease_seconds)
+            }, synchronize_session=False)
+            db.commit()
+            return updated == len(task_ids)
+
+    def release_language_tasks(self, task_ids: List[str], worker_id: str) -> None:
+        """Release leases held by a worker
+
+        The lease is expired rather than cleared so that tasks interrupted
+        mid-processing (e.g. on shutdown) stay claimable by other workers.
+        """
+        try:
+            with self.get_db() as db:
+                db.query(LanguageTask).filter(
+                    LanguageTask.id.in_(task_ids),
+                    LanguageTask.claimed_by == worker_id
+                ).update({
+                    LanguageTask.claimed_by: None,
+                    LanguageTask.lease_expires_at: datetime.utcnow()
+                }, synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            logger.error(f"Error releasing leases for tasks {task_ids}: {e}")
@@ -7,6 +7,7 @@ from datetime import datetime
 import uuid
 
 from app.services.local_db_service import LocalDBService
+from app.services.job_notifier import get_job_notifier
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +52,9 @@ class LocalJobService:
                 raise Exception("Failed to create job in database")
 
             logger.info(f"Successfully created job {job_id} with status {job['status']}")
+
+            # Wake workers so the job starts without waiting for the next poll
+            await get_job_notifier().notify(job_id)
             return job
 
         except Exception as e:
@@ -1,15 +1,26 @@
 """
 Storage service for handling file uploads and downloads
 """
+import asyncio
+import os
+import shutil
+import tempfile
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Optional
 from app.auth import SupabaseStorageService
 from app.schemas import SignedUploadUrls, UploadUrlsRequest
 from app.config import settings
+from app.utils.downloads import ProgressCallback
+from app.utils.media_cache import MediaCache, get_media_cache
+from app.utils.ttl_cache import TTLCache
+import aiofiles
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Recently seen storage object versions, used to build media cache keys
+_object_versions = TTLCache(max_size=1024, ttl=60)
+
 
 class StorageService:
     """Service for managing file storage operations"""
@@ -111,11 +122,21 @@ class StorageService:
         try:
             # Handle local file URLs
             if file_path.startswith("file://"):
-                import aiofiles
                 local_path = file_path[7:]  # Remove "file://" prefix
                 async with aiofiles.open(local_path, 'rb') as f:
                     return await f.read()
 
+            # Serve through the media cache when it is enabled
+            if get_media_cache() is not None:
+                temp_file = tempfile.NamedTemporaryFile(delete=False)
+                temp_file.close()
+                try:
+                    await self.download_to_file(file_path, temp_file.name)
+                    async with aiofiles.open(temp_file.name, 'rb') as f:
+                        return await f.read()
+                finally:
+                    os.remove(temp_file.name)
+
             # Handle Supabase storage
             return await self.supabase_storage.download_file(
                 bucket=self.bucket,
@@ -125,6 +146,81 @@ class StorageService:
             logger.error(f"Error downloading file: {e}")
             raise Exception(f"Failed to download file: {str(e)}")
 
+    async def download_to_file(
+        self,
+        file_path: str,
+        output_path: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Stream a file from storage (or a local file:// path) to output_path
+
+        Storage downloads go through the worker media cache when it is
+        enabled, so repeated downloads of the same object version are local
+        hard links.
+
+        Returns:
+            int: Size of the downloaded file in bytes
+        """
+        try:
+            # Handle local file URLs
+            if file_path.startswith("file://"):
+                local_path = file_path[7:]  # Remove "file://" prefix
+                await asyncio.to_thread(shutil.copyfile, local_path, output_path)
+                return os.path.getsize(output_path)
+
+            async def download(target_path: str):
+                await self.supabase_storage.download_to_file(
+                    bucket=self.bucket,
+                    file_path=file_path,
+                    output_path=target_path,
+                    progress=progress
+                )
+
+            # Handle Supabase storage, through the media cache when possible
+            cache = get_media_cache()
+            cache_key = await self.get_cache_key(file_path) if cache else None
+            if cache_key:
+                await cache.fetch(cache_key, output_path, download, suffix=os.path.splitext(file_path)[1])
+            else:
+                await download(output_path)
+            return os.path.getsize(output_path)
+        except Exception as e:
+            logger.error(f"Error downloading file: {e}")
+            raise Exception(f"Failed to download file: {str(e)}")
+
+    async def get_object_version(self, file_path: str) -> Optional[str]:
+        """
+        Return the stored object's ETag (or size and mtime for local files)
+
+        Versions are remembered briefly so the language tasks of one job
+        don't each send a HEAD request.
+        """
+        version = _object_versions.get(file_path)
+        if version is None:
+            if file_path.startswith("file://"):
+                stat = os.stat(file_path[7:])
+                version = f"{stat.st_size}:{stat.st_mtime_ns}"
+            else:
+                version = await self.supabase_storage.get_object_version(self.bucket, file_path)
+            if version is not None:
+                _object_versions.put(file_path, version)
+        return version
+
+    async def get_cache_key(self, file_path: str, variant: str = "raw") -> Optional[str]:
+        """
+        Media cache key for a variant of a stored object
+
+        Returns:
+            The key, or None if the cache is disabled or the object version is unknown
+        """
+        if get_media_cache() is None:
+            return None
+        version = await self.get_object_version(file_path)
+        if version is None:
+            return None
+        return MediaCache.make_key(file_path, version, variant)
+
     async def upload_file(
         self,
         file_path: str,
@@ -145,6 +241,26 @@ class StorageService:
             logger.error(f"Error uploading file: {e}")
             raise Exception(f"Failed to upload file: {str(e)}")
 
+    async def upload_from_path(
+        self,
+        file_path: str,
+        local_path: str,
+        content_type: str = None
+    ) -> str:
+        """
+        Upload a local file to storage without reading it into memory
+        """
+        try:
+            return await self.supabase_storage.upload_from_path(
+                bucket=self.bucket,
+                file_path=file_path,
+                local_path=local_path,
+                content_type=content_type
+            )
+        except Exception as e:
+            logger.error(f"Error uploading file: {e}")
+            raise Exception(f"Failed to upload file: {str(e)}")
+
     async def delete_file(self, file_path: str) -> bool:
         """
         Delete a file from storage
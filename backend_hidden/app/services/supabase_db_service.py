@@ -1,18 +1,46 @@
 """
 Supabase database service using REST API
 """
-from typing import List, Optional, Dict, Any
-from supabase import create_client, Client
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from supabase import Client
 from app.config import settings
+from app.services.clients import get_client_registry
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for blocking supabase-py calls made from async code
+_supabase_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_supabase_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool used for blocking Supabase calls"""
+    global _supabase_executor
+
+    if _supabase_executor is None:
+        _supabase_executor = ThreadPoolExecutor(
+            max_workers=settings.supabase_executor_threads,
+            thread_name_prefix="supabase"
+        )
+
+    return _supabase_executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking supabase-py call in the Supabase thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_supabase_executor(), functools.partial(func, *args, **kwargs))
+
+
 class SupabaseDBService:
     """Database service using Supabase REST API"""
     
     def __init__(self):
-        self.client: Client = create_client(settings.supabase_url, settings.supabase_service_key)
+        # Shared, pooled client; constructing the service is cheap
+        self.client: Client = get_client_registry().supabase
     
     # User operations
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -102,10 +130,22 @@ class SupabaseDBService:
             logger.error(f"Error creating language task: {e}")
             return None
     
-    def update_language_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update language task"""
+    def update_language_task(
+        self,
+        task_id: str,
+        updates: Dict[str, Any],
+        claimed_by: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Update language task
+
+        With claimed_by set, the row is only updated while that worker holds
+        its lease, so a worker whose lease lapsed can't overwrite the new owner.
+        """
         try:
-            result = self.client.table('language_tasks').update(updates).eq('id', task_id).execute()
+            query = self.client.table('language_tasks').update(updates).eq('id', task_id)
+            if claimed_by:
+                query = query.eq('claimed_by', claimed_by)
+            result = query.execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error updating language task {task_id}: {e}")
@@ -157,6 +197,73 @@ class SupabaseDBService:
             logger.error(f"Error updating job {job_id}: {e}")
             return None
 
+    def get_claimable_language_tasks(self, cursor: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get one page of claimable language tasks with their job rows embedded
+
+        Claimable tasks are pending, or processing with no live lease. Only
+        tasks of jobs in the 'processing' state are returned. Pages are keyed
+        by task ID: pass the last ID of the previous page as the cursor.
+        """
+        try:
+            from datetime import datetime
+            now = datetime.utcnow().isoformat()
+            query = self.client.table('language_tasks') \
+                .select('*, dubbing_jobs!inner(*)') \
+                .eq('dubbing_jobs.status', 'processing') \
+                .or_(f'status.eq.pending,and(status.eq.processing,or(claimed_by.is.null,lease_expires_at.lt."{now}"))')
+
+            if cursor:
+                query = query.gt('id', cursor)
+
+            result = query.order('id').limit(limit).execute()
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error getting claimable language tasks: {e}")
+            return []
+
+    # Language task lease operations
+    def claim_language_tasks(self, job_id: str, worker_id: str, lease_seconds: int) -> List[Dict[str, Any]]:
+        """Atomically claim the claimable language tasks of a job (see migrations/add_task_leases.sql)"""
+        try:
+            result = self.client.rpc('claim_language_tasks', {
+                'p_job_id': job_id,
+                'p_worker_id': worker_id,
+                'p_lease_seconds': lease_seconds
+            }).execute()
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error claiming language tasks for job {job_id}: {e}")
+            return []
+
+    def renew_language_task_leases(self, task_ids: List[str], worker_id: str, lease_seconds: int) -> bool:
+        """Extend the leases held by a worker; returns False if any lease was lost"""
+        try:
+            from datetime import datetime, timedelta
+            lease_expires_at = (datetime.utcnow() + timedelta(seconds=lease_seconds)).isoformat()
+            result = self.client.table('language_tasks').update({
+                'lease_expires_at': lease_expires_at
+            }).in_('id', task_ids).eq('claimed_by', worker_id).execute()
+            return len(result.data or []) == len(task_ids)
+        except Exception as e:
+            logger.error(f"Error renewing leases for tasks {task_ids}: {e}")
+            raise
+
+    def release_language_tasks(self, task_ids: List[str], worker_id: str) -> None:
+        """Release leases held by a worker
+
+        The lease is expired rather than cleared so that tasks interrupted
+        mid-processing (e.g. on shutdown) stay claimable by other workers.
+        """
+        try:
+            from datetime import datetime
+            self.client.table('language_tasks').update({
+                'claimed_by': None,
+                'lease_expires_at': datetime.utcnow().isoformat()
+            }).in_('id', task_ids).eq('claimed_by', worker_id).execute()
+        except Exception as e:
+            logger.error(f"Error releasing leases for tasks {task_ids}: {e}")
+
     # Audit log operations
     def create_audit_log(self, event_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create an audit log entry"""
@@ -171,6 +278,20 @@ class SupabaseDBService:
             logger.error(f"Error creating audit log: {e}")
             return None
 
+    def create_audit_logs(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Insert a batch of audit log entries in one request
+
+        Raises on failure so the caller can retry the batch.
+        """
+        import uuid
+        for event_data in events:
+            if 'id' not in event_data:
+                event_data['id'] = str(uuid.uuid4())
+
+        result = self.client.table('audit_logs').insert(events).execute()
+        return len(result.data or [])
+
     def get_audit_logs(
         self,
         user_id: Optional[str] = None,
@@ -381,4 +502,32 @@ class SupabaseDBService:
             return result.data or []
         except Exception as e:
             logger.error(f"Error getting deletion audit logs: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+class AsyncSupabaseDBService:
+    """
+    Async adapter for SupabaseDBService
+
+    Exposes the same methods as coroutines; each call runs the synchronous
+    supabase-py request in the bounded Supabase thread pool so it never
+    blocks the event loop.
+    """
+
+    def __init__(self, db_service: Optional[SupabaseDBService] = None):
+        self.sync = db_service or SupabaseDBService()
+
+    @property
+    def client(self) -> Client:
+        return self.sync.client
+
+    def __getattr__(self, name: str):
+        method = getattr(self.sync, name)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await run_blocking(method, *args, **kwargs)
+
+        return call
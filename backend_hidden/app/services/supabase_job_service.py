@@ -8,7 +8,8 @@ from app.schemas import (
     JobStatus, LanguageTaskStatus, get_language_info
 )
 from app.services.storage_service import StorageService
-from app.services.supabase_db_service import SupabaseDBService
+from app.services.supabase_db_service import AsyncSupabaseDBService
+from app.services.job_notifier import get_job_notifier
 from datetime import datetime
 import logging
 
@@ -20,7 +21,7 @@ class SupabaseJobService:
     
     def __init__(self):
         self.storage_service = StorageService()
-        self.db_service = SupabaseDBService()
+        self.db_service = AsyncSupabaseDBService()
     
     async def create_job(
         self,
@@ -34,7 +35,7 @@ class SupabaseJobService:
             logger.info(f"Starting job creation for {job_data.job_id} for user {user_id}")
             
             # Check if job already exists
-            existing_job = self.db_service.get_job(job_data.job_id, user_id)
+            existing_job = await self.db_service.get_job(job_data.job_id, user_id)
             if existing_job:
                 logger.info(f"Job {job_data.job_id} already exists, returning simple status")
                 return JobStatusResponse(
@@ -63,7 +64,7 @@ class SupabaseJobService:
                 'background_track_url': job_data.background_track_url
             }
             
-            job = self.db_service.create_job(job_data_dict)
+            job = await self.db_service.create_job(job_data_dict)
             if not job:
                 raise Exception("Failed to create job in database")
             
@@ -83,7 +84,7 @@ class SupabaseJobService:
                     'message': "Waiting to start..."
                 }
                 
-                language_task = self.db_service.create_language_task(task_data)
+                language_task = await self.db_service.create_language_task(task_data)
                 if not language_task:
                     logger.error(f"Failed to create language task for {language_code}")
             
@@ -103,7 +104,10 @@ class SupabaseJobService:
                 }
             }
             
-            self.db_service.create_job_event(event_data)
+            await self.db_service.create_job_event(event_data)
+            
+            # Wake workers so the job starts without waiting for the next poll
+            await get_job_notifier().notify(job_data.job_id)
             
             logger.info(f"Created job {job_data.job_id} for user {user_id} successfully")
             
@@ -134,12 +138,12 @@ class SupabaseJobService:
         """
         try:
             # Get job
-            job = self.db_service.get_job(job_id, user_id)
+            job = await self.db_service.get_job(job_id, user_id)
             if not job:
                 raise Exception("Job not found")
             
             # Get language tasks
-            language_tasks = self.db_service.get_language_tasks(job_id)
+            language_tasks = await self.db_service.get_language_tasks(job_id)
             
             # Calculate overall progress
             total_tasks = len(language_tasks)
@@ -149,7 +153,7 @@ class SupabaseJobService:
             # Update job progress if needed
             if job['progress'] != overall_progress:
                 updates = {'progress': overall_progress}
-                self.db_service.update_job(job_id, updates)
+                await self.db_service.update_job(job_id, updates)
             
             # Build language progress list
             languages = []
@@ -203,7 +207,7 @@ class SupabaseJobService:
             elif status in [JobStatus.COMPLETE, JobStatus.ERROR]:
                 updates['completed_at'] = datetime.utcnow().isoformat()
             
-            result = self.db_service.update_job(job_id, updates)
+            result = await self.db_service.update_job(job_id, updates)
             if result:
                 logger.info(f"Job {job_id} status updated to {status}: {message}")
                 return True
@@ -240,7 +244,7 @@ class SupabaseJobService:
             elif status in [LanguageTaskStatus.COMPLETE, LanguageTaskStatus.ERROR]:
                 updates['completed_at'] = datetime.utcnow().isoformat()
             
-            result = self.db_service.update_language_task(task_id, updates)
+            result = await self.db_service.update_language_task(task_id, updates)
             if result:
                 logger.info(f"Task {task_id} status updated to {status}: {message}")
                 return True
@@ -284,7 +288,7 @@ class SupabaseJobService:
                 'event_metadata': metadata or {}
             }
             
-            result = self.db_service.create_job_event(event_data)
+            result = await self.db_service.create_job_event(event_data)
             if result:
                 logger.info(f"Job event created for {job_id}: {event_type} - {message}")
                 return True
@@ -0,0 +1,142 @@
+"""
+Silence-aware chunk boundaries
+
+Cutting audio at fixed offsets splits words mid-utterance. Instead, the audio
+is decoded once to mono 16 kHz PCM, per-frame RMS energy is computed with
+NumPy, and each cut is moved to the quietest window within a search range
+around its target offset.
+
+Every step is linear in the number of samples. Energy is computed block by
+block, so large inputs can be memory-mapped instead of read into memory.
+"""
+import asyncio
+import logging
+import os
+from typing import List
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02  # 20 ms energy frames
+PAUSE_SECONDS = 0.2  # Length of the quiet window a cut is centred in
+ENERGY_BLOCK_FRAMES = 16384  # Frames converted to float per block (~21 MB)
+
+# FFmpeg output arguments for the analysis PCM read by load_pcm
+ANALYSIS_PCM_ARGS = ["-acodec", "pcm_s16le", "-ar", str(ANALYSIS_SAMPLE_RATE), "-ac", "1", "-f", "s16le"]
+
+
+def load_pcm(path: str, mmap_threshold: int = 64 * 1024 * 1024) -> np.ndarray:
+    """
+    Load raw mono s16le PCM, memory-mapping files larger than mmap_threshold bytes
+    """
+    if os.path.getsize(path) < 2:
+        return np.zeros(0, dtype="<i2")
+    if os.path.getsize(path) > mmap_threshold:
+        return np.memmap(path, dtype="<i2", mode="r")
+    return np.fromfile(path, dtype="<i2")
+
+
+def frame_rms(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """
+    RMS energy of consecutive non-overlapping frames
+
+    The trailing partial frame is ignored. Samples are converted to float in
+    blocks of ENERGY_BLOCK_FRAMES frames, so memory use stays bounded for
+    memory-mapped inputs.
+    """
+    frame_count = len(samples) // frame_length
+    energy = np.empty(frame_count, dtype=np.float32)
+    for first in range(0, frame_count, ENERGY_BLOCK_FRAMES):
+        last = min(first + ENERGY_BLOCK_FRAMES, frame_count)
+        block = np.asarray(samples[first * frame_length:last * frame_length], dtype=np.float32)
+        block = block.reshape(last - first, frame_length)
+        energy[first:last] = np.sqrt(np.einsum("ij,ij->i", block, block) / frame_length)
+    return energy
+
+
+def find_cut_points(
+    energy: np.ndarray,
+    frame_seconds: float,
+    target_duration: float,
+    search_seconds: float,
+    pause_seconds: float = PAUSE_SECONDS
+) -> List[float]:
+    """
+    Choose cut times near every target_duration, snapped to the quietest window
+
+    Each cut is placed at the centre of the pause_seconds window with the
+    lowest mean energy within search_seconds of its target. Ties go to the
+    window closest to the target. No cut is placed within search_seconds of
+    the end, so the last chunk runs between search_seconds and
+    target_duration + search_seconds instead of leaving a short tail.
+
+    Args:
+        energy: Per-frame RMS energy from frame_rms
+        frame_seconds: Duration of one energy frame
+        target_duration: Desired chunk length in seconds
+        search_seconds: How far either side of the target a cut may move
+
+    Returns:
+        Cut times in seconds, in increasing order
+    """
+    frame_count = len(energy)
+    target = max(int(round(target_duration / frame_seconds)), 1)
+    search = max(int(round(search_seconds / frame_seconds)), 0)
+    pause = min(max(int(round(pause_seconds / frame_seconds)), 1), max(frame_count, 1))
+
+    # Mean energy of the pause-length window starting at each frame
+    cumulative = np.concatenate(([0.0], np.cumsum(energy, dtype=np.float64)))
+    window_energy = (cumulative[pause:] - cumulative[:-pause]) / pause
+    half_pause = pause // 2
+
+    cuts = []
+    previous = 0
+    while frame_count - previous > target + search:
+        goal = previous + target - half_pause
+        low = max(previous + 1, goal - search)
+        # Keep at least `search` frames after the cut so the tail isn't a sliver
+        high = min(len(window_energy), goal + search + 1, frame_count - search - half_pause + 1)
+        if high <= low:
+            break
+        candidates = window_energy[low:high]
+
+        quietest = candidates.min()
+        # Treat windows within 5% (or 1 LSB of RMS) of the minimum as equally quiet
+        quiet = np.flatnonzero(candidates <= quietest * 1.05 + 1.0)
+        best = low + int(quiet[np.argmin(np.abs(quiet + low - goal))])
+
+        cut = best + half_pause
+        cuts.append(cut * frame_seconds)
+        previous = cut
+
+    return cuts
+
+
+async def find_silence_boundaries(
+    pcm_path: str,
+    target_duration: float,
+    search_seconds: float,
+    mmap_threshold: int = 64 * 1024 * 1024
+) -> List[float]:
+    """
+    Compute silence-aligned cut times for analysis PCM written with ANALYSIS_PCM_ARGS
+
+    Args:
+        pcm_path: Raw mono 16 kHz s16le PCM file
+        target_duration: Desired chunk length in seconds
+        search_seconds: How far either side of each target a cut may move
+        mmap_threshold: Memory-map the PCM when it is larger than this many bytes
+
+    Returns:
+        Cut times in seconds
+    """
+    def analyse():
+        samples = load_pcm(pcm_path, mmap_threshold)
+        frame_length = int(ANALYSIS_SAMPLE_RATE * FRAME_SECONDS)
+        energy = frame_rms(samples, frame_length)
+        return find_cut_points(energy, FRAME_SECONDS, target_duration, search_seconds)
+
+    cuts = await asyncio.to_thread(analyse)
+    logger.info(f"Found {len(cuts)} silence-aligned cut points in {pcm_path}")
+    return cuts
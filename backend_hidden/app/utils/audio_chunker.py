@@ -2,34 +2,58 @@
 """
 Audio chunking utilities for processing long audio files
 """
+import asyncio
+import csv
 import os
 import tempfile
 import subprocess
 import logging
 from pathlib import Path
-from typing import List, Tuple, Dict
-import json
+from typing import List, Dict
+from app.config import settings
+from app.utils.audio_boundaries import ANALYSIS_PCM_ARGS, find_silence_boundaries
+from app.utils.audio_concat import concat_audio, split_wav
+from app.utils.media_exec import run_media_command
 
 logger = logging.getLogger(__name__)
 
 class AudioChunker:
     """Handles chunking of audio files for processing"""
     
-    def __init__(self, chunk_duration: int = 45):
+    def __init__(
+        self,
+        chunk_duration: int = 45,
+        silence_search: float = None,
+        sample_rate: int = 44100,
+        channels: int = 2
+    ):
         """
         Initialize chunker with specified duration in seconds
         
         Args:
-            chunk_duration: Duration of each chunk in seconds (default: 45)
+            chunk_duration: Target duration of each chunk in seconds (default: 45)
+            silence_search: Seconds either side of each target cut searched for a
+                pause (default: settings.audio_chunk_silence_search; 0 cuts at
+                fixed offsets)
+            sample_rate: Sample rate of the PCM WAV chunks (default: 44100)
+            channels: Channel count of the PCM WAV chunks (default: 2)
         """
         self.chunk_duration = chunk_duration
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.silence_search = settings.audio_chunk_silence_search if silence_search is None else silence_search
         self.temp_dir = Path(tempfile.gettempdir()) / "audio_chunks"
         self.temp_dir.mkdir(exist_ok=True)
     
-    def chunk_audio(self, audio_file_path: str, job_id: str) -> List[Dict[str, str]]:
+    async def chunk_audio(self, audio_file_path: str, job_id: str) -> List[Dict[str, str]]:
         """
         Split audio file into chunks
         
+        With silence search enabled, cuts are moved to the quietest point near
+        each chunk_duration offset so words aren't split across chunks.
+        Otherwise all chunks are written by one FFmpeg run using the segment
+        muxer at fixed offsets. Either way the input is decoded once.
+        
         Args:
             audio_file_path: Path to the input audio file
             job_id: Job ID for naming chunks
@@ -40,39 +64,13 @@ class AudioChunker:
         try:
             logger.info(f"Chunking audio file: {audio_file_path}")
             
-            # Get audio duration first
-            duration = self._get_audio_duration(audio_file_path)
-            logger.info(f"Audio duration: {duration:.2f} seconds")
-            
-            chunks = []
-            chunk_index = 0
-            start_time = 0
+            if self.silence_search > 0:
+                chunks = await self._segment_at_silences(audio_file_path, job_id)
+            else:
+                chunks = await self._segment_audio(audio_file_path, job_id)
             
-            while start_time < duration:
-                end_time = min(start_time + self.chunk_duration, duration)
-                
-                # Create chunk file path
-                chunk_filename = f"{job_id}_chunk_{chunk_index:03d}.wav"
-                chunk_path = self.temp_dir / chunk_filename
-                
-                # Extract chunk using FFmpeg
-                self._extract_chunk(audio_file_path, chunk_path, start_time, end_time)
-                
-                # Store chunk info
-                chunk_info = {
-                    "index": chunk_index,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "duration": end_time - start_time,
-                    "file_path": str(chunk_path),
-                    "filename": chunk_filename
-                }
-                chunks.append(chunk_info)
-                
-                logger.info(f"Created chunk {chunk_index}: {start_time:.2f}s - {end_time:.2f}s")
-                
-                chunk_index += 1
-                start_time = end_time
+            for chunk_info in chunks:
+                logger.info(f"Created chunk {chunk_info['index']}: {chunk_info['start_time']:.2f}s - {chunk_info['end_time']:.2f}s")
             
             logger.info(f"Created {len(chunks)} chunks for job {job_id}")
             return chunks
@@ -81,51 +79,123 @@ class AudioChunker:
             logger.error(f"Error chunking audio: {e}")
             raise Exception(f"Failed to chunk audio: {str(e)}")
     
-    def _get_audio_duration(self, audio_file_path: str) -> float:
-        """Get duration of audio file using FFprobe"""
+    async def _segment_audio(self, input_path: str, job_id: str) -> List[Dict[str, str]]:
+        """
+        Decode the input once and write every chunk with FFmpeg's segment muxer
+        
+        Chunk boundaries come from the segment list FFmpeg writes, so start
+        and end times are the exact cut points.
+        """
+        segment_list = self.temp_dir / f"{job_id}_segments.csv"
+        cmd = [
+            "ffmpeg",
+            "-i", input_path,
+            "-vn",  # No video
+            "-acodec", "pcm_s16le",
+            "-ar", str(self.sample_rate),
+            "-ac", str(self.channels),
+            "-f", "segment",
+            "-segment_time", str(self.chunk_duration),
+            "-segment_list", str(segment_list),
+            "-segment_list_type", "csv",
+            "-reset_timestamps", "1",
+            "-y",  # Overwrite output
+            str(self.temp_dir / f"{job_id}_chunk_%03d.wav")
+        ]
+        
         try:
-            cmd = [
-                "ffprobe",
-                "-v", "quiet",
-                "-show_entries", "format=duration",
-                "-of", "csv=p=0",
-                audio_file_path
-            ]
+            await run_media_command(cmd)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            duration = float(result.stdout.strip())
-            return duration
+            chunks = []
+            with open(segment_list, newline='') as f:
+                for chunk_index, (filename, start, end) in enumerate(csv.reader(f)):
+                    start_time = float(start)
+                    end_time = float(end)
+                    chunks.append({
+                        "index": chunk_index,
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "duration": end_time - start_time,
+                        "file_path": str(self.temp_dir / filename),
+                        "filename": filename
+                    })
+            return chunks
             
-        except Exception as e:
-            logger.error(f"Error getting audio duration: {e}")
-            raise Exception(f"Failed to get audio duration: {str(e)}")
+        except subprocess.TimeoutExpired:
+            logger.error(f"FFmpeg timeout segmenting {input_path}")
+            raise Exception("Audio segmentation timeout")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error segmenting audio: {e.stderr}")
+            raise Exception(f"Failed to segment audio: {e.stderr}")
+        finally:
+            segment_list.unlink(missing_ok=True)
     
-    def _extract_chunk(self, input_path: str, output_path: str, start_time: float, end_time: float):
-        """Extract audio chunk using FFmpeg"""
+    async def _segment_at_silences(self, input_path: str, job_id: str) -> List[Dict[str, str]]:
+        """
+        Cut the input at pauses near every chunk_duration offset
+        
+        One FFmpeg run decodes the input to the chunk format and, in the same
+        pass, to mono 16 kHz PCM for energy analysis. The chunks are then
+        copied out of the decoded WAV at the chosen cut points.
+        """
+        decoded_path = self.temp_dir / f"{job_id}_decoded.wav"
+        analysis_path = self.temp_dir / f"{job_id}_analysis.pcm"
+        cmd = [
+            "ffmpeg",
+            "-i", input_path,
+            "-map", "0:a:0",
+            "-acodec", "pcm_s16le",
+            "-ar", str(self.sample_rate),
+            "-ac", str(self.channels),
+            "-y",  # Overwrite output
+            str(decoded_path),
+            "-map", "0:a:0",
+            *ANALYSIS_PCM_ARGS,
+            "-y",
+            str(analysis_path)
+        ]
+        
         try:
-            cmd = [
-                "ffmpeg",
-                "-i", input_path,
-                "-ss", str(start_time),
-                "-t", str(end_time - start_time),
-                "-acodec", "pcm_s16le",
-                "-ar", "44100",
-                "-ac", "2",
-                "-y",  # Overwrite output
-                str(output_path)
-            ]
+            await run_media_command(cmd)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
-            logger.debug(f"Extracted chunk: {start_time:.2f}s - {end_time:.2f}s")
+            cut_times = await find_silence_boundaries(
+                str(analysis_path),
+                self.chunk_duration,
+                self.silence_search,
+                mmap_threshold=settings.audio_analysis_mmap_mb * 1024 * 1024
+            )
+            
+            filenames = [f"{job_id}_chunk_{i:03d}.wav" for i in range(len(cut_times) + 1)]
+            pieces = await asyncio.to_thread(
+                split_wav,
+                str(decoded_path),
+                cut_times,
+                [str(self.temp_dir / filename) for filename in filenames]
+            )
+            
+            return [
+                {
+                    "index": chunk_index,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "duration": end_time - start_time,
+                    "file_path": str(self.temp_dir / filename),
+                    "filename": filename
+                }
+                for chunk_index, (filename, (start_time, end_time)) in enumerate(zip(filenames, pieces))
+            ]
             
         except subprocess.TimeoutExpired:
-            logger.error(f"FFmpeg timeout extracting chunk {start_time:.2f}s - {end_time:.2f}s")
-            raise Exception("Chunk extraction timeout")
+            logger.error(f"FFmpeg timeout decoding {input_path}")
+            raise Exception("Audio decoding timeout")
         except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg error extracting chunk: {e.stderr}")
-            raise Exception(f"Failed to extract chunk: {e.stderr}")
+            logger.error(f"FFmpeg error decoding audio: {e.stderr}")
+            raise Exception(f"Failed to decode audio: {e.stderr}")
+        finally:
+            decoded_path.unlink(missing_ok=True)
+            analysis_path.unlink(missing_ok=True)
     
-    def reconstruct_audio(self, chunk_files: List[str], output_path: str) -> str:
+    async def reconstruct_audio(self, chunk_files: List[str], output_path: str) -> str:
         """
         Reconstruct audio from chunks while preserving timing
         
@@ -142,30 +212,12 @@ class AudioChunker:
             if not chunk_files:
                 raise Exception("No chunk files provided for reconstruction")
             
-            # Create a temporary file list for FFmpeg
-            file_list_path = self.temp_dir / "file_list.txt"
-            
-            with open(file_list_path, 'w') as f:
-                for chunk_file in chunk_files:
-                    f.write(f"file '{chunk_file}'\n")
-            
-            # Use FFmpeg to concatenate chunks
-            cmd = [
-                "ffmpeg",
-                "-f", "concat",
-                "-safe", "0",
-                "-i", str(file_list_path),
-                "-acodec", "pcm_s16le",
-                "-ar", "44100",
-                "-ac", "2",
-                "-y",  # Overwrite output
-                str(output_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
-            
-            # Clean up file list
-            file_list_path.unlink()
+            # Splice the PCM data directly; re-encodes only if the chunk formats differ
+            await concat_audio(
+                [str(chunk_file) for chunk_file in chunk_files],
+                str(output_path),
+                fallback_codec_args=["-acodec", "pcm_s16le", "-ar", str(self.sample_rate), "-ac", str(self.channels)]
+            )
             
             logger.info(f"Successfully reconstructed audio: {output_path}")
             return str(output_path)
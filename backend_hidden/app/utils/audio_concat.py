@@ -0,0 +1,330 @@
+"""
+Audio concatenation without re-encoding
+
+Chunks produced by TTS or by AudioChunker share a codec, sample rate and
+channel layout, so they can be joined by copying their audio payload:
+
+    - MP3: ID3v2/ID3v1/APE tags and the Xing/Info/VBRI header frame of each
+      input are skipped and the MPEG audio frames are spliced back to back
+    - WAV: PCM data chunks are copied under a single new RIFF header
+
+Concatenation then costs I/O only. Inputs whose stream parameters differ
+(or that can't be parsed) fall back to an FFmpeg re-encode. split_wav does
+the reverse for PCM WAV, copying sample ranges into separate files.
+"""
+import asyncio
+import logging
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from app.utils.media_exec import run_media_command
+
+logger = logging.getLogger(__name__)
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# MPEG audio header tables, indexed by version bits (0 = 2.5, 2 = 2, 3 = 1) and layer bits (1 = III, 2 = II, 3 = I)
+_MPEG_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+_MPEG1_BITRATES = {
+    3: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+}
+_MPEG2_BITRATES = {
+    3: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    1: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+@dataclass
+class AudioStream:
+    """Location and parameters of the audio payload inside a file"""
+    format: str  # "mp3" or "wav"
+    params: tuple  # Must be equal across inputs for a lossless splice
+    start: int  # Offset of the first audio byte
+    end: int  # Offset just past the last audio byte
+    header: bytes = b""  # WAV fmt chunk body
+
+
+def _parse_mpeg_header(header: bytes) -> Optional[Tuple[int, tuple, int]]:
+    """
+    Decode a 4-byte MPEG audio frame header
+
+    Returns:
+        (frame_length, (version, layer, sample_rate, channels), side_info_length) or None
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = (header[1] >> 3) & 0x3
+    layer = (header[1] >> 1) & 0x3
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x3
+    padding = (header[2] >> 1) & 0x1
+    channel_mode = header[3] >> 6
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    sample_rate = _MPEG_SAMPLE_RATES[version][sample_rate_index]
+    bitrates = _MPEG1_BITRATES if version == 3 else _MPEG2_BITRATES
+    bitrate = bitrates[layer][bitrate_index] * 1000
+    channels = 1 if channel_mode == 3 else 2
+
+    if layer == 3:
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if (layer == 1 and version != 3) else 1152
+        frame_length = samples // 8 * bitrate // sample_rate + padding
+
+    if version == 3:
+        side_info = 17 if channels == 1 else 32
+    else:
+        side_info = 9 if channels == 1 else 17
+
+    return frame_length, (version, layer, sample_rate, channels), side_info
+
+
+def _parse_mp3(data: memoryview) -> Optional[AudioStream]:
+    start = 0
+    end = len(data)
+
+    # ID3v2 tag at the start (size is a 28-bit synchsafe integer, plus an optional footer)
+    if bytes(data[0:3]) == b"ID3" and end >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    # ID3v1 and APEv2 tags at the end
+    if end - start >= 128 and bytes(data[end - 128:end - 125]) == b"TAG":
+        end -= 128
+    if end - start >= 32 and bytes(data[end - 32:end - 24]) == b"APETAGEX":
+        ape_size = struct.unpack("<I", bytes(data[end - 20:end - 16]))[0]
+        ape_flags = struct.unpack("<I", bytes(data[end - 12:end - 8]))[0]
+        end -= ape_size + (32 if ape_flags & 0x80000000 else 0)
+
+    # Find the first frame whose successor also starts with a valid header
+    offset = start
+    first = None
+    while offset + 4 <= end:
+        header = _parse_mpeg_header(bytes(data[offset:offset + 4]))
+        if header:
+            frame_length, params, _ = header
+            following = _parse_mpeg_header(bytes(data[offset + frame_length:offset + frame_length + 4]))
+            if offset + frame_length == end or (following and following[1] == params):
+                first = header
+                break
+        offset += 1
+
+    if first is None:
+        return None
+
+    frame_length, params, side_info = first
+    audio_start = offset
+
+    # Skip the Xing/Info/VBRI header frame; its frame count only describes this input
+    tag_offset = offset + 4 + side_info
+    if bytes(data[tag_offset:tag_offset + 4]) in (b"Xing", b"Info") or bytes(data[offset + 36:offset + 40]) == b"VBRI":
+        audio_start = offset + frame_length
+
+    # Walk the frames so trailing garbage or a truncated frame isn't copied
+    offset = audio_start
+    while offset + 4 <= end:
+        header = _parse_mpeg_header(bytes(data[offset:offset + 4]))
+        if not header or header[1] != params or offset + header[0] > end:
+            break
+        offset += header[0]
+
+    if offset == audio_start:
+        return None
+
+    return AudioStream(format="mp3", params=params, start=audio_start, end=offset)
+
+
+def _parse_wav(data: memoryview) -> Optional[AudioStream]:
+    if len(data) < 12 or bytes(data[0:4]) != b"RIFF" or bytes(data[8:12]) != b"WAVE":
+        return None
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = bytes(data[offset:offset + 4])
+        chunk_size = struct.unpack("<I", bytes(data[offset + 4:offset + 8]))[0]
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = bytes(data[body:body + chunk_size])
+        elif chunk_id == b"data":
+            if fmt is None or len(fmt) < 16:
+                return None
+            audio_format, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+            # Only integer or float PCM (incl. WAVE_FORMAT_EXTENSIBLE) can be spliced
+            if audio_format not in (1, 3, 0xFFFE):
+                return None
+            data_end = min(body + chunk_size, len(data))
+            return AudioStream(
+                format="wav",
+                params=(audio_format, channels, sample_rate, block_align, bits, fmt[16:]),
+                start=body,
+                end=data_end,
+                header=fmt
+            )
+        offset = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+def probe_stream(path: str) -> Optional[AudioStream]:
+    """
+    Locate the spliceable audio payload of an MP3 or WAV file
+
+    Returns:
+        AudioStream, or None if the file isn't a format that can be spliced
+    """
+    if os.path.getsize(path) == 0:
+        return None
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        data = memoryview(mapped)
+        try:
+            if bytes(data[0:4]) == b"RIFF":
+                return _parse_wav(data)
+            return _parse_mp3(data)
+        finally:
+            data.release()
+
+
+def _copy_range(src, dst, start: int, end: int):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = src.read(min(COPY_BUFFER_SIZE, remaining))
+        if not block:
+            break
+        dst.write(block)
+        remaining -= len(block)
+
+
+def _write_wav_header(out, fmt: bytes, data_size: int):
+    # The RIFF size counts pad bytes after odd-length chunks; callers write the data pad byte
+    riff_size = 4 + 8 + len(fmt) + (len(fmt) & 1) + 8 + data_size + (data_size & 1)
+    out.write(b"RIFF" + struct.pack("<I", riff_size) + b"WAVE")
+    out.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt + (b"\0" if len(fmt) & 1 else b""))
+    out.write(b"data" + struct.pack("<I", data_size))
+
+
+def _splice(inputs: List[str], streams: List[AudioStream], output_path: str):
+    temp_path = f"{output_path}.part"
+    with open(temp_path, "wb") as out:
+        if streams[0].format == "wav":
+            data_size = sum(stream.end - stream.start for stream in streams)
+            _write_wav_header(out, streams[0].header, data_size)
+
+        for path, stream in zip(inputs, streams):
+            with open(path, "rb") as src:
+                _copy_range(src, out, stream.start, stream.end)
+
+        if streams[0].format == "wav" and data_size & 1:
+            out.write(b"\0")
+    os.replace(temp_path, output_path)
+
+
+def split_wav(input_path: str, cut_times: List[float], output_paths: List[str]) -> List[Tuple[float, float]]:
+    """
+    Split a PCM WAV file at the given times without re-encoding
+
+    Cuts are rounded to the nearest sample frame, so every output starts and
+    ends on a whole sample.
+
+    Args:
+        input_path: PCM WAV file
+        cut_times: Cut times in seconds, in increasing order
+        output_paths: One path per piece (len(cut_times) + 1)
+
+    Returns:
+        (start_time, end_time) in seconds of each piece
+    """
+    if len(output_paths) != len(cut_times) + 1:
+        raise ValueError("split_wav needs one output path per piece")
+
+    stream = probe_stream(input_path)
+    if stream is None or stream.format != "wav":
+        raise ValueError(f"Not a PCM WAV file: {input_path}")
+
+    _, _, sample_rate, block_align, _, _ = stream.params
+    sample_count = (stream.end - stream.start) // block_align
+    boundaries = [0] + [min(max(int(round(t * sample_rate)), 0), sample_count) for t in cut_times] + [sample_count]
+
+    pieces = []
+    with open(input_path, "rb") as src:
+        for path, first, last in zip(output_paths, boundaries, boundaries[1:]):
+            data_size = (last - first) * block_align
+            with open(path, "wb") as out:
+                _write_wav_header(out, stream.header, data_size)
+                _copy_range(src, out, stream.start + first * block_align, stream.start + last * block_align)
+                if data_size & 1:
+                    out.write(b"\0")
+            pieces.append((first / sample_rate, last / sample_rate))
+
+    return pieces
+
+
+async def concat_audio(
+    input_paths: List[str],
+    output_path: str,
+    fallback_codec_args: Optional[List[str]] = None
+) -> str:
+    """
+    Concatenate audio files, copying frames when their parameters match
+
+    Args:
+        input_paths: Files to join, in order
+        output_path: Destination file
+        fallback_codec_args: FFmpeg output codec arguments used when the inputs
+            can't be spliced (e.g. ["-acodec", "mp3"])
+
+    Returns:
+        str: output_path
+    """
+    if not input_paths:
+        raise ValueError("No audio files to concatenate")
+
+    streams = await asyncio.to_thread(lambda: [probe_stream(path) for path in input_paths])
+    output_ext = os.path.splitext(output_path)[1].lower().lstrip(".")
+    spliceable = (
+        all(streams)
+        and len({stream.format for stream in streams}) == 1
+        and len({stream.params for stream in streams}) == 1
+        and streams[0].format == output_ext
+    )
+
+    if spliceable:
+        await asyncio.to_thread(_splice, input_paths, streams, output_path)
+        logger.info(f"Concatenated {len(input_paths)} {output_ext} files without re-encoding")
+        return output_path
+
+    logger.info(f"Audio chunk parameters differ; re-encoding {len(input_paths)} files")
+    file_list = f"{output_path}.list.txt"
+    with open(file_list, "w") as f:
+        for path in input_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    cmd = [
+        "ffmpeg",
+        "-f", "concat",
+        "-safe", "0",
+        "-i", file_list,
+        *(fallback_codec_args or []),
+        "-y",  # Overwrite output
+        output_path
+    ]
+    try:
+        await run_media_command(cmd, timeout=300)
+    finally:
+        os.remove(file_list)
+
+    return output_path
@@ -5,10 +5,13 @@ Provides structured logging for authentication, authorization, and sensitive ope
 import logging
 import json
 import hashlib
+import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
 import re
+from app.config import settings
+from app.utils.audit_sink import AuditLogSink
 
 logger = logging.getLogger(__name__)
 
@@ -165,6 +168,17 @@ class AuditLogger:
         self.db_service = db_service
         self.logger = logging.getLogger("audit")
 
+        # Database writes go through a background batch writer once started
+        self.sink = AuditLogSink(
+            write_batch=self._write_batch,
+            max_buffer=settings.audit_buffer_size,
+            batch_size=settings.audit_batch_size,
+            flush_interval=settings.audit_flush_interval,
+            overflow_policy=settings.audit_overflow_policy,
+            spill_path=settings.audit_spill_path,
+            max_attempts=settings.audit_write_attempts
+        )
+
         # Ensure audit logger is configured
         if not self.logger.handlers:
             handler = logging.StreamHandler()
@@ -251,6 +265,8 @@ class AuditLogger:
                     # Store full user_id and email in database (not hashed)
                     # Database should have proper access controls
                     db_event = {
+                        "id": str(uuid.uuid4()),
+                        "created_at": datetime.utcnow().isoformat(),
                         "event_type": event_type.value,
                         "user_id": user_id,
                         "email": email,
@@ -264,9 +280,14 @@ class AuditLogger:
                         "metadata": metadata,
                         "error": error
                     }
-                    result = self.db_service.create_audit_log(db_event)
-                    if result:
-                        audit_log_id = result.get("id")
+                    if self.sink.running:
+                        # Written in the background; never blocks the caller
+                        self.sink.submit(db_event)
+                        audit_log_id = db_event["id"]
+                    else:
+                        result = self.db_service.create_audit_log(db_event)
+                        if result:
+                            audit_log_id = result.get("id")
                 except Exception as e:
                     # Don't fail on database errors - logging must always work
                     logger.error(f"Failed to persist audit log to database: {e}")
@@ -278,6 +299,24 @@ class AuditLogger:
             logger.error(f"Error in audit logging: {e}", exc_info=True)
             return None
 
+    def _write_batch(self, events: List[Dict[str, Any]]):
+        """Persist a batch of audit rows (runs in a worker thread)"""
+        if self.db_service is None:
+            return
+        if hasattr(self.db_service, "create_audit_logs"):
+            self.db_service.create_audit_logs(events)
+        else:
+            for event in events:
+                self.db_service.create_audit_log(event)
+
+    def start(self):
+        """Start writing audit rows in the background (call from the event loop)"""
+        self.sink.start()
+
+    async def stop(self):
+        """Stop the background writer, flushing buffered audit rows"""
+        await self.sink.stop()
+
     def _format_log_message(self, event: Dict[str, Any]) -> str:
         """Format audit event as structured JSON log message"""
         try:
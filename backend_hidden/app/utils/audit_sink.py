@@ -0,0 +1,229 @@
+"""
+Buffered, batched writer for audit log rows
+
+AuditLogger hands events to the sink, which only appends them to an
+in-memory ring buffer. A background task drains the buffer and bulk-inserts
+batches once enough events are queued or the oldest one has waited long
+enough, so audit writes never add latency to a request.
+
+When the buffer is full the overflow policy decides what happens:
+    drop_oldest - discard the oldest buffered event
+    spill       - hand the new event to the writer task, which appends it to
+                  a local JSON-lines file instead
+
+Failed writes are retried with exponential backoff. A batch that still
+fails after max_attempts writes is spilled or dropped by the same policy,
+so a bad row can't hold up every later event. Events still buffered when
+the final flush on shutdown fails are spilled or logged as lost.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop_oldest", "spill")
+
+# Longest wait between retries of a failing write
+MAX_RETRY_BACKOFF = 60.0
+
+
+class AuditLogSink:
+    """Ring buffer of audit rows drained by a background batch writer"""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Dict[str, Any]]], Any],
+        max_buffer: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        overflow_policy: str = "drop_oldest",
+        spill_path: str = "audit_spill.jsonl",
+        max_attempts: int = 5
+    ):
+        """
+        Args:
+            write_batch: Blocking function that persists a list of rows
+            max_buffer: Maximum number of buffered events
+            batch_size: Maximum rows per insert
+            flush_interval: Maximum seconds an event waits before being written
+            overflow_policy: "drop_oldest" or "spill"
+            spill_path: JSON-lines file used by the spill policy
+            max_attempts: Writes of one batch before it is spilled or dropped
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy}")
+
+        self.write_batch = write_batch
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.max_attempts = max(max_attempts, 1)
+        self.dropped = 0
+        self.spilled = 0
+        self._buffer: deque = deque()
+        self._overflow: List[Dict[str, Any]] = []  # Waiting for the writer to spill them
+        self._failures = 0  # Failed writes of the batch at the head of the buffer
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, event: Dict[str, Any]):
+        """Queue an event without blocking; applies the overflow policy when full"""
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                if self.overflow_policy == "spill":
+                    # Spilling is file I/O; the writer task does it off the request path
+                    self._overflow.append(event)
+                    self._wake()
+                    return
+                self._buffer.popleft()
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"Audit buffer full; dropped {self.dropped} oldest events so far")
+            self._buffer.append(event)
+            full_batch = len(self._buffer) >= self.batch_size
+
+        if full_batch:
+            self._wake()
+
+    def start(self):
+        """Start the background writer on the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background writer and flush whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self._spill_overflow()
+        if await self.flush():
+            return
+
+        # The final flush failed; nothing will retry these after shutdown
+        with self._lock:
+            remaining = list(self._buffer)
+            self._buffer.clear()
+        if remaining:
+            await asyncio.to_thread(self._discard, remaining, "at shutdown")
+
+    async def flush(self) -> bool:
+        """
+        Write all buffered events, batch by batch
+
+        Returns:
+            bool: False if a write failed; the rest stays buffered for the next flush
+        """
+        while self._buffer:
+            batch = self._take_batch()
+            try:
+                await asyncio.to_thread(self.write_batch, batch)
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                if self._failures >= self.max_attempts:
+                    logger.error(f"Failed to write {len(batch)} audit events {self._failures} times: {e}")
+                    self._failures = 0
+                    await asyncio.to_thread(self._discard, batch, "after repeated write failures")
+                else:
+                    logger.error(f"Failed to write {len(batch)} audit events (attempt {self._failures}/{self.max_attempts}): {e}")
+                    self._requeue(batch)
+                return False
+        return True
+
+    async def _run(self):
+        backoff = 0.0
+        retry_at = 0.0
+        while True:
+            now = self._loop.time()
+            timeout = retry_at - now if retry_at > now else self.flush_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._spill_overflow()
+
+            # A full batch doesn't cut a retry backoff short
+            if self._loop.time() < retry_at:
+                continue
+            if await self.flush():
+                backoff = 0.0
+                retry_at = 0.0
+            else:
+                backoff = min(max(backoff * 2, self.flush_interval), MAX_RETRY_BACKOFF)
+                retry_at = self._loop.time() + backoff
+
+    def _wake(self):
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _requeue(self, batch: List[Dict[str, Any]]):
+        """Put a failed batch back at the front so it is retried on the next flush"""
+        with self._lock:
+            room = self.max_buffer - len(self._buffer)
+            if room < len(batch):
+                overflow, batch = batch[:len(batch) - room], batch[len(batch) - room:]
+                if self.overflow_policy == "spill":
+                    self._overflow.extend(overflow)
+                else:
+                    self.dropped += len(overflow)
+            self._buffer.extendleft(reversed(batch))
+
+    async def _spill_overflow(self):
+        with self._lock:
+            overflow, self._overflow = self._overflow, []
+        if overflow:
+            await asyncio.to_thread(self._spill, overflow)
+
+    def _discard(self, events: List[Dict[str, Any]], reason: str):
+        """Give up on writing events: spill them under the spill policy, otherwise drop them"""
+        if self.overflow_policy == "spill":
+            self._spill(events)
+            logger.warning(f"Spilled {len(events)} unwritten audit events to {self.spill_path} {reason}")
+        else:
+            with self._lock:
+                self.dropped += len(events)
+            logger.error(f"Dropped {len(events)} unwritten audit events {reason}")
+
+    def _spill(self, events: List[Dict[str, Any]]):
+        try:
+            with open(self.spill_path, "a") as spill_file:
+                for event in events:
+                    spill_file.write(json.dumps(event, default=str) + "\n")
+            self.spilled += len(events)
+        except Exception as e:
+            self.dropped += len(events)
+            logger.error(f"Failed to spill {len(events)} audit events to {self.spill_path}: {e}")
@@ -0,0 +1,137 @@
+"""
+Streaming HTTP downloads to local files
+
+Responses are written to disk chunk by chunk, so memory use does not depend
+on the size of the file. Data goes to a ".part" file next to the target; if
+the connection drops, the next attempt asks the server for the remaining
+bytes with a Range request and appends to what is already there.
+"""
+import asyncio
+import inspect
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Union
+import aiofiles
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int, Optional[int]], Union[None, Awaitable[None]]]
+
+
+async def download_to_file(
+    client: httpx.AsyncClient,
+    url: str,
+    output_path: str,
+    headers: Optional[Dict[str, str]] = None,
+    progress: Optional[ProgressCallback] = None,
+    max_retries: int = 3,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE
+) -> int:
+    """
+    Stream a URL to a file, resuming after interrupted transfers
+
+    Args:
+        client: HTTP client used for the requests
+        url: URL to download
+        output_path: Destination file
+        headers: Extra request headers (e.g. authorization)
+        progress: Called with (bytes_downloaded, total_bytes or None) after each chunk
+        max_retries: Attempts after the first that resume a failed transfer
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        int: Size of the downloaded file in bytes
+
+    Raises:
+        Exception: If the download still fails after all retries
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = output_path.with_name(f"{output_path.name}.part")
+
+    attempt = 0
+    while True:
+        downloaded = part_path.stat().st_size if part_path.exists() else 0
+        request_headers = dict(headers or {})
+        if downloaded:
+            request_headers["Range"] = f"bytes={downloaded}-"
+
+        try:
+            async with client.stream("GET", url, headers=request_headers) as response:
+                if response.status_code == 416 and downloaded:
+                    # Nothing left to fetch; the part file already holds the whole object
+                    total = downloaded
+                else:
+                    response.raise_for_status()
+                    if downloaded and response.status_code != 206:
+                        # Server ignored the Range header; start over
+                        downloaded = 0
+
+                    total = _total_size(response, downloaded)
+                    async with aiofiles.open(part_path, "ab" if downloaded else "wb") as f:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            await f.write(chunk)
+                            downloaded += len(chunk)
+                            if progress:
+                                await _report(progress, downloaded, total)
+
+            if total is not None and downloaded < total:
+                raise httpx.ReadError(f"Connection closed after {downloaded} of {total} bytes")
+
+            os.replace(part_path, output_path)
+            return downloaded
+
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500
+            if not retryable or attempt >= max_retries:
+                part_path.unlink(missing_ok=True)
+                raise Exception(f"Download failed: {e}")
+
+            attempt += 1
+            logger.warning(f"Download of {output_path.name} interrupted at {downloaded} bytes ({e}); resuming (attempt {attempt}/{max_retries})")
+            await asyncio.sleep(min(2 ** attempt, 10))
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+
+def log_progress(label: str, step: int = 25) -> ProgressCallback:
+    """
+    Progress callback that logs every `step` percent (or every 100MB if the size is unknown)
+    """
+    state = {"next": step}
+
+    def report(downloaded: int, total: Optional[int]):
+        if total:
+            percent = downloaded * 100 // total
+            if percent >= state["next"]:
+                logger.info(f"Downloading {label}: {percent}% ({downloaded}/{total} bytes)")
+                state["next"] = (percent // step + 1) * step
+        elif downloaded >= state["next"] * 4 * 1024 * 1024:
+            logger.info(f"Downloading {label}: {downloaded} bytes")
+            state["next"] += step
+
+    return report
+
+
+def _total_size(response: httpx.Response, offset: int) -> Optional[int]:
+    content_range = response.headers.get("content-range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        return offset + int(content_length)
+    return None
+
+
+async def _report(progress: ProgressCallback, downloaded: int, total: Optional[int]):
+    result = progress(downloaded, total)
+    if inspect.isawaitable(result):
+        await result
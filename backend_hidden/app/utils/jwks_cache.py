@@ -0,0 +1,194 @@
+"""
+JWKS cache with background refresh and stale-while-revalidate
+
+A background task refreshes the key set before it expires, so requests never
+wait on the fetch. If Supabase auth is unreachable the last good key set keeps
+being served. Concurrent fetches coalesce into one, and forced refreshes for
+unknown key IDs are rate limited so bogus tokens can't hammer the endpoint.
+
+Code running on the event loop never fetches or waits for the fetch lock:
+it only requests a refresh, which runs in a worker thread, and meanwhile
+gets the cached set (or an error when there is none yet).
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    """Holds the current JWKS and keeps it fresh"""
+
+    def __init__(
+        self,
+        url: str,
+        ttl: int = 3600,
+        min_forced_interval: int = 30,
+        on_refresh: Optional[Callable[[dict], None]] = None
+    ):
+        """
+        Args:
+            url: JWKS endpoint
+            ttl: Seconds before a key set is considered due for refresh
+            min_forced_interval: Minimum seconds between forced refreshes
+            on_refresh: Called with the new key set after each successful fetch
+        """
+        self.url = url
+        self.ttl = ttl
+        self.min_forced_interval = min_forced_interval
+        self.on_refresh = on_refresh
+        self._jwks: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._last_forced = 0.0
+        self._lock = threading.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._pending: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self._fetched_at
+
+    def get(self) -> dict:
+        """
+        Return the current key set
+
+        Without the background refresher, a refresh is requested when
+        nothing has been fetched yet or the set is overdue. Off the event
+        loop it runs right away; on the loop it runs in a worker thread and
+        this call doesn't wait for it. On fetch errors the stale set is
+        returned.
+        """
+        if not self._refreshing() and (self._jwks is None or self.age >= self.ttl):
+            self.request_refresh()
+        if self._jwks is None:
+            raise Exception("JWKS unavailable")
+        return self._jwks
+
+    def refresh(self) -> bool:
+        """
+        Fetch the key set, coalescing with any fetch already in flight
+
+        Returns:
+            True if a fresh key set is in place
+        """
+        started = time.time()
+        with self._lock:
+            # Another caller refreshed while we waited for the lock
+            if self._fetched_at >= started:
+                return True
+
+            try:
+                with httpx.Client(timeout=10.0) as client:
+                    response = client.get(self.url)
+                    response.raise_for_status()
+                    jwks = response.json()
+            except Exception as e:
+                if self._jwks is not None:
+                    logger.warning(f"JWKS refresh failed, serving cached keys ({self.age:.0f}s old): {e}")
+                else:
+                    logger.error(f"JWKS fetch failed: {e}")
+                return False
+
+            self._jwks = jwks
+            self._fetched_at = time.time()
+
+        if self.on_refresh:
+            try:
+                self.on_refresh(jwks)
+            except Exception as e:
+                logger.error(f"JWKS refresh callback failed: {e}")
+
+        logger.info("JWKS cache refreshed")
+        return True
+
+    def refresh_for_unknown_kid(self) -> bool:
+        """
+        Force a refresh because a token used a key ID we don't know
+
+        Rate limited to one forced refresh per min_forced_interval. On the
+        event loop the refresh is only requested, so the token should be
+        rejected now and will verify once the new set is in place.
+
+        Returns:
+            True if a fresh key set is already in place
+        """
+        now = time.time()
+        if now - self._last_forced < self.min_forced_interval:
+            return False
+        self._last_forced = now
+        return self.request_refresh()
+
+    def request_refresh(self) -> bool:
+        """
+        Refresh now, or schedule a refresh when called on the event loop
+
+        On the loop this wakes the background refresher (or starts a one-off
+        fetch in a worker thread) and returns False without waiting.
+
+        Returns:
+            True if a fresh key set is in place
+        """
+        if not _on_event_loop():
+            return self.refresh()
+
+        if self._refreshing():
+            self._wake.set()
+        elif self._pending is None or self._pending.done():
+            self._pending = asyncio.create_task(asyncio.to_thread(self.refresh))
+        return False
+
+    def start(self):
+        """Start the background refresher on the running event loop"""
+        if not self._refreshing():
+            self._wake = asyncio.Event()
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop the background refresher"""
+        if self._refresher is None:
+            return
+        self._refresher.cancel()
+        try:
+            await self._refresher
+        except asyncio.CancelledError:
+            pass
+        self._refresher = None
+
+    def _refreshing(self) -> bool:
+        return self._refresher is not None and not self._refresher.done()
+
+    async def _sleep(self, seconds: float):
+        """Sleep until the next scheduled refresh or until a refresh is requested"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _refresh_loop(self):
+        retry_delay = 5
+        while True:
+            # Refresh at 80% of the TTL so requests never see an expired set
+            due_in = self.ttl * 0.8 - self.age if self._jwks is not None else 0
+            if due_in > 0:
+                await self._sleep(due_in)
+
+            if await asyncio.to_thread(self.refresh):
+                retry_delay = 5
+            else:
+                await self._sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 300)
+
+
+def _on_event_loop() -> bool:
+    """Whether the calling thread is running an event loop"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
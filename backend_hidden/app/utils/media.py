@@ -1,20 +1,41 @@
 """
 Media file utilities for extracting metadata and processing audio/video files
 """
+import hashlib
 import json
+import os
 import subprocess
 import logging
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional, Tuple
 from pathlib import Path
+import aiofiles
+from app.utils.media_exec import run_media_command
 
 logger = logging.getLogger(__name__)
 
 
+# Bytes buffered before each write when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Speech recognition needs nothing above 16 kHz mono
+STT_SAMPLE_RATE = 16000
+
+# STT ingest profiles: codec -> (file extension, FFmpeg codec arguments)
+STT_INGEST_PROFILES = {
+    "flac": (".flac", ["-acodec", "flac"]),
+    "opus": (".ogg", ["-acodec", "libopus", "-b:a", "24k", "-application", "voip"]),
+}
+
+
+class FileTooLargeError(Exception):
+    """Raised when a streamed upload exceeds the allowed size"""
+
+
 class MediaProcessor:
     """Utility class for processing media files with FFprobe and FFmpeg"""
 
     @staticmethod
-    def extract_metadata(file_path: str) -> Dict:
+    async def extract_metadata(file_path: str) -> Dict:
         """
         Extract metadata from audio/video file using FFprobe
 
@@ -52,13 +73,7 @@ class MediaProcessor:
                 file_path
             ]
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30  # 30 second timeout
-            )
+            result = await run_media_command(cmd, timeout=30)  # 30 second timeout
 
             metadata = json.loads(result.stdout)
 
@@ -123,7 +138,7 @@ class MediaProcessor:
             raise
 
     @staticmethod
-    def extract_audio_from_video(video_path: str, output_path: str) -> str:
+    async def extract_audio_from_video(video_path: str, output_path: str) -> str:
         """
         Extract audio track from video file using FFmpeg
 
@@ -180,13 +195,7 @@ class MediaProcessor:
                     output_path
                 ]
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=300  # 5 minute timeout for large videos
-            )
+            result = await run_media_command(cmd, timeout=300)  # 5 minute timeout for large videos
 
             if not Path(output_path).exists():
                 raise Exception("Audio extraction completed but output file not found")
@@ -205,7 +214,46 @@ class MediaProcessor:
             raise
 
     @staticmethod
-    def validate_audio_file(file_path: str) -> bool:
+    async def transcode_for_stt(input_path: str, output_path: str, codec: str = "flac") -> str:
+        """
+        Transcode audio or video to the 16 kHz mono STT ingest profile
+
+        Args:
+            input_path: Audio or video file
+            output_path: Output file, with the extension from STT_INGEST_PROFILES
+            codec: Profile name from STT_INGEST_PROFILES ("flac" or "opus")
+
+        Returns:
+            str: output_path
+        """
+        if codec not in STT_INGEST_PROFILES:
+            raise ValueError(f"Unknown STT ingest codec: {codec}")
+
+        cmd = [
+            'ffmpeg',
+            '-i', input_path,
+            '-vn',  # No video
+            '-ac', '1',  # Mono
+            '-ar', str(STT_SAMPLE_RATE),
+            *STT_INGEST_PROFILES[codec][1],
+            '-y',  # Overwrite output file
+            output_path
+        ]
+
+        try:
+            await run_media_command(cmd, timeout=300)
+            logger.info(f"Transcoded {input_path} for STT ({codec}, {os.path.getsize(output_path)} bytes)")
+            return output_path
+
+        except subprocess.TimeoutExpired:
+            logger.error(f"FFmpeg timeout transcoding {input_path} for STT")
+            raise Exception("STT transcode timeout")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg failed: {e.stderr}")
+            raise Exception(f"Failed to transcode audio for STT: {e.stderr}")
+
+    @staticmethod
+    async def validate_audio_file(file_path: str) -> bool:
         """
         Validate that file is a valid audio/video file with audio stream
 
@@ -219,14 +267,14 @@ class MediaProcessor:
             FileNotFoundError: If file doesn't exist
         """
         try:
-            metadata = MediaProcessor.extract_metadata(file_path)
+            metadata = await MediaProcessor.extract_metadata(file_path)
             return metadata.get('has_audio', False)
         except Exception as e:
             logger.error(f"File validation failed for {file_path}: {e}")
             return False
 
     @staticmethod
-    def get_duration(file_path: str) -> float:
+    async def get_duration(file_path: str) -> float:
         """
         Get duration of media file in seconds
 
@@ -240,7 +288,7 @@ class MediaProcessor:
             FileNotFoundError: If file doesn't exist
             Exception: If duration extraction fails
         """
-        metadata = MediaProcessor.extract_metadata(file_path)
+        metadata = await MediaProcessor.extract_metadata(file_path)
         return metadata.get('duration', 0.0)
 
     @staticmethod
@@ -257,8 +305,6 @@ class MediaProcessor:
         Raises:
             FileNotFoundError: If file doesn't exist
         """
-        import hashlib
-
         if not Path(file_path).exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
@@ -272,3 +318,61 @@ class MediaProcessor:
         logger.debug(f"Calculated checksum for {file_path}: {checksum}")
 
         return checksum
+
+    @staticmethod
+    async def save_stream(
+        chunks: AsyncIterator[bytes],
+        output_path: str,
+        max_size: Optional[int] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> Tuple[int, str]:
+        """
+        Stream data to a file, hashing it as it is written
+
+        Data is written in chunk_size blocks to a temporary file that is
+        renamed into place once complete, so memory use does not depend on
+        the size of the upload and a failed upload never leaves a partial file.
+
+        Args:
+            chunks: Async iterator of data, e.g. request.stream()
+            output_path: Destination file
+            max_size: Maximum accepted size in bytes
+            chunk_size: Bytes buffered per write
+
+        Returns:
+            Tuple[int, str]: Size in bytes and hexadecimal SHA256 checksum
+                (the same value calculate_checksum returns)
+
+        Raises:
+            FileTooLargeError: If the data exceeds max_size
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_name(f".{output_path.name}.part")
+
+        sha256_hash = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLargeError(f"Upload exceeds maximum size of {max_size} bytes")
+
+                    sha256_hash.update(chunk)
+                    buffer += chunk
+                    if len(buffer) >= chunk_size:
+                        await f.write(bytes(buffer))
+                        buffer.clear()
+
+                if buffer:
+                    await f.write(bytes(buffer))
+
+            os.replace(temp_path, output_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        return size, sha256_hash.hexdigest()
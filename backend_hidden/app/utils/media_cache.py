@@ -0,0 +1,233 @@
+"""
+Worker-local, content-addressed cache for downloaded and derived media
+
+Entries are keyed by the storage path plus the object's version (ETag or
+checksum) and a variant name, so raw downloads ("raw") and artifacts derived
+from them (e.g. extracted WAV) are cached separately and a re-uploaded object
+never hits a stale entry.
+
+Safe across tasks and worker processes sharing the cache directory:
+    - each key is filled under an exclusive file lock, so only one process
+      downloads or derives it while the others wait and then reuse it;
+      tasks in the same process queue on an asyncio.Lock first
+    - file locks are taken with LOCK_NB and polled from the event loop, so
+      waiters never tie up executor threads the lock holder needs
+    - lock files are removed on release, so the lock directory only holds
+      locks in use
+    - entries are written to a temporary file and renamed into place
+    - callers get a hard link (or copy) of the entry, so eviction never
+      removes a file that a task is still using
+
+The cache is capped at media_cache_size_mb; least recently used entries are
+evicted once it grows past that.
+"""
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between attempts to take a key's file lock
+LOCK_POLL_MAX_SECONDS = 0.25
+
+
+class MediaCache:
+    """Byte-capped LRU cache of media files on local disk"""
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Args:
+            root: Cache directory (may be shared by several worker processes)
+            max_bytes: Total size the cache is trimmed back to after each insert
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.objects_dir = self.root / "objects"
+        self.locks_dir = self.root / "locks"
+        self.tmp_dir = self.root / "tmp"
+        for directory in (self.objects_dir, self.locks_dir, self.tmp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        # Per-key locks for tasks in this process; entries go away once unused
+        self._local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def make_key(source: str, version: str, variant: str = "raw") -> str:
+        """Cache key for one variant of one version of a stored object"""
+        return hashlib.sha256(f"{source}\0{version}\0{variant}".encode()).hexdigest()
+
+    def entry_path(self, key: str, suffix: str = "") -> Path:
+        return self.objects_dir / key[:2] / f"{key}{suffix}"
+
+    async def fetch(
+        self,
+        key: str,
+        output_path: str,
+        producer: Callable[[str], Awaitable],
+        suffix: str = ""
+    ) -> bool:
+        """
+        Place the cached file for `key` at output_path, producing it on a miss
+
+        Args:
+            key: Cache key from make_key
+            output_path: Where the caller wants the file (replaced if it exists)
+            producer: Coroutine function that writes the file to the path it is given
+            suffix: File extension for the cache entry
+
+        Returns:
+            bool: True on a cache hit
+        """
+        entry = self.entry_path(key, suffix)
+        local_lock = self._local_locks.get(key)
+        if local_lock is None:
+            local_lock = self._local_locks[key] = asyncio.Lock()
+
+        async with local_lock:
+            lock_file = await self._lock_key(key)
+            try:
+                if entry.exists():
+                    os.utime(entry)
+                    await asyncio.to_thread(self._materialize, entry, output_path)
+                    logger.info(f"Media cache hit: {entry.name}")
+                    return True
+
+                temp_path = self.tmp_dir / f"{uuid.uuid4().hex}{suffix}"
+                try:
+                    await producer(str(temp_path))
+                    entry.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(temp_path, entry)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+
+                await asyncio.to_thread(self._materialize, entry, output_path)
+                logger.info(f"Media cache stored: {entry.name} ({entry.stat().st_size} bytes)")
+            finally:
+                self._unlock_key(key, lock_file)
+
+        await asyncio.to_thread(self.evict)
+        return False
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        with self._try_lock(self.locks_dir / ".evict") as acquired:
+            # Another process is already trimming the cache
+            if not acquired:
+                return
+
+            entries = []
+            total = 0
+            for path in self.objects_dir.glob("*/*"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                key = path.name.split(".", 1)[0]
+                # Skip entries another task is filling or linking right now
+                lock_file = self._try_lock_key(key)
+                if lock_file is None:
+                    continue
+                try:
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    logger.info(f"Media cache evicted: {path.name} ({size} bytes)")
+                finally:
+                    self._unlock_key(key, lock_file)
+
+    def _lock_path(self, key: str) -> Path:
+        return self.locks_dir / f"{key}.lock"
+
+    async def _lock_key(self, key: str):
+        """Wait, without holding a thread, until this process holds the key's file lock"""
+        delay = 0.01
+        while True:
+            lock_file = self._try_lock_key(key)
+            if lock_file is not None:
+                return lock_file
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOCK_POLL_MAX_SECONDS)
+
+    def _try_lock_key(self, key: str):
+        """
+        Take the key's file lock if it is free
+
+        Returns:
+            The open lock file (pass it to _unlock_key), or None if another holder has it
+        """
+        path = self._lock_path(key)
+        lock_file = open(path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # The holder we waited on may have unlinked the file; only a lock on
+            # the file currently at `path` counts
+            if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                return lock_file
+        except (BlockingIOError, FileNotFoundError):
+            pass
+        lock_file.close()
+        return None
+
+    def _unlock_key(self, key: str, lock_file):
+        """Remove the key's lock file and release the lock"""
+        try:
+            self._lock_path(key).unlink(missing_ok=True)
+        finally:
+            lock_file.close()
+
+    @contextmanager
+    def _try_lock(self, path: Path):
+        with open(path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+
+    def _materialize(self, entry: Path, output_path: str):
+        """Hard-link the entry to output_path, copying if linking isn't possible"""
+        output_path = Path(output_path)
+        temp_link = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            os.link(entry, temp_link)
+        except OSError:
+            shutil.copyfile(entry, temp_link)
+        os.replace(temp_link, output_path)
+
+
+# Global media cache instance
+_media_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> Optional[MediaCache]:
+    """Get the worker's media cache, or None when caching is disabled"""
+    global _media_cache
+
+    if settings.media_cache_size_mb <= 0:
+        return None
+
+    if _media_cache is None:
+        root = settings.media_cache_dir or os.path.join(tempfile.gettempdir(), "ytdubber-media-cache")
+        _media_cache = MediaCache(root, settings.media_cache_size_mb * 1024 * 1024)
+        logger.info(f"Media cache at {root} ({settings.media_cache_size_mb}MB)")
+
+    return _media_cache
@@ -0,0 +1,92 @@
+"""
+Async execution of FFmpeg/FFprobe commands
+
+Media commands run through asyncio.create_subprocess_exec so they never block
+the event loop. A process-wide semaphore caps how many run at once, timeouts
+kill the child process, and cancelling the awaiting task kills it too.
+
+Failures raise the same exceptions as subprocess.run(check=True, timeout=...)
+(CalledProcessError / TimeoutExpired), so callers keep their existing error
+handling.
+"""
+import asyncio
+import logging
+import subprocess
+from typing import List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Created lazily so it binds to the running event loop
+_media_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_media_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent media processes"""
+    global _media_semaphore
+
+    if _media_semaphore is None:
+        _media_semaphore = asyncio.Semaphore(settings.media_max_processes)
+
+    return _media_semaphore
+
+
+async def _kill_process(process: asyncio.subprocess.Process):
+    """Kill a child process and reap it"""
+    if process.returncode is not None:
+        return
+    try:
+        process.kill()
+    except ProcessLookupError:
+        return
+    await process.wait()
+
+
+async def run_media_command(
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    check: bool = True
+) -> subprocess.CompletedProcess:
+    """
+    Run an FFmpeg/FFprobe command without blocking the event loop
+
+    Args:
+        cmd: Command and arguments, e.g. ["ffprobe", "-v", "quiet", path]
+        timeout: Seconds before the process is killed (default: settings.media_command_timeout)
+        check: Raise CalledProcessError on a non-zero exit code
+
+    Returns:
+        CompletedProcess with decoded stdout and stderr
+
+    Raises:
+        subprocess.TimeoutExpired: If the command exceeds the timeout
+        subprocess.CalledProcessError: If check is set and the command fails
+    """
+    timeout = timeout or settings.media_command_timeout
+
+    async with get_media_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill_process(process)
+            logger.error(f"{cmd[0]} timed out after {timeout}s")
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        except asyncio.CancelledError:
+            # Don't leave FFmpeg running when the job that started it is cancelled
+            await _kill_process(process)
+            raise
+
+    stdout = stdout.decode(errors="replace")
+    stderr = stderr.decode(errors="replace")
+
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
@@ -3,6 +3,7 @@ Monitoring and logging utilities for security events
 """
 import logging
 import json
+import os
 import time
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
@@ -10,6 +11,8 @@ from fastapi import Request, Response
 from app.config import settings
 import hashlib
 
+os.makedirs("logs", exist_ok=True)
+
 # Configure security logger
 security_logger = logging.getLogger("security")
 security_logger.setLevel(logging.INFO)
@@ -202,6 +205,7 @@ class RequestMetrics:
     def __init__(self):
         self.request_count = 0
         self.error_count = 0
+        self.in_flight = 0  # Maintained by APIMiddleware
         self.response_times = []
         self.start_time = time.time()
     
@@ -234,6 +238,7 @@ class RequestMetrics:
         return {
             "uptime_seconds": uptime,
             "total_requests": self.request_count,
+            "in_flight": self.in_flight,
             "error_count": self.error_count,
             "error_rate": error_rate,
             "average_response_time": avg_response_time,
@@ -0,0 +1,40 @@
+"""
+Async request budget for rate-limited provider APIs
+"""
+import asyncio
+import time
+
+
+class RateBudget:
+    """
+    Token bucket allowing `requests_per_minute` calls per minute
+
+    Callers await acquire() before each request; when the budget is spent
+    they wait until it refills instead of hitting the provider's rate limit.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        """
+        Args:
+            requests_per_minute: Sustained request rate; 0 or less disables the budget
+        """
+        self.requests_per_minute = requests_per_minute
+        self._tokens = float(max(requests_per_minute, 0))
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        if self.requests_per_minute <= 0:
+            return
+
+        rate = self.requests_per_minute / 60.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.requests_per_minute, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / rate)
@@ -0,0 +1,69 @@
+"""
+Cache of verified JWT claims
+
+Clients poll job status with the same bearer token every few seconds, so the
+RS256 signature check is repeated on identical input. Verified claims are
+kept in a bounded LRU keyed by the token's SHA-256 hash (raw tokens are never
+stored) until the token's `exp`.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+class VerifiedTokenCache:
+    """Bounded, thread-safe LRU of verified token payloads"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return cached claims for a token, or None if missing or expired"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            payload, kid, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token: str, payload: dict, kid: str):
+        """Cache verified claims until the token's exp claim"""
+        expires_at = payload.get('exp')
+        if not expires_at or expires_at <= time.time() or self.max_size <= 0:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, kid, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def retain_kids(self, kids: Iterable[str]):
+        """Drop tokens signed by keys that are no longer published"""
+        kids = set(kids)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[1] not in kids]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
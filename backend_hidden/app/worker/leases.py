@@ -0,0 +1,124 @@
+"""
+Lease helpers for claiming language tasks across multiple worker processes
+"""
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def generate_worker_id() -> str:
+    """Build an identifier that is unique per worker process"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def is_lease_expired(lease_expires_at, now: Optional[datetime] = None) -> bool:
+    """
+    Check whether a lease timestamp is in the past
+
+    Accepts datetimes or ISO strings (as returned by PostgREST). Naive values
+    are treated as UTC. A missing lease counts as expired.
+    """
+    if not lease_expires_at:
+        return True
+
+    if isinstance(lease_expires_at, str):
+        lease_expires_at = datetime.fromisoformat(lease_expires_at)
+    if lease_expires_at.tzinfo is None:
+        lease_expires_at = lease_expires_at.replace(tzinfo=timezone.utc)
+
+    now = now or datetime.now(timezone.utc)
+    return lease_expires_at <= now
+
+
+def is_task_claimable(task: dict) -> bool:
+    """
+    Check whether a language task row can be claimed by a worker
+
+    Pending and processing tasks are claimable unless another worker holds a
+    live lease. A processing task with an expired lease means the worker that
+    owned it died mid-task; one nobody holds was released (e.g. on shutdown)
+    or was left processing before leases existed.
+    """
+    if task.get('status') not in ('pending', 'processing'):
+        return False
+    return not task.get('claimed_by') or is_lease_expired(task.get('lease_expires_at'))
+
+
+async def _maybe_await(result):
+    """Await the result of a callback if it returned an awaitable"""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class TaskLease:
+    """
+    Async context manager that keeps claimed task leases alive while they run
+
+    The renew callable is invoked every third of the lease period and must
+    return a truthy value while the lease is still held. The release callable
+    runs once on exit. When a renewal reports the lease as lost, on_lost is
+    called so the owner can stop the work another worker may now reclaim.
+    Any of them may be a coroutine function.
+    """
+
+    def __init__(
+        self,
+        renew: Callable[[], Union[bool, Awaitable[bool]]],
+        release: Callable[[], Union[None, Awaitable[None]]],
+        lease_seconds: int,
+        description: str = "task",
+        on_lost: Optional[Callable[[], Union[None, Awaitable[None]]]] = None
+    ):
+        self._renew = renew
+        self._release = release
+        self._on_lost = on_lost
+        self.renew_interval = max(lease_seconds / 3, 1)
+        self.description = description
+        self.lost = False
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        self._renewer = asyncio.create_task(self._renew_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._renewer.cancel()
+        try:
+            await self._renewer
+        except asyncio.CancelledError:
+            pass
+
+        try:
+            await _maybe_await(self._release())
+        except Exception as e:
+            logger.error(f"Error releasing lease for {self.description}: {e}")
+        return False
+
+    async def _renew_loop(self):
+        """Renew the lease until cancelled or until it is lost"""
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                renewed = await _maybe_await(self._renew())
+            except Exception as e:
+                # Transient failure - try again on the next tick before the lease runs out
+                logger.error(f"Error renewing lease for {self.description}: {e}")
+                continue
+
+            if not renewed:
+                self.lost = True
+                logger.warning(f"Lease lost for {self.description}; another worker may reclaim it")
+                if self._on_lost:
+                    try:
+                        await _maybe_await(self._on_lost())
+                    except Exception as e:
+                        logger.error(f"Error abandoning {self.description} after lease loss: {e}")
+                return
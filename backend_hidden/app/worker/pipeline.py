@@ -0,0 +1,175 @@
+"""
+Staged processing pipeline for the background worker
+
+Each stage has its own pool of worker coroutines and reads from a bounded
+asyncio queue. A stage handler returns the item for the next stage, a list
+of items (fan-out), or None when the item is finished. When a downstream
+queue is full the upstream worker blocks on put(), so a slow stage pushes
+back on everything before it instead of piling up work in memory.
+
+Items can be abandoned mid-flight (e.g. when a worker loses its lease):
+items that is_cancelled reports as cancelled are skipped by every later
+stage, and cancel_items() cancels the handlers already running for them.
+
+Every item that leaves the pipeline early - because a handler raised or
+because it was cancelled - is passed to on_drop, so owners can always
+account for it.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """A pipeline stage: an async handler plus its concurrency limit"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Any]],
+        concurrency: int = 1
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(concurrency, 1)
+
+
+class Pipeline:
+    """Runs items through a sequence of stages connected by bounded queues"""
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 16,
+        on_error: Optional[Callable[[Stage, Any, Exception], Awaitable[None]]] = None,
+        is_cancelled: Optional[Callable[[Any], bool]] = None,
+        on_drop: Optional[Callable[[Stage, Any], None]] = None
+    ):
+        """
+        Args:
+            stages: Stages in processing order
+            queue_size: Capacity of the queue in front of each stage
+            on_error: Called when a handler raises; the item is then dropped
+            is_cancelled: Returns True for items that should be dropped instead
+                of processed further
+            on_drop: Called for every dropped item, after on_error and even if
+                on_error itself failed
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.is_cancelled = is_cancelled
+        self.on_drop = on_drop
+        self.queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._in_flight: Dict[asyncio.Task, Any] = {}
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """Create the stage queues and worker coroutines"""
+        if self.running:
+            return
+
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        for index, stage in enumerate(self.stages):
+            for worker_number in range(stage.concurrency):
+                self._workers.append(asyncio.create_task(
+                    self._run_stage(index),
+                    name=f"pipeline-{stage.name}-{worker_number}"
+                ))
+
+        logger.info(
+            "Pipeline started: " +
+            ", ".join(f"{stage.name} x{stage.concurrency}" for stage in self.stages)
+        )
+
+    async def submit(self, item: Any):
+        """Queue an item for the first stage, waiting while that stage is full"""
+        await self.queues[0].put(item)
+
+    async def stop(self):
+        """Cancel all stage workers; queued items are discarded"""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._stopping = False
+
+    def cancel_items(self):
+        """Cancel the running handlers of items that is_cancelled now reports as cancelled"""
+        for handler, item in list(self._in_flight.items()):
+            if self._is_cancelled(item):
+                handler.cancel()
+
+    def stats(self) -> dict:
+        """Queue depth per stage, for logging and monitoring"""
+        return {stage.name: queue.qsize() for stage, queue in zip(self.stages, self.queues)}
+
+    async def _run_stage(self, index: int):
+        stage = self.stages[index]
+        queue = self.queues[index]
+        next_queue = self.queues[index + 1] if index + 1 < len(self.queues) else None
+
+        while True:
+            item = await queue.get()
+            dropped = True
+            try:
+                if self._is_cancelled(item):
+                    logger.info(f"Pipeline stage '{stage.name}' skipped a cancelled item")
+                    continue
+
+                # Run the handler as its own task so cancel_items() can stop it without stopping this worker
+                handler = asyncio.ensure_future(stage.handler(item))
+                self._in_flight[handler] = item
+                try:
+                    result = await handler
+                except asyncio.CancelledError:
+                    if self._stopping or not handler.cancelled() or not self._is_cancelled(item):
+                        raise
+                    logger.info(f"Pipeline stage '{stage.name}' cancelled an abandoned item")
+                    continue
+                except Exception as e:
+                    logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                    await self._report_error(stage, item, e)
+                    continue
+                finally:
+                    self._in_flight.pop(handler, None)
+                dropped = False
+            finally:
+                if dropped:
+                    self._drop(stage, item)
+                queue.task_done()
+
+            if result is None or next_queue is None:
+                continue
+
+            outputs = result if isinstance(result, list) else [result]
+            for output in outputs:
+                # Blocks while the next stage is saturated (backpressure)
+                await next_queue.put(output)
+
+    def _is_cancelled(self, item: Any) -> bool:
+        return bool(self.is_cancelled and self.is_cancelled(item))
+
+    def _drop(self, stage: Stage, item: Any):
+        if not self.on_drop:
+            return
+        try:
+            self.on_drop(stage, item)
+        except Exception as e:
+            logger.error(f"Drop handler for stage '{stage.name}' failed: {e}")
+
+    async def _report_error(self, stage: Stage, item: Any, error: Exception):
+        if not self.on_error:
+            return
+        try:
+            await self.on_error(stage, item, error)
+        except Exception as e:
+            logger.error(f"Error handler for stage '{stage.name}' failed: {e}")
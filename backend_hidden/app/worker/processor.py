@@ -5,7 +5,6 @@ import asyncio
 import logging
 import tempfile
 import os
-import subprocess
 from typing import List
 from app.database import SessionLocal
 from app.models import DubbingJob, LanguageTask
@@ -13,6 +12,10 @@ from app.schemas import JobStatus, LanguageTaskStatus
 from app.services.job_service import JobService
 from app.services.ai_service import AIService
 from app.services.storage_service import StorageService
+from app.utils.downloads import log_progress
+from app.services.local_db_service import LocalDBService
+from app.services.job_notifier import get_job_notifier
+from app.worker.leases import TaskLease, generate_worker_id
 from app.config import settings
 import uuid
 
@@ -26,27 +29,33 @@ class JobProcessor:
         self.job_service = JobService()
         self.ai_service = AIService()
         self.storage_service = StorageService()
+        self.db_service = LocalDBService()
         self.running = False
         self.max_concurrent_jobs = settings.max_concurrent_jobs
-        self.poll_interval = settings.worker_poll_interval
+        self.poll_interval = settings.worker_poll_interval  # Fallback when no notification arrives
+        self.notifier = get_job_notifier()
+        self.worker_id = generate_worker_id()
+        self.lease_seconds = settings.worker_lease_seconds
     
     async def start(self):
         """Start the background worker"""
         self.running = True
-        logger.info("Job processor started")
+        logger.info(f"Job processor started (worker {self.worker_id})")
         
         try:
             while self.running:
                 await self.process_pending_jobs()
-                await asyncio.sleep(self.poll_interval)
+                await self.notifier.wait(self.poll_interval)
         except Exception as e:
             logger.error(f"Error in job processor main loop: {e}")
         finally:
+            await self.notifier.close()
             logger.info("Job processor stopped")
     
     async def stop(self):
         """Stop the background worker"""
         self.running = False
+        self.notifier.wake()
         logger.info("Job processor stopping...")
     
     async def process_pending_jobs(self):
@@ -102,22 +111,65 @@ class JobProcessor:
                 )
                 return
             
-            # Process each language task
-            for task in language_tasks:
-                if not self.running:
-                    break
-                
-                await self.process_language_task(job, task, db)
+            # Claim the tasks so other worker processes skip them
+            claimed = self.db_service.claim_language_tasks(job_id, self.worker_id, self.lease_seconds)
+            claimed_ids = [task["id"] for task in claimed]
+            
+            if not claimed_ids:
+                logger.info(f"No claimable tasks for job {job_id}")
+                return
+            
+            claimed_tasks = [task for task in language_tasks if task.id in claimed_ids]
+            
+            current_task = None
+            
+            def abandon():
+                # Another worker may reclaim the tasks now; stop working on them
+                if current_task is not None:
+                    current_task.cancel()
+            
+            lease = TaskLease(
+                renew=lambda: self.db_service.renew_language_task_leases(claimed_ids, self.worker_id, self.lease_seconds),
+                release=lambda: self.db_service.release_language_tasks(claimed_ids, self.worker_id),
+                lease_seconds=self.lease_seconds,
+                description=f"job {job_id} ({len(claimed_ids)} tasks)",
+                on_lost=abandon
+            )
+            
+            # Process each claimed language task
+            async with lease:
+                for task in claimed_tasks:
+                    if not self.running or lease.lost:
+                        break
+                    
+                    current_task = asyncio.create_task(self.process_language_task(job, task, db))
+                    try:
+                        await current_task
+                    except asyncio.CancelledError:
+                        if not lease.lost:
+                            raise
+            
+            if lease.lost:
+                logger.warning(f"Abandoned job {job_id} after losing its task leases")
+                return
             
             # Check if all tasks are complete
+            db.expire_all()
             completed_tasks = db.query(LanguageTask).filter(
                 LanguageTask.job_id == job_id,
                 LanguageTask.status == LanguageTaskStatus.COMPLETE
             ).count()
+            unfinished_tasks = db.query(LanguageTask).filter(
+                LanguageTask.job_id == job_id,
+                LanguageTask.status.notin_([LanguageTaskStatus.COMPLETE, LanguageTaskStatus.ERROR])
+            ).count()
             
             total_tasks = len(language_tasks)
             
-            if completed_tasks == total_tasks:
+            if unfinished_tasks:
+                # Other workers still hold some of this job's tasks; the last one finishes the job
+                logger.info(f"Job {job_id} has {unfinished_tasks} tasks still in progress")
+            elif completed_tasks == total_tasks:
                 await self.job_service.update_job_status(
                     job_id, JobStatus.COMPLETE, "All language tasks completed successfully", db
                 )
@@ -146,7 +198,7 @@ class JobProcessor:
         try:
             # Update task status to processing
             await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.PROCESSING, 0, "Starting language processing...", db=db
+                task_id, LanguageTaskStatus.PROCESSING, 0, "Starting language processing...", db=db, worker_id=self.worker_id
             )
             
             # Download voice track from storage
@@ -154,25 +206,17 @@ class JobProcessor:
             if not voice_track_path:
                 raise Exception("Failed to download voice track")
             
-            # Process the media file (extract audio if it's video)
-            await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.PROCESSING, 10, "Processing media file...", db=db
-            )
-            
-            processed_audio_path = await self.process_media_file(voice_track_path)
-            
-            # Process the audio file
             await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.PROCESSING, 25, "Transcribing audio...", db=db
+                task_id, LanguageTaskStatus.PROCESSING, 25, "Transcribing audio...", db=db, worker_id=self.worker_id
             )
             
-            # Transcribe audio
+            # Transcribe audio (audio and video are transcoded to the STT ingest profile first)
             transcription_result = await self.ai_service.transcribe_audio(
-                processed_audio_path, "en"  # Assuming source language is English
+                voice_track_path, "en"  # Assuming source language is English
             )
             
             await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.PROCESSING, 50, "Translating transcript...", db=db
+                task_id, LanguageTaskStatus.PROCESSING, 50, "Translating transcript...", db=db, worker_id=self.worker_id
             )
             
             # Translate transcript
@@ -183,50 +227,45 @@ class JobProcessor:
             )
             
             await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.PROCESSING, 75, "Generating speech...", db=db
+                task_id, LanguageTaskStatus.PROCESSING, 75, "Generating speech...", db=db, worker_id=self.worker_id
             )
             
-            # Generate speech
-            speech_audio = await self.ai_service.generate_speech(
-                translated_text, language_code
+            # Generate speech straight into a temp file
+            speech_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+            speech_temp.close()
+            speech_path = speech_temp.name
+            await self.ai_service.generate_speech_to_file(
+                translated_text, language_code, speech_path
             )
 
             # Mix with background track if present
-            final_audio = speech_audio
+            final_audio_path = speech_path
             if job.background_track_url:
                 try:
                     await self.job_service.update_language_task_status(
-                        task_id, LanguageTaskStatus.PROCESSING, 85, "Mixing with background audio...", db=db
+                        task_id, LanguageTaskStatus.PROCESSING, 85, "Mixing with background audio...", db=db, worker_id=self.worker_id
                     )
 
                     # Download background track
                     background_path = await self.download_background_track(job)
 
                     if background_path:
-                        # Save speech audio to temp file
-                        speech_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-                        speech_temp.write(speech_audio)
-                        speech_temp.close()
-
                         # Create output file for mixed audio
                         mixed_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
                         mixed_temp.close()
 
                         # Mix the audio tracks
-                        mixed_path = await self.ai_service.mix_audio_tracks(
-                            voice_track_path=speech_temp.name,
-                            background_track_path=background_path,
-                            output_path=mixed_temp.name
-                        )
-
-                        # Read mixed audio
-                        with open(mixed_path, 'rb') as f:
-                            final_audio = f.read()
-
-                        # Clean up temp files
-                        os.remove(speech_temp.name)
-                        os.remove(background_path)
-                        os.remove(mixed_temp.name)
+                        try:
+                            final_audio_path = await self.ai_service.mix_audio_tracks(
+                                voice_track_path=speech_path,
+                                background_track_path=background_path,
+                                output_path=mixed_temp.name
+                            )
+                        except Exception:
+                            os.remove(mixed_temp.name)
+                            raise
+                        finally:
+                            os.remove(background_path)
 
                         logger.info(f"Successfully mixed voice with background audio")
                     else:
@@ -235,10 +274,10 @@ class JobProcessor:
                 except Exception as e:
                     logger.error(f"Error mixing audio tracks: {e}")
                     logger.warning("Using voice-only audio due to mixing error")
-                    final_audio = speech_audio
+                    final_audio_path = speech_path
 
             await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.PROCESSING, 90, "Uploading generated audio...", db=db
+                task_id, LanguageTaskStatus.PROCESSING, 90, "Uploading generated audio...", db=db, worker_id=self.worker_id
             )
 
             # Save generated audio to storage
@@ -247,13 +286,18 @@ class JobProcessor:
                 job.user_id, job_id, language_code, "audio", audio_filename
             )
 
-            # Upload audio bytes to Supabase Storage
+            # Upload the audio file to Supabase Storage
             logger.info(f"Uploading generated audio to: {audio_path}")
-            public_url = await self.storage_service.upload_file(
-                file_path=audio_path,
-                file_data=final_audio,
-                content_type="audio/mpeg"
-            )
+            try:
+                public_url = await self.storage_service.upload_from_path(
+                    file_path=audio_path,
+                    local_path=final_audio_path,
+                    content_type="audio/mpeg"
+                )
+            finally:
+                for temp_path in {speech_path, final_audio_path}:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
 
             logger.info(f"Generated audio uploaded successfully to: {public_url}")
 
@@ -261,21 +305,19 @@ class JobProcessor:
             await self.job_service.update_language_task_status(
                 task_id, LanguageTaskStatus.COMPLETE, 100,
                 "Language processing completed successfully",
-                download_url=public_url, db=db
+                download_url=public_url, db=db, worker_id=self.worker_id
             )
             
             # Clean up temporary files
             if os.path.exists(voice_track_path):
                 os.remove(voice_track_path)
-            if processed_audio_path != voice_track_path and os.path.exists(processed_audio_path):
-                os.remove(processed_audio_path)
             
             logger.info(f"Language task {task_id} completed successfully")
             
         except Exception as e:
             logger.error(f"Error processing language task {task_id}: {e}")
             await self.job_service.update_language_task_status(
-                task_id, LanguageTaskStatus.ERROR, 0, f"Language processing failed: {str(e)}", db=db
+                task_id, LanguageTaskStatus.ERROR, 0, f"Language processing failed: {str(e)}", db=db, worker_id=self.worker_id
             )
     
     async def download_voice_track(self, job: DubbingJob) -> str:
@@ -286,16 +328,19 @@ class JobProcessor:
 
             logger.info(f"Downloading voice track from: {job.voice_track_url}")
 
-            # Download file from Supabase Storage
-            file_data = await self.storage_service.download_file(job.voice_track_url)
-
             # Determine file extension from URL
             file_ext = os.path.splitext(job.voice_track_url)[1] or ".mp3"
 
-            # Save to temporary file
+            # Stream the file from Supabase Storage straight into a temporary file
             temp_file = tempfile.NamedTemporaryFile(suffix=file_ext, delete=False)
-            temp_file.write(file_data)
             temp_file.close()
+            try:
+                await self.storage_service.download_to_file(
+                    job.voice_track_url, temp_file.name, progress=log_progress("voice track")
+                )
+            except Exception:
+                os.remove(temp_file.name)
+                raise
 
             logger.info(f"Downloaded voice track to: {temp_file.name}")
             return temp_file.name
@@ -312,16 +357,19 @@ class JobProcessor:
 
             logger.info(f"Downloading background track from: {job.background_track_url}")
 
-            # Download file from Supabase Storage
-            file_data = await self.storage_service.download_file(job.background_track_url)
-
             # Determine file extension from URL
             file_ext = os.path.splitext(job.background_track_url)[1] or ".mp3"
 
-            # Save to temporary file
+            # Stream the file from Supabase Storage straight into a temporary file
             temp_file = tempfile.NamedTemporaryFile(suffix=file_ext, delete=False)
-            temp_file.write(file_data)
             temp_file.close()
+            try:
+                await self.storage_service.download_to_file(
+                    job.background_track_url, temp_file.name, progress=log_progress("background track")
+                )
+            except Exception:
+                os.remove(temp_file.name)
+                raise
 
             logger.info(f"Downloaded background track to: {temp_file.name}")
             return temp_file.name
@@ -329,60 +377,6 @@ class JobProcessor:
         except Exception as e:
             logger.error(f"Error downloading background track: {e}", exc_info=True)
             return None
-    
-    async def extract_audio_from_video(self, video_path: str) -> str:
-        """Extract audio from MP4 video file using FFmpeg"""
-        try:
-            # Create temporary audio file
-            audio_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            audio_file.close()
-            
-            # Use FFmpeg to extract audio from video
-            cmd = [
-                "ffmpeg",
-                "-i", video_path,
-                "-vn",  # No video
-                "-acodec", "pcm_s16le",  # Audio codec
-                "-ar", "44100",  # Sample rate
-                "-ac", "2",  # Stereo
-                "-y",  # Overwrite output file
-                audio_file.name
-            ]
-            
-            logger.info(f"Extracting audio from video: {video_path}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
-                raise Exception(f"Failed to extract audio from video: {result.stderr}")
-            
-            logger.info(f"Successfully extracted audio to: {audio_file.name}")
-            return audio_file.name
-            
-        except subprocess.TimeoutExpired:
-            logger.error("FFmpeg extraction timed out")
-            raise Exception("Video processing timed out")
-        except Exception as e:
-            logger.error(f"Error extracting audio from video: {e}")
-            raise Exception(f"Failed to extract audio from video: {str(e)}")
-    
-    async def process_media_file(self, file_path: str) -> str:
-        """Process media file (audio or video) and return audio file path"""
-        try:
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext == '.mp4':
-                # Extract audio from video
-                logger.info(f"Processing MP4 video file: {file_path}")
-                return await self.extract_audio_from_video(file_path)
-            else:
-                # File is already audio, return as-is
-                logger.info(f"Processing audio file: {file_path}")
-                return file_path
-                
-        except Exception as e:
-            logger.error(f"Error processing media file: {e}")
-            raise Exception(f"Failed to process media file: {str(e)}")
 
 
 async def main():
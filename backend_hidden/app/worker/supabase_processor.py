@@ -1,102 +1,255 @@
 #!/usr/bin/env python3
 """
 Supabase-based job processor for handling dubbing jobs
+
+Jobs run through a staged pipeline (see app/worker/pipeline.py):
+
+    download -> transcribe -> translate -> synthesize -> mix -> upload
+
+The first two stages work on a whole job; transcribe fans the job out into
+one item per language task. Every stage has its own worker pool sized by
+settings.pipeline_stage_concurrency, so slow network stages (translate, TTS)
+and FFmpeg-bound stages (mix) can overlap across jobs and languages.
 """
 import asyncio
 import logging
 import os
+import shutil
 import tempfile
 from pathlib import Path
 from typing import List
 from app.services.supabase_job_service import SupabaseJobService
-from app.services.supabase_db_service import SupabaseDBService
+from app.services.supabase_db_service import AsyncSupabaseDBService
 from app.services.ai_service import AIService
 from app.services.storage_service import StorageService
+from app.services.job_notifier import get_job_notifier
+from app.services.clients import close_client_registry
 from app.auth import SupabaseStorageService
+from app.utils.downloads import log_progress
 from app.config import settings
 from app.schemas import LanguageTaskStatus
+from app.worker.leases import TaskLease, generate_worker_id, is_task_claimable
+from app.worker.pipeline import Pipeline, Stage
 import uuid
 
 logger = logging.getLogger(__name__)
 
 
+class JobContext:
+    """Job-level state shared by all language items of a job in the pipeline"""
+    
+    def __init__(self, job, tasks):
+        self.job = job
+        self.tasks = tasks
+        self.voice_track_path = None
+        self.background_track_path = None
+        self.transcribed_text = None
+        self.cancelled = False
+        self._remaining = len(tasks)
+        self._finished = asyncio.Event()
+    
+    def task_done(self):
+        """Mark one language item as finished (completed or failed)"""
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._finished.set()
+    
+    def fail(self):
+        """Finish the job early because a job-level stage failed"""
+        self._remaining = 0
+        self._finished.set()
+    
+    def cancel(self):
+        """Abandon the job; the pipeline drops its remaining items"""
+        self.cancelled = True
+        self.fail()
+    
+    async def wait(self):
+        """Wait until every language item of the job has left the pipeline"""
+        await self._finished.wait()
+    
+    def cleanup(self):
+        """Remove the job's temporary voice and background files"""
+        for temp_path in (self.voice_track_path, self.background_track_path):
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class LanguageItem:
+    """A single language task moving through the per-language stages"""
+    
+    def __init__(self, context: JobContext, task):
+        self.context = context
+        self.task = task
+        self.translated_text = None
+        self.speech_path = None
+        self.final_audio_path = None
+    
+    @property
+    def job(self):
+        return self.context.job
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.context.cancelled
+    
+    def cleanup(self):
+        """Remove the item's temporary speech and mixed audio files"""
+        for temp_path in {self.speech_path, self.final_audio_path}:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
 class SupabaseJobProcessor:
     """Background job processor for dubbing jobs using Supabase REST API"""
     
     def __init__(self):
         self.job_service = SupabaseJobService()
-        self.db_service = SupabaseDBService()
+        self.db_service = AsyncSupabaseDBService()
         self.ai_service = AIService()
         self.storage_service = StorageService()
         self.supabase_storage = SupabaseStorageService()
         self.bucket = settings.storage_bucket
         self.running = False
-        self.poll_interval = 5  # Check every 5 seconds
+        self.notifier = get_job_notifier()
+        self.poll_interval = settings.worker_poll_interval  # Fallback when no notification arrives
+        self.worker_id = generate_worker_id()
+        self.lease_seconds = settings.worker_lease_seconds
+        self.batch_size = settings.worker_batch_size
+        
+        # Jobs admitted into the pipeline at once; claiming stops while all slots are busy
+        self.max_concurrent_jobs = settings.max_concurrent_jobs
+        self.job_slots = None
+        self.active_jobs = set()
+        
+        self.stage_concurrency = settings.get_pipeline_stage_concurrency()
+        self.pipeline = Pipeline(
+            [
+                Stage("download", self.download_stage, self.stage_concurrency["download"]),
+                Stage("transcribe", self.transcribe_stage, self.stage_concurrency["transcribe"]),
+                Stage("translate", self.translate_stage, self.stage_concurrency["translate"]),
+                Stage("synthesize", self.synthesize_stage, self.stage_concurrency["synthesize"]),
+                Stage("mix", self.mix_stage, self.stage_concurrency["mix"]),
+                Stage("upload", self.upload_stage, self.stage_concurrency["upload"]),
+            ],
+            queue_size=settings.pipeline_queue_size,
+            on_error=self.handle_stage_error,
+            is_cancelled=lambda item: item.cancelled,
+            on_drop=self.drop_item
+        )
     
     async def start(self):
         """Start the background worker"""
         self.running = True
-        logger.info("Supabase job processor started")
+        self.start_pipeline()
+        logger.info(f"Supabase job processor started (worker {self.worker_id})")
         
         try:
             while self.running:
                 await self.process_pending_jobs()
-                await asyncio.sleep(self.poll_interval)
+                await self.notifier.wait(self.poll_interval)
         except Exception as e:
             logger.error(f"Error in job processor main loop: {e}")
         finally:
+            await self.shutdown()
             logger.info("Supabase job processor stopped")
     
     async def stop(self):
         """Stop the background worker"""
         self.running = False
+        self.notifier.wake()
         logger.info("Supabase job processor stopping...")
     
+    def start_pipeline(self):
+        """Start the stage workers (idempotent)"""
+        if self.job_slots is None:
+            self.job_slots = asyncio.Semaphore(self.max_concurrent_jobs)
+        self.pipeline.start()
+    
+    async def shutdown(self):
+        """Cancel in-flight jobs and release the pipeline's resources"""
+        # Cancelled jobs release their leases, so another worker picks them up
+        for job_run in list(self.active_jobs):
+            job_run.cancel()
+        await asyncio.gather(*self.active_jobs, return_exceptions=True)
+        
+        await self.pipeline.stop()
+        
+        await self.notifier.close()
+        await close_client_registry()
+    
     async def process_pending_jobs(self):
-        """Process pending jobs"""
+        """Admit pending jobs into the pipeline, one page of claimable tasks at a time"""
         try:
-            # Get pending jobs from Supabase
-            jobs = await self.get_pending_jobs()
+            self.start_pipeline()
+            cursor = None
             
-            if not jobs:
-                return
-            
-            logger.info(f"Found {len(jobs)} pending jobs")
-            
-            # Process jobs one by one for now
-            for job in jobs:
-                if self.running:
-                    try:
-                        await self.process_job(job)
-                    except Exception as e:
-                        logger.error(f"Error processing job {job.get('id', 'unknown')}: {e}")
+            while self.running:
+                # Get a page of claimable tasks, grouped by job, from Supabase
+                jobs, cursor = await self.get_pending_jobs(cursor)
+                
+                if jobs:
+                    logger.info(f"Found {len(jobs)} pending jobs")
+                
+                for job in jobs:
+                    if not self.running:
+                        break
+                    
+                    # Wait for a free job slot so we never claim more than the pipeline can take
+                    await self.job_slots.acquire()
+                    job_run = asyncio.create_task(self._run_job(job))
+                    self.active_jobs.add(job_run)
+                    job_run.add_done_callback(self.active_jobs.discard)
+                
+                if cursor is None:
+                    break
                         
         except Exception as e:
             logger.error(f"Error processing pending jobs: {e}")
     
-    async def get_pending_jobs(self):
-        """Get pending jobs from Supabase"""
+    async def _run_job(self, job):
+        """Process one job and free its slot afterwards"""
         try:
-            # Get jobs with status 'processing' that have pending language tasks
-            jobs = self.db_service.get_jobs_by_status("processing")
+            await self.process_job(job)
+        except Exception as e:
+            logger.error(f"Error processing job {job.get('id', 'unknown')}: {e}")
+        finally:
+            self.job_slots.release()
+    
+    async def get_pending_jobs(self, cursor=None):
+        """
+        Get one page of jobs that have claimable language tasks
+        
+        Tasks and their job rows come back from a single embedded query, so
+        jobs without pending work are never read.
+        
+        Returns:
+            (jobs, next_cursor) - next_cursor is None on the last page
+        """
+        try:
+            tasks = await self.db_service.get_claimable_language_tasks(cursor, self.batch_size)
             
-            pending_jobs = []
-            for job in jobs:
-                # Check if this job has pending language tasks
-                tasks = self.db_service.get_language_tasks_by_job_id(job['id'])
-                pending_tasks = [task for task in tasks if task.get('status') == 'pending']
-                
-                if pending_tasks:
-                    pending_jobs.append(job)
+            jobs = {}
+            for task in tasks:
+                # Skip pending tasks another worker has claimed but not started yet
+                if not is_task_claimable(task):
+                    continue
+                job = task['dubbing_jobs']
+                jobs.setdefault(job['id'], job)
             
-            return pending_jobs
+            next_cursor = tasks[-1]['id'] if len(tasks) == self.batch_size else None
+            return list(jobs.values()), next_cursor
             
         except Exception as e:
             logger.error(f"Error getting pending jobs: {e}")
-            return []
+            return [], None
     
     async def process_job(self, job):
-        """Process a single dubbing job"""
+        """Process a single dubbing job
+
+        Claims the job's language tasks, submits the job to the pipeline and
+        waits until every language has completed or failed.
+        """
         job_id = job['id']
         user_id = job['user_id']
         
@@ -109,184 +262,268 @@ class SupabaseJobProcessor:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             log_file.write(f"[{timestamp}] JOB_PROCESSING: {job_id} | User: {user_id} | Status: Started processing\n")
         
+        pending_tasks = []
+        context = None
+        
         try:
-            # Get language tasks for this job
-            tasks = self.db_service.get_language_tasks_by_job_id(job_id)
-            pending_tasks = [task for task in tasks if task.get('status') == 'pending']
+            # Claim this job's language tasks so no other worker processes them
+            pending_tasks = await self.db_service.claim_language_tasks(job_id, self.worker_id, self.lease_seconds)
             
             if not pending_tasks:
-                logger.info(f"No pending tasks for job {job_id}")
+                logger.info(f"No claimable tasks for job {job_id}")
                 return
             
-            # Process each pending language task
-            for task in pending_tasks:
-                await self.process_language_task(job, task)
+            context = JobContext(job, pending_tasks)
+            
+            async with self.task_lease(job_id, pending_tasks, on_lost=lambda: self.abandon_job(context)):
+                try:
+                    self.start_pipeline()
+                    await self.pipeline.submit(context)
+                    await context.wait()
+                except Exception as e:
+                    # Record the failure while the lease is still held; status updates require it
+                    logger.error(f"Error processing job {job_id}: {e}")
+                    await self.fail_job(job_id, pending_tasks, e)
+            
+            if context.cancelled:
+                logger.warning(f"Abandoned job {job_id} after losing its task leases")
                 
         except Exception as e:
             logger.error(f"Error processing job {job_id}: {e}")
-            # Update job status to error
-            await self.update_job_status(job_id, "error", 0, f"Processing failed: {str(e)}")
+        finally:
+            if context:
+                context.cleanup()
     
-    async def process_language_task(self, job, task):
-        """Process a single language task"""
-        task_id = task['id']
-        job_id = job['id']
-        language_code = task['language_code']
+    def task_lease(self, job_id, tasks, on_lost=None):
+        """Keep the leases on a job's claimed tasks alive until processing ends"""
+        task_ids = [task['id'] for task in tasks]
+        return TaskLease(
+            renew=lambda: self.db_service.renew_language_task_leases(task_ids, self.worker_id, self.lease_seconds),
+            release=lambda: self.db_service.release_language_tasks(task_ids, self.worker_id),
+            lease_seconds=self.lease_seconds,
+            description=f"job {job_id} ({len(task_ids)} tasks)",
+            on_lost=on_lost
+        )
+    
+    def abandon_job(self, context: JobContext):
+        """Stop a job whose leases were lost; another worker may already be processing it"""
+        context.cancel()
+        self.pipeline.cancel_items()
+    
+    async def fail_job(self, job_id, tasks, error):
+        """Mark a job and all of its tasks as failed"""
+        # Shared stage failed, so none of the languages can proceed
+        updated = await self.update_language_tasks_status(tasks, "error", 0, f"Processing failed: {str(error)}")
+        if not updated:
+            # None of the tasks are ours any more; the worker holding them owns the job status
+            logger.warning(f"Not marking job {job_id} failed; this worker no longer holds its tasks")
+            return
+        # Update job status to error
+        await self.update_job_status(job_id, "error", 0, f"Processing failed: {str(error)}")
+    
+    async def handle_stage_error(self, stage, item, error):
+        """Record a stage failure for the job or language item that raised it"""
+        if isinstance(item, JobContext):
+            logger.error(f"Error processing job {item.job['id']} in {stage.name} stage: {error}")
+            await self.fail_job(item.job['id'], item.tasks, error)
+        else:
+            task_id = item.task['id']
+            logger.error(f"Error processing language task {task_id} in {stage.name} stage: {error}")
+            await self.update_language_task_status(task_id, "error", 0, f"Processing failed: {str(error)}")
+    
+    def drop_item(self, stage, item):
+        """Count an item that left the pipeline early, so process_job stops waiting for it"""
+        if isinstance(item, JobContext):
+            item.fail()
+        else:
+            try:
+                item.cleanup()
+            finally:
+                item.context.task_done()
+    
+    async def download_stage(self, context: JobContext):
+        """Download the job's voice and background tracks"""
+        job = context.job
+        await self.update_language_tasks_status(context.tasks, "processing", 10, "Starting processing...")
+        
+        # Download the voice track from Supabase Storage
+        if not job.get('voice_track_url'):
+            raise Exception("Voice track URL not found in job data")
+
+        context.voice_track_path = await self.download_file_from_storage(job['voice_track_url'], "voice")
+        if not context.voice_track_path:
+            raise Exception("Failed to download voice track from storage")
+
+        logger.info(f"Downloaded voice track to: {context.voice_track_path}")
+        
+        # Log file processing
+        languages = ", ".join(task['language_code'] for task in context.tasks)
+        upload_log_path = Path("uploads.log")
+        with open(upload_log_path, "a") as log_file:
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            log_file.write(f"[{timestamp}] FILE_PROCESSING: {context.voice_track_path} | Languages: {languages} | Job: {job['id']}\n")
+        
+        if job.get('background_track_url'):
+            context.background_track_path = await self.download_file_from_storage(job['background_track_url'], "background")
+        
+        return context
+    
+    async def transcribe_stage(self, context: JobContext) -> List[LanguageItem]:
+        """Transcribe the voice track once, then fan out one item per language"""
+        # Update task status
+        await self.update_language_tasks_status(context.tasks, "processing", 25, "Transcribing audio...")
+        
+        # Transcribe the actual audio file using Deepgram
+        logger.info(f"Transcribing audio file: {context.voice_track_path}")
+        transcription_result = await self.ai_service.transcribe_audio(context.voice_track_path, "en")
+
+        # Extract transcript text from result dict
+        if isinstance(transcription_result, dict):
+            transcribed_text = transcription_result["transcript"]
+            confidence = transcription_result.get("confidence", 0)
+            logger.info(f"Transcription confidence: {confidence:.2%}")
+        else:
+            # Fallback for old string return type
+            transcribed_text = transcription_result
+
+        logger.info(f"Transcribed text ({len(transcribed_text)} chars): {transcribed_text[:100]}...")
+        context.transcribed_text = transcribed_text
+        
+        return [LanguageItem(context, task) for task in context.tasks]
+    
+    async def translate_stage(self, item: LanguageItem):
+        """Translate the job transcript into the item's language"""
+        task_id = item.task['id']
+        language_code = item.task['language_code']
+        transcribed_text = item.context.transcribed_text
         
         logger.info(f"Processing language task {task_id} for language {language_code}")
         
+        # Update task status
+        await self.update_language_task_status(task_id, "processing", 50, "Translating text...")
+        # Translate text using chunked approach for long texts
+        if len(transcribed_text) > 1000:
+            logger.info(f"Using chunked translation for long text ({len(transcribed_text)} chars)")
+            item.translated_text = await self.ai_service.translate_text_chunked(transcribed_text, language_code)
+        else:
+            item.translated_text = await self.ai_service.translate_text(transcribed_text, language_code)
+        
+        logger.info(f"Translated text: {item.translated_text[:100]}...")
+        return item
+    
+    async def synthesize_stage(self, item: LanguageItem):
+        """Generate speech for the translated text"""
+        task_id = item.task['id']
+        language_code = item.task['language_code']
+        translated_text = item.translated_text
+        
+        # Update task status
+        await self.update_language_task_status(task_id, "processing", 75, "Generating speech...")
+        
+        # Stream the generated speech into a temp file
+        speech_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+        speech_temp.close()
+        item.speech_path = speech_temp.name
+        
+        # Generate speech using chunked approach for long texts
+        if len(translated_text) > 1000:
+            logger.info(f"Using chunked speech generation for long text ({len(translated_text)} chars)")
+            size = await self.ai_service.generate_speech_chunked(translated_text, language_code, item.speech_path)
+        else:
+            size = await self.ai_service.generate_speech_to_file(translated_text, language_code, item.speech_path)
+        logger.info(f"Generated audio: {size} bytes")
+        return item
+    
+    async def mix_stage(self, item: LanguageItem):
+        """Mix the generated speech with the job's background track, if any"""
+        task_id = item.task['id']
+        background_track_path = item.context.background_track_path
+        item.final_audio_path = item.speech_path
+        
+        if not background_track_path:
+            logger.info("No background track found, using voice-only audio")
+            return item
+        
+        mixed_temp = None
         try:
-            # Update task status to processing
-            await self.update_language_task_status(task_id, "processing", 10, "Starting processing...")
-
-            # Download the voice track from Supabase Storage
-            if not job.get('voice_track_url'):
-                raise Exception("Voice track URL not found in job data")
+            await self.update_language_task_status(task_id, "processing", 85, "Mixing with background audio...")
+            logger.info(f"Found background track: {background_track_path}")
 
-            voice_track_path = await self.download_file_from_storage(job['voice_track_url'], "voice")
-            if not voice_track_path:
-                raise Exception("Failed to download voice track from storage")
+            # Create output file for mixed audio
+            mixed_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+            mixed_temp.close()
 
-            logger.info(f"Downloaded voice track to: {voice_track_path}")
-            
-            # Log file processing
-            upload_log_path = Path("uploads.log")
-            with open(upload_log_path, "a") as log_file:
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                log_file.write(f"[{timestamp}] FILE_PROCESSING: {voice_track_path} | Language: {language_code} | Task: {task_id}\n")
-            
-            # Update task status
-            await self.update_language_task_status(task_id, "processing", 25, "Transcribing audio...")
-            
-            # Transcribe the actual audio file using Deepgram
-            logger.info(f"Transcribing audio file: {voice_track_path}")
-            transcription_result = await self.ai_service.transcribe_audio(voice_track_path, "en")
-
-            # Extract transcript text from result dict
-            if isinstance(transcription_result, dict):
-                transcribed_text = transcription_result["transcript"]
-                confidence = transcription_result.get("confidence", 0)
-                logger.info(f"Transcription confidence: {confidence:.2%}")
-            else:
-                # Fallback for old string return type
-                transcribed_text = transcription_result
+            # Mix the audio tracks
+            item.final_audio_path = await self.ai_service.mix_audio_tracks(
+                voice_track_path=item.speech_path,
+                background_track_path=str(background_track_path),
+                output_path=mixed_temp.name
+            )
 
-            logger.info(f"Transcribed text ({len(transcribed_text)} chars): {transcribed_text[:100]}...")
-            
-            # Update task status
-            await self.update_language_task_status(task_id, "processing", 50, "Translating text...")
-            
-            # Translate text using chunked approach for long texts
-            if len(transcribed_text) > 1000:
-                logger.info(f"Using chunked translation for long text ({len(transcribed_text)} chars)")
-                translated_text = await self.ai_service.translate_text_chunked(transcribed_text, language_code)
-            else:
-                translated_text = await self.ai_service.translate_text(transcribed_text, language_code)
-            
-            logger.info(f"Translated text: {translated_text[:100]}...")
-            
-            # Update task status
-            await self.update_language_task_status(task_id, "processing", 75, "Generating speech...")
-            
-            # Generate speech using chunked approach for long texts
-            if len(translated_text) > 1000:
-                logger.info(f"Using chunked speech generation for long text ({len(translated_text)} chars)")
-                speech_audio = await self.ai_service.generate_speech_chunked(translated_text, language_code)
-            else:
-                speech_audio = await self.ai_service.generate_speech(translated_text, language_code)
-            logger.info(f"Generated audio: {len(speech_audio)} bytes")
-
-            # Mix with background audio if present
-            final_audio = speech_audio
-            background_track_path = None
-
-            if job.get('background_track_url'):
-                background_track_path = await self.download_file_from_storage(job['background_track_url'], "background")
-
-            if background_track_path:
-                try:
-                    await self.update_language_task_status(task_id, "processing", 85, "Mixing with background audio...")
-                    logger.info(f"Found background track: {background_track_path}")
-
-                    # Save speech audio to temp file
-                    speech_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-                    speech_temp.write(speech_audio)
-                    speech_temp.close()
-
-                    # Create output file for mixed audio
-                    mixed_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-                    mixed_temp.close()
-
-                    # Mix the audio tracks
-                    mixed_path = await self.ai_service.mix_audio_tracks(
-                        voice_track_path=speech_temp.name,
-                        background_track_path=str(background_track_path),
-                        output_path=mixed_temp.name
-                    )
-
-                    # Read mixed audio
-                    with open(mixed_path, 'rb') as f:
-                        final_audio = f.read()
-
-                    # Clean up temp files
-                    os.remove(speech_temp.name)
-                    os.remove(mixed_temp.name)
-
-                    logger.info(f"Successfully mixed voice with background audio: {len(final_audio)} bytes")
-                except Exception as e:
-                    logger.error(f"Error mixing audio tracks: {e}")
-                    logger.warning("Using voice-only audio due to mixing error")
-                    final_audio = speech_audio
-            else:
-                logger.info("No background track found, using voice-only audio")
+            logger.info(f"Successfully mixed voice with background audio: {os.path.getsize(item.final_audio_path)} bytes")
+        except Exception as e:
+            logger.error(f"Error mixing audio tracks: {e}")
+            logger.warning("Using voice-only audio due to mixing error")
+            item.final_audio_path = item.speech_path
+            if mixed_temp and os.path.exists(mixed_temp.name):
+                os.remove(mixed_temp.name)
+        
+        return item
+    
+    async def upload_stage(self, item: LanguageItem):
+        """Upload the final audio and mark the language task complete"""
+        job = item.job
+        job_id = job['id']
+        task_id = item.task['id']
+        language_code = item.task['language_code']
+        final_audio_path = item.final_audio_path
+        
+        # Update task status
+        await self.update_language_task_status(task_id, "processing", 90, "Uploading audio to storage...")
 
-            # Update task status
-            await self.update_language_task_status(task_id, "processing", 90, "Uploading audio to storage...")
+        # Upload final audio to Supabase Storage
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"dubbed_audio_{job_id}_{language_code}_{timestamp}.mp3"
+        output_path = f"outputs/{job['user_id']}/{job_id}/{output_filename}"
 
-            # Upload final audio to Supabase Storage
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"dubbed_audio_{job_id}_{language_code}_{timestamp}.mp3"
-            output_path = f"outputs/{job['user_id']}/{job_id}/{output_filename}"
+        try:
+            # Upload to Supabase Storage, streaming from the local file
+            public_url = await self.supabase_storage.upload_from_path(
+                bucket=self.bucket,
+                file_path=output_path,
+                local_path=final_audio_path,
+                content_type="audio/mpeg"
+            )
+
+            logger.info(f"Uploaded audio to Supabase Storage: {public_url}")
+
+            # Generate signed download URL (valid for 7 days)
+            download_url = await self.supabase_storage.generate_signed_download_url(
+                bucket=self.bucket,
+                file_path=output_path,
+                expires_in=604800  # 7 days
+            )
+
+            # Update task status to complete with download URL
+            await self.update_language_task_status(
+                task_id,
+                "complete",
+                100,
+                f"Audio generated successfully",
+                download_url=download_url,
+                file_size=os.path.getsize(final_audio_path)
+            )
 
-            try:
-                # Upload to Supabase Storage
-                public_url = await self.supabase_storage.upload_file(
-                    bucket=self.bucket,
-                    file_path=output_path,
-                    file_data=final_audio,
-                    content_type="audio/mpeg"
-                )
-
-                logger.info(f"Uploaded audio to Supabase Storage: {public_url}")
-
-                # Generate signed download URL (valid for 7 days)
-                download_url = await self.supabase_storage.generate_signed_download_url(
-                    bucket=self.bucket,
-                    file_path=output_path,
-                    expires_in=604800  # 7 days
-                )
-
-                # Update task status to complete with download URL
-                await self.update_language_task_status(
-                    task_id,
-                    "complete",
-                    100,
-                    f"Audio generated successfully",
-                    download_url=download_url,
-                    file_size=len(final_audio)
-                )
-
-            except Exception as e:
-                logger.error(f"Error uploading audio to storage: {e}")
-                raise Exception(f"Failed to upload audio to storage: {str(e)}")
-            
-            logger.info(f"Completed language task {task_id} for {language_code}")
-            
         except Exception as e:
-            logger.error(f"Error processing language task {task_id}: {e}")
-            await self.update_language_task_status(task_id, "error", 0, f"Processing failed: {str(e)}")
+            logger.error(f"Error uploading audio to storage: {e}")
+            raise Exception(f"Failed to upload audio to storage: {str(e)}")
+        
+        logger.info(f"Completed language task {task_id} for {language_code}")
+        item.cleanup()
+        item.context.task_done()
+        return None
     
     async def download_file_from_storage(self, file_path, file_type):
         """Download file from Supabase Storage or read from local filesystem in dev mode"""
@@ -298,43 +535,36 @@ class SupabaseJobProcessor:
             # Check if we're in development mode (file path starts with "uploads/" or is a local path)
             is_local_file = file_path.startswith("uploads/") or os.path.exists(file_path)
 
+            if is_local_file and not Path(file_path).exists():
+                raise Exception(f"Local file not found: {file_path}")
+
+            # Determine file extension
+            file_ext = os.path.splitext(file_path)[1] or ".mp3"
+            temp_file = tempfile.NamedTemporaryFile(suffix=file_ext, delete=False)
+            temp_file.close()
+
             if is_local_file:
                 # Development mode - read from local filesystem
                 logger.info(f"Reading {file_type} file from local filesystem: {file_path}")
-
-                # Check if file exists
                 local_path = Path(file_path)
-                if not local_path.exists():
-                    raise Exception(f"Local file not found: {file_path}")
-
-                # Read the local file
-                with open(local_path, 'rb') as f:
-                    file_data = f.read()
-
-                # Determine file extension
-                file_ext = os.path.splitext(file_path)[1] or ".mp3"
 
-                # Save to temporary file for processing
-                temp_file = tempfile.NamedTemporaryFile(suffix=file_ext, delete=False)
-                temp_file.write(file_data)
-                temp_file.close()
+                # Copy to a temporary file for processing
+                await asyncio.to_thread(shutil.copyfile, local_path, temp_file.name)
 
                 logger.info(f"Read {file_type} file from local filesystem to: {temp_file.name}")
                 return temp_file.name
             else:
-                # Production mode - download from Supabase Storage
+                # Production mode - stream from Supabase Storage into the temporary file
                 logger.info(f"Downloading {file_type} file from Supabase Storage: {file_path}")
 
-                # Download file from Supabase Storage
-                file_data = await self.supabase_storage.download_file(self.bucket, file_path)
-
-                # Determine file extension
-                file_ext = os.path.splitext(file_path)[1] or ".mp3"
-
-                # Save to temporary file
-                temp_file = tempfile.NamedTemporaryFile(suffix=file_ext, delete=False)
-                temp_file.write(file_data)
-                temp_file.close()
+                try:
+                    # Goes through the worker media cache, so retried jobs reuse earlier downloads
+                    await self.storage_service.download_to_file(
+                        file_path, temp_file.name, progress=log_progress(f"{file_type} track")
+                    )
+                except Exception:
+                    os.remove(temp_file.name)
+                    raise
 
                 logger.info(f"Downloaded {file_type} file from storage to: {temp_file.name}")
                 return temp_file.name
@@ -344,7 +574,13 @@ class SupabaseJobProcessor:
             return None
     
     async def update_language_task_status(self, task_id, status, progress, message, download_url=None, file_size=None):
-        """Update language task status in Supabase"""
+        """Update language task status in Supabase
+
+        Only applies while this worker holds the task's lease.
+
+        Returns:
+            bool: True if the task row was updated
+        """
         try:
             update_data = {
                 'status': status,
@@ -358,11 +594,28 @@ class SupabaseJobProcessor:
             if file_size:
                 update_data['file_size'] = file_size
             
-            self.db_service.update_language_task(task_id, update_data)
+            result = await self.db_service.update_language_task(task_id, update_data, claimed_by=self.worker_id)
+            if result is None:
+                logger.warning(f"Task {task_id} not updated to {status}; lease lost or update failed")
+                return False
             logger.info(f"Updated task {task_id}: {status} ({progress}%) - {message}")
+            return True
             
         except Exception as e:
             logger.error(f"Error updating task {task_id}: {e}")
+            return False
+    
+    async def update_language_tasks_status(self, tasks, status, progress, message):
+        """Update the status of several language tasks that share a job-level stage
+
+        Returns:
+            int: Number of tasks updated
+        """
+        updated = 0
+        for task in tasks:
+            if await self.update_language_task_status(task['id'], status, progress, message):
+                updated += 1
+        return updated
     
     async def update_job_status(self, job_id, status, progress, message):
         """Update job status in Supabase"""
@@ -373,7 +626,7 @@ class SupabaseJobProcessor:
                 'message': message
             }
             
-            self.db_service.update_job(job_id, update_data)
+            await self.db_service.update_job(job_id, update_data)
             logger.info(f"Updated job {job_id}: {status} ({progress}%) - {message}")
             
         except Exception as e:
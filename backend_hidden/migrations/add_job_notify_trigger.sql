@@ -0,0 +1,23 @@
+-- Migration: Notify workers when a language task is queued
+-- Date: 2026-10-16
+-- Purpose: Wake workers listening on the dubbing_jobs channel (PostgresJobNotifier)
+--          even when rows are inserted through the REST API
+
+CREATE OR REPLACE FUNCTION notify_language_task_pending()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Channel must match settings.job_notify_channel
+    PERFORM pg_notify('dubbing_jobs', NEW.job_id);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS language_tasks_notify_pending ON language_tasks;
+
+CREATE TRIGGER language_tasks_notify_pending
+AFTER INSERT ON language_tasks
+FOR EACH ROW
+WHEN (NEW.status = 'pending')
+EXECUTE FUNCTION notify_language_task_pending();
@@ -0,0 +1,14 @@
+-- Migration: Index the worker's claimable-task query
+-- Date: 2026-10-16
+-- Purpose: Keep SupabaseDBService.get_claimable_language_tasks an index scan
+--          even with thousands of historic tasks
+
+-- Pending tasks, paged by ID
+CREATE INDEX IF NOT EXISTS ix_language_tasks_pending_id
+ON language_tasks (id)
+WHERE status = 'pending';
+
+-- Processing tasks whose lease may have expired
+CREATE INDEX IF NOT EXISTS ix_language_tasks_processing_lease
+ON language_tasks (lease_expires_at)
+WHERE status = 'processing';
@@ -0,0 +1,45 @@
+-- Migration: Add worker lease columns to language_tasks table
+-- Date: 2026-10-16
+-- Purpose: Let multiple worker processes claim language tasks without processing them twice
+
+-- Worker ID holding the task
+ALTER TABLE language_tasks
+ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+
+-- When the current lease runs out (workers renew it while the task runs)
+ALTER TABLE language_tasks
+ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS ix_language_tasks_claimed_by ON language_tasks (claimed_by);
+CREATE INDEX IF NOT EXISTS ix_language_tasks_lease_expires_at ON language_tasks (lease_expires_at);
+
+COMMENT ON COLUMN language_tasks.claimed_by IS 'Worker ID currently holding the task lease';
+COMMENT ON COLUMN language_tasks.lease_expires_at IS 'Lease expiry; expired processing tasks can be reclaimed';
+
+-- Atomically claim the claimable tasks of a job.
+-- Pending tasks are claimable unless another worker holds a live lease; processing
+-- tasks are reclaimed once their lease has expired (the owning worker died) or
+-- nobody holds them (released, or left processing from before leases existed).
+-- SKIP LOCKED keeps concurrent claimers from blocking on or double-claiming rows.
+CREATE OR REPLACE FUNCTION claim_language_tasks(
+    p_job_id TEXT,
+    p_worker_id TEXT,
+    p_lease_seconds INTEGER
+)
+RETURNS SETOF language_tasks
+LANGUAGE sql
+AS $$
+    UPDATE language_tasks AS t
+    SET claimed_by = p_worker_id,
+        lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+    WHERE t.id IN (
+        SELECT id FROM language_tasks
+        WHERE job_id = p_job_id
+          AND (
+              (status = 'pending' AND (claimed_by IS NULL OR lease_expires_at < now()))
+              OR (status = 'processing' AND (claimed_by IS NULL OR lease_expires_at < now()))
+          )
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING t.*;
+$$;
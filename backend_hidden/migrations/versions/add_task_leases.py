@@ -0,0 +1,32 @@
+"""add worker lease columns to language tasks
+
+Revision ID: add_task_leases
+Revises: add_audit_logs
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_task_leases'
+down_revision = 'add_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add claimed_by/lease_expires_at so multiple workers can claim tasks safely"""
+    op.add_column('language_tasks', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('language_tasks', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_index('ix_language_tasks_claimed_by', 'language_tasks', ['claimed_by'])
+    op.create_index('ix_language_tasks_lease_expires_at', 'language_tasks', ['lease_expires_at'])
+
+
+def downgrade():
+    """Remove worker lease columns"""
+    op.drop_index('ix_language_tasks_lease_expires_at', table_name='language_tasks')
+    op.drop_index('ix_language_tasks_claimed_by', table_name='language_tasks')
+    op.drop_column('language_tasks', 'lease_expires_at')
+    op.drop_column('language_tasks', 'claimed_by')
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request middleware overhead
+
+Compares a bare Starlette app, the previous stack of four BaseHTTPMiddleware
+layers (reproduced below with the same header work) and the single ASGI
+APIMiddleware. Requests are driven in-process through httpx's ASGI transport
+so only middleware cost is measured.
+
+Usage:
+    python scripts/benchmark_middleware.py [requests]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.middleware.api_middleware import APIMiddleware, NO_CACHE_HEADERS, build_security_headers
+
+
+class LegacyAPILogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if request.method in ("POST", "PUT", "PATCH"):
+            await request.body()
+        return await call_next(request)
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in build_security_headers():
+            response.headers[name] = value
+        if request.url.path.startswith("/api/"):
+            for name, value in NO_CACHE_HEADERS:
+                response.headers[name] = value
+        return response
+
+
+class LegacyRequestLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class LegacyRateLimitHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        if hasattr(request.state, 'rate_limit_remaining'):
+            response.headers["X-Rate-Limit-Remaining"] = str(request.state.rate_limit_remaining)
+        return response
+
+
+async def endpoint(request):
+    if request.method == "POST":
+        await request.body()
+    return JSONResponse({"status": "ok"})
+
+
+def build_app(middleware):
+    return Starlette(
+        routes=[Route("/api/ping", endpoint, methods=["GET", "POST"])],
+        middleware=middleware
+    )
+
+
+async def measure(app, requests: int, method: str) -> float:
+    """Return mean microseconds per request"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        body = b'{"youtube_url": "https://youtube.com/watch?v=x", "languages": ["es"]}'
+        for _ in range(50):
+            await client.request(method, "/api/ping", content=body if method == "POST" else None)
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.request(method, "/api/ping", content=body if method == "POST" else None)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int):
+    # Measure middleware work, not console output
+    logging.disable(logging.CRITICAL)
+    log_file = os.path.join(tempfile.mkdtemp(), "api_calls.log")
+
+    apps = {
+        "no middleware": build_app([]),
+        "4x BaseHTTPMiddleware": build_app([
+            Middleware(LegacyAPILogging),
+            Middleware(LegacySecurityHeaders),
+            Middleware(LegacyRequestLogging),
+            Middleware(LegacyRateLimitHeaders),
+        ]),
+        "APIMiddleware": build_app([Middleware(APIMiddleware, log_file_path=log_file)]),
+    }
+
+    for method in ("GET", "POST"):
+        baseline = None
+        print(f"\n{method} /api/ping ({requests} requests)")
+        for name, app in apps.items():
+            mean = await measure(app, requests, method)
+            baseline = mean if baseline is None else baseline
+            print(f"  {name:<24} {mean:8.1f} us/request  (+{mean - baseline:.1f} us overhead)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
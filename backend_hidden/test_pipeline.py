@@ -72,10 +72,18 @@ async def test_dubbing_pipeline():
 
         # STEP 4: Generate speech (TTS with Deepgram)
         print("🔊 Step 4: Generating Spanish speech with Deepgram TTS...")
-        speech_audio = await ai_service.generate_speech_chunked(
+        import tempfile
+        speech_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+        speech_temp.close()
+
+        # Speech is streamed straight into the temp file
+        await ai_service.generate_speech_chunked(
             text=translated_text,
-            language=target_language
+            language=target_language,
+            output_path=speech_temp.name
         )
+        with open(speech_temp.name, 'rb') as f:
+            speech_audio = f.read()
 
         print(f"   ✓ Generated {len(speech_audio)} bytes of audio")
         print()
@@ -83,12 +91,6 @@ async def test_dubbing_pipeline():
         # STEP 5: Mix with background audio
         print("🎵 Step 5: Mixing voice with background audio...")
 
-        # Save speech to temp file
-        import tempfile
-        speech_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-        speech_temp.write(speech_audio)
-        speech_temp.close()
-
         # Create output file
         output_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
         output_temp.close()
@@ -0,0 +1,10 @@
+"""
+Shared test configuration
+"""
+import os
+
+# Settings are validated on import; unit tests don't talk to real services
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DEEPGRAM_API_KEY", "test-deepgram-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
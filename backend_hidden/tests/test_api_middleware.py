@@ -0,0 +1,134 @@
+"""
+API middleware tests
+"""
+import json
+import logging
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.middleware.api_middleware import APIMiddleware, stop_api_call_logging
+from app.utils import monitoring
+from app.utils.monitoring import RequestMetrics
+
+
+async def echo(request):
+    body = await request.body()
+    return JSONResponse({"received": len(body)})
+
+
+async def home(request):
+    return PlainTextResponse("ok")
+
+
+async def broken(request):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = RequestMetrics()
+    monkeypatch.setattr(monitoring, "metrics", metrics)
+    return metrics
+
+
+class ListHandler(logging.Handler):
+    """Keeps records without formatting them"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def api_records():
+    handler = ListHandler()
+    logging.getLogger("api_calls").addHandler(handler)
+    yield handler.records
+    logging.getLogger("api_calls").removeHandler(handler)
+
+
+@pytest.fixture
+def client(tmp_path, api_records, metrics):
+    app = Starlette(routes=[
+        Route("/api/echo", echo, methods=["POST"]),
+        Route("/api/broken", broken),
+        Route("/", home),
+    ])
+    app.add_middleware(APIMiddleware, log_file_path=str(tmp_path / "api_calls.log"), body_log_bytes=32, body_sample_rate=1.0)
+    yield TestClient(app, raise_server_exceptions=False)
+    stop_api_call_logging()
+
+
+def api_log(records, kind):
+    return [record.args[0].data for record in records if record.args[0].data["type"] == kind]
+
+
+def test_security_and_cache_headers(client, metrics):
+    """Test every response gets security headers and API responses aren't cacheable"""
+    api = client.post("/api/echo", json={})
+    page = client.get("/")
+
+    for response in (api, page):
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert api.headers["Cache-Control"].startswith("no-store")
+    assert "Cache-Control" not in page.headers
+    assert metrics.request_count == 2 and metrics.in_flight == 0
+
+
+def test_json_body_logged_without_credentials(client, api_records):
+    """Test small JSON bodies are logged parsed and credential headers are left out"""
+    response = client.post("/api/echo", json={"a": 1}, headers={"Authorization": "Bearer secret"})
+
+    assert response.json() == {"received": len(json.dumps({"a": 1}, separators=(",", ":")))}
+    request_log = api_log(api_records, "REQUEST")[0]
+    assert request_log["body"] == {"a": 1}
+    assert request_log["body_truncated"] is False
+    assert "authorization" not in request_log["headers"]
+    assert api_log(api_records, "RESPONSE")[0]["status_code"] == 200
+
+
+def test_large_body_logged_as_prefix_and_passed_through_whole(client, api_records):
+    """Test only body_log_bytes are logged while the app still reads the full body"""
+    payload = json.dumps({"text": "x" * 1000})
+
+    response = client.post("/api/echo", content=payload, headers={"Content-Type": "application/json"})
+
+    assert response.json() == {"received": len(payload)}
+    request_log = api_log(api_records, "REQUEST")[0]
+    assert request_log["body"] == payload[:32]
+    assert request_log["body_truncated"] is True
+
+
+def test_non_json_body_is_not_read(client, api_records):
+    """Test uploads and other non-JSON bodies are never logged"""
+    response = client.post("/api/echo", content=b"\x00" * 100, headers={"Content-Type": "audio/mpeg"})
+
+    assert response.json() == {"received": 100}
+    assert api_log(api_records, "REQUEST")[0]["body"] is None
+
+
+def test_unhandled_error_is_logged_and_counted(client, api_records, metrics):
+    """Test an exception from the app is logged, counted as an error and re-raised"""
+    response = client.get("/api/broken")
+
+    assert response.status_code == 500
+    assert api_log(api_records, "ERROR")[0]["error"] == "boom"
+    assert metrics.error_count == 1 and metrics.in_flight == 0
+
+
+def test_api_log_is_not_written_by_root_handlers(client):
+    """Test api_calls records only reach the queue, not root handlers that would format them on the request path"""
+    root_handler = ListHandler()
+    logging.getLogger().addHandler(root_handler)
+    try:
+        client.post("/api/echo", json={"a": 1})
+    finally:
+        logging.getLogger().removeHandler(root_handler)
+
+    assert [record for record in root_handler.records if record.name == "api_calls"] == []
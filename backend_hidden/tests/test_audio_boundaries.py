@@ -0,0 +1,68 @@
+"""
+Silence-aware chunk boundary tests
+"""
+import numpy as np
+import pytest
+from app.utils.audio_boundaries import find_cut_points, frame_rms
+
+FRAME = 0.02
+
+
+def speech_with_pauses(seconds, pauses):
+    """Loud per-frame energy with silent 0.4 s pauses starting at the given times"""
+    energy = np.full(int(round(seconds / FRAME)), 1000.0, dtype=np.float32)
+    for start in pauses:
+        first = int(round(start / FRAME))
+        energy[first:first + 20] = 0.0
+    return energy
+
+
+def test_cuts_snap_to_pauses_near_target():
+    """Test each cut lands inside the pause closest to its target"""
+    energy = speech_with_pauses(85, [28.0, 61.0])
+
+    cuts = find_cut_points(energy, FRAME, 30, 5)
+
+    assert len(cuts) == 2
+    assert 28.0 <= cuts[0] <= 28.4
+    assert 61.0 <= cuts[1] <= 61.4
+
+
+def test_uniform_audio_cuts_at_target():
+    """Test cuts stay on the target when there is no pause to move to"""
+    cuts = find_cut_points(np.ones(5000, dtype=np.float32), FRAME, 30, 5)
+
+    assert cuts == pytest.approx([30.0, 60.0, 90.0], abs=FRAME)
+
+
+def test_no_short_tail_chunk():
+    """Test a pause just before the end can't leave a sliver as the last chunk"""
+    # Past the target, with the only pause 1.4 s before the end
+    energy = speech_with_pauses(36.0, [34.4])
+
+    cuts = find_cut_points(energy, FRAME, 30, 5)
+
+    assert cuts
+    assert 36.0 - cuts[-1] >= 5.0
+    for length in np.diff([0.0] + cuts + [36.0]):
+        assert 5.0 <= length <= 35.0 + FRAME
+
+
+@pytest.mark.parametrize("seconds", [31.0, 47.3, 64.9, 300.0])
+def test_chunk_lengths_stay_in_range(seconds):
+    """Test every chunk is between search_seconds and target + search_seconds long"""
+    rng = np.random.default_rng(7)
+    energy = rng.uniform(0, 1000, int(round(seconds / FRAME))).astype(np.float32)
+
+    cuts = find_cut_points(energy, FRAME, 30, 5)
+
+    lengths = np.diff([0.0] + cuts + [len(energy) * FRAME])
+    assert lengths.min() >= 5.0 - FRAME
+    assert lengths.max() <= 35.0 + FRAME
+
+
+def test_frame_rms_ignores_partial_frame():
+    """Test RMS is computed per whole frame"""
+    samples = np.array([3, -3, 3, -3, 4, 4, 4, 4, 9], dtype="<i2")
+
+    assert frame_rms(samples, 4).tolist() == [3.0, 4.0]
@@ -0,0 +1,202 @@
+"""
+Audit sink tests
+"""
+import asyncio
+import json
+import pytest
+from app.utils.audit_sink import AuditLogSink
+
+
+class FakeTable:
+    """Collects written batches; fails while `down` is set"""
+
+    def __init__(self):
+        self.batches = []
+        self.down = False
+
+    def write_batch(self, rows):
+        if self.down:
+            raise ConnectionError("database unavailable")
+        self.batches.append(rows)
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+def events(count, start=0):
+    return [{"event": i} for i in range(start, start + count)]
+
+
+def test_drop_oldest_keeps_newest_events():
+    """Test a full buffer discards its oldest events under drop_oldest"""
+    sink = AuditLogSink(FakeTable().write_batch, max_buffer=3)
+    for event in events(5):
+        sink.submit(event)
+
+    assert list(sink._buffer) == events(3, start=2)
+    assert sink.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_spill_writes_overflow_to_file(tmp_path):
+    """Test a full buffer sends new events to the spill file under spill"""
+    spill_path = tmp_path / "spill.jsonl"
+    table = FakeTable()
+    sink = AuditLogSink(table.write_batch, max_buffer=3, overflow_policy="spill", spill_path=str(spill_path))
+    for event in events(5):
+        sink.submit(event)
+
+    assert list(sink._buffer) == events(3)
+    await sink.stop()
+
+    assert table.rows == events(3)
+    assert [json.loads(line) for line in spill_path.read_text().splitlines()] == events(2, start=3)
+    assert sink.spilled == 2 and sink.dropped == 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AuditLogSink(FakeTable().write_batch, overflow_policy="block")
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_written_without_waiting_for_interval():
+    """Test reaching batch_size wakes the writer before flush_interval"""
+    table = FakeTable()
+    sink = AuditLogSink(table.write_batch, batch_size=10, flush_interval=60)
+    sink.start()
+    try:
+        for event in events(25):
+            sink.submit(event)
+        for _ in range(100):
+            if len(table.rows) >= 20:
+                break
+            await asyncio.sleep(0.01)
+        assert table.rows[:20] == events(20)
+        assert all(len(batch) <= 10 for batch in table.batches)
+    finally:
+        await sink.stop()
+
+    # stop() flushes the remainder, in order
+    assert table.rows == events(25)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_in_order():
+    """Test a batch that fails to write is put back in front of newer events"""
+    table = FakeTable()
+    sink = AuditLogSink(table.write_batch, batch_size=2)
+    for event in events(3):
+        sink.submit(event)
+
+    table.down = True
+    await sink.flush()
+    assert len(sink) == 3
+
+    sink.submit({"event": 3})
+    table.down = False
+    await sink.flush()
+    assert table.rows == events(4)
+
+
+def spilled_events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+@pytest.mark.asyncio
+async def test_spill_overflow_is_written_by_the_writer_not_submit(tmp_path):
+    """Test submit never touches the spill file; the writer task spills overflow events"""
+    spill_path = tmp_path / "spill.jsonl"
+    table = FakeTable()
+    table.down = True
+    sink = AuditLogSink(
+        table.write_batch, max_buffer=3, batch_size=100, flush_interval=60,
+        overflow_policy="spill", spill_path=str(spill_path)
+    )
+    sink.start()
+    try:
+        for event in events(5):
+            sink.submit(event)
+        assert not spill_path.exists()
+
+        for _ in range(100):
+            if sink.spilled == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert spilled_events(spill_path) == events(2, start=3)
+    finally:
+        table.down = False
+        await sink.stop()
+    assert table.rows == events(3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["drop_oldest", "spill"])
+async def test_poison_batch_is_given_up_after_max_attempts(tmp_path, policy):
+    """Test a batch that always fails stops blocking the events behind it"""
+    spill_path = tmp_path / "spill.jsonl"
+    written = []
+
+    def write_batch(rows):
+        if any(row["event"] == 0 for row in rows):
+            raise ValueError("bad row")
+        written.extend(rows)
+
+    sink = AuditLogSink(write_batch, batch_size=2, overflow_policy=policy, spill_path=str(spill_path), max_attempts=3)
+    for event in events(5):
+        sink.submit(event)
+
+    for _ in range(2):
+        assert await sink.flush() is False
+        assert len(sink) == 5
+    assert await sink.flush() is False
+    assert await sink.flush() is True
+
+    assert written == events(3, start=2)
+    if policy == "spill":
+        assert spilled_events(spill_path) == events(2)
+    else:
+        assert sink.dropped == 2 and not spill_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_writer_backs_off_after_failed_flush():
+    """Test a failing database isn't retried on every wakeup"""
+    attempts = []
+
+    def write_batch(rows):
+        attempts.append(len(rows))
+        raise ConnectionError("database unavailable")
+
+    sink = AuditLogSink(write_batch, batch_size=1, flush_interval=0.05, max_attempts=100)
+    sink.start()
+    try:
+        for event in events(20):
+            sink.submit(event)
+            await asyncio.sleep(0.01)
+        # Without backoff every wakeup (20) plus every interval would retry
+        assert 1 <= len(attempts) <= 4
+    finally:
+        await sink.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["drop_oldest", "spill"])
+async def test_stop_disposes_of_events_when_final_flush_fails(tmp_path, policy, caplog):
+    """Test events left after a failed final flush are spilled, or reported as lost"""
+    spill_path = tmp_path / "spill.jsonl"
+    table = FakeTable()
+    table.down = True
+    sink = AuditLogSink(table.write_batch, batch_size=2, overflow_policy=policy, spill_path=str(spill_path))
+    for event in events(5):
+        sink.submit(event)
+
+    await sink.stop()
+
+    assert len(sink) == 0
+    if policy == "spill":
+        assert spilled_events(spill_path) == events(5)
+    else:
+        assert sink.dropped == 5
+        assert "Dropped 5 unwritten audit events at shutdown" in caplog.text
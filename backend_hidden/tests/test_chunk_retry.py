@@ -0,0 +1,68 @@
+"""
+Chunked AI call tests
+"""
+import asyncio
+import pytest
+from app.services import ai_service
+from app.services.ai_service import _gather_chunks_with_retry
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Skip real backoff sleeps"""
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(ai_service.asyncio, "sleep", lambda delay: real_sleep(0))
+
+
+@pytest.mark.asyncio
+async def test_results_keep_chunk_order_and_failed_chunks_retry():
+    """Test results come back in chunk order and only the failing chunk is retried"""
+    calls = {0: 0, 1: 0, 2: 0}
+
+    def make_call(i):
+        async def call():
+            calls[i] += 1
+            if i == 1 and calls[i] < 3:
+                raise ValueError("flaky")
+            return f"chunk {i}"
+        return call
+
+    results = await _gather_chunks_with_retry([make_call(i) for i in range(3)], 2, 2, "Test chunk")
+
+    assert results == ["chunk 0", "chunk 1", "chunk 2"]
+    assert calls == {0: 1, 1: 3, 2: 1}
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_and_awaits_other_chunks():
+    """Test a chunk that keeps failing stops its siblings before the error is raised"""
+    finished = []
+
+    async def fail():
+        raise ValueError("broken")
+
+    async def slow():
+        try:
+            await asyncio.Event().wait()
+        finally:
+            finished.append("slow")
+
+    with pytest.raises(ValueError, match="broken"):
+        await _gather_chunks_with_retry([slow, fail], 2, 1, "Test chunk")
+
+    assert finished == ["slow"]
+
+
+@pytest.mark.asyncio
+async def test_only_listed_errors_are_retried():
+    """Test errors outside retry_on fail on the first attempt"""
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise KeyError("not retryable")
+
+    with pytest.raises(KeyError):
+        await _gather_chunks_with_retry([call], 1, 3, "Test chunk", retry_on=(ValueError,))
+
+    assert len(attempts) == 1
@@ -0,0 +1,49 @@
+"""
+Job notifier tests
+"""
+import asyncio
+import time
+import pytest
+from app.config import settings
+from app.services.job_notifier import JobNotifier, RedisJobNotifier
+
+
+@pytest.fixture(autouse=True)
+def short_unnotified_interval(monkeypatch):
+    monkeypatch.setattr(settings, "worker_unnotified_poll_interval", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_notify_wakes_waiting_worker():
+    """Test a notification ends the wait before the fallback timeout"""
+    notifier = JobNotifier("jobs")
+    waiter = asyncio.create_task(notifier.wait(60))
+    await asyncio.sleep(0)
+    await notifier.notify("job-1")
+
+    assert await asyncio.wait_for(waiter, 1) is True
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_polls_at_short_interval():
+    """Test the in-process backend never waits the long fallback interval"""
+    started = time.monotonic()
+
+    assert await JobNotifier("jobs").wait(60) is False
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_listener_polls_at_short_interval(monkeypatch):
+    """Test a Redis notifier that can't subscribe falls back to the short interval"""
+    notifier = RedisJobNotifier("jobs")
+
+    def no_redis():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(notifier, "_get_client", no_redis)
+    started = time.monotonic()
+
+    assert await notifier.wait(60) is False
+    assert notifier.listening is False
+    assert time.monotonic() - started < 1
@@ -0,0 +1,92 @@
+"""
+JWKS cache tests
+"""
+import asyncio
+import time
+import httpx
+import pytest
+from app.utils import jwks_cache
+from app.utils.jwks_cache import JWKSCache
+
+KEYS = {"keys": [{"kid": "key-1"}]}
+
+
+@pytest.fixture
+def jwks_server(monkeypatch):
+    """Serve KEYS from a mock transport and count the fetches"""
+    server = {"fetches": 0, "keys": KEYS}
+
+    def handler(request):
+        server["fetches"] += 1
+        return httpx.Response(200, json=server["keys"])
+
+    real_client = httpx.Client
+    monkeypatch.setattr(
+        jwks_cache.httpx, "Client",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    )
+    return server
+
+
+def test_get_fetches_off_the_event_loop(jwks_server):
+    """Test a cold cache fetches synchronously when no event loop is running"""
+    cache = JWKSCache("https://auth.example/jwks")
+    assert cache.get() == KEYS
+    assert cache.get() == KEYS
+    assert jwks_server["fetches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_event_loop_never_waits_for_the_fetch_lock(jwks_server):
+    """Test cold-cache and unknown-kid refreshes on the loop don't block while another fetch holds the lock"""
+    cache = JWKSCache("https://auth.example/jwks", min_forced_interval=0)
+    cache._lock.acquire()
+    try:
+        started = time.monotonic()
+        with pytest.raises(Exception, match="JWKS unavailable"):
+            cache.get()
+        assert cache.refresh_for_unknown_kid() is False
+        assert time.monotonic() - started < 0.1
+    finally:
+        cache._lock.release()
+
+    # The requested refresh completes in a worker thread
+    await asyncio.wait_for(cache._pending, timeout=1)
+    assert cache.get() == KEYS
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_wakes_background_refresher(jwks_server):
+    """Test an unknown key ID triggers a prompt, rate-limited background refresh"""
+    cache = JWKSCache("https://auth.example/jwks", ttl=3600, min_forced_interval=30)
+    await asyncio.to_thread(cache.refresh)
+    cache.start()
+    try:
+        jwks_server["keys"] = {"keys": [{"kid": "key-1"}, {"kid": "key-2"}]}
+
+        assert cache.refresh_for_unknown_kid() is False
+        for _ in range(100):
+            if jwks_server["fetches"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert jwks_server["fetches"] == 2
+        assert cache.get() == jwks_server["keys"]
+
+        # Rate limited: a second bogus kid doesn't trigger another fetch
+        assert cache.refresh_for_unknown_kid() is False
+        await asyncio.sleep(0.05)
+        assert jwks_server["fetches"] == 2
+    finally:
+        await cache.stop()
+
+
+def test_failed_refresh_serves_stale_keys(jwks_server, monkeypatch):
+    """Test the last good key set is kept when a refresh fails"""
+    cache = JWKSCache("https://auth.example/jwks", ttl=0)
+    assert cache.get() == KEYS
+
+    monkeypatch.setattr(jwks_cache.httpx, "Client", lambda **kwargs: httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(503)), **kwargs
+    ))
+    assert cache.refresh() is False
+    assert cache.get() == KEYS
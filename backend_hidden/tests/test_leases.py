@@ -0,0 +1,154 @@
+"""
+Worker lease tests
+"""
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.worker.leases import TaskLease, is_task_claimable
+from app.worker.pipeline import Pipeline, Stage
+
+
+class FakeLeaseStore:
+    """Lease rows for one job; renewals fail once `stolen` is set"""
+
+    def __init__(self):
+        self.renewals = 0
+        self.released = False
+        self.stolen = False
+
+    async def renew(self):
+        self.renewals += 1
+        return not self.stolen
+
+    def release(self):
+        self.released = True
+
+
+def make_lease(store, on_lost=None):
+    lease = TaskLease(store.renew, store.release, lease_seconds=3, description="test job", on_lost=on_lost)
+    lease.renew_interval = 0.01
+    return lease
+
+
+@pytest.mark.asyncio
+async def test_lease_renews_until_exit_and_releases():
+    """Test the lease is renewed while held and released on exit"""
+    store = FakeLeaseStore()
+    async with make_lease(store) as lease:
+        await asyncio.sleep(0.05)
+
+    assert store.renewals >= 2
+    assert store.released
+    assert not lease.lost
+
+
+@pytest.mark.asyncio
+async def test_lease_survives_transient_renew_errors():
+    """Test a failing renew call is retried instead of losing the lease"""
+    calls = []
+
+    def renew():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+        return True
+
+    lease = TaskLease(renew, lambda: None, lease_seconds=3)
+    lease.renew_interval = 0.01
+    async with lease:
+        await asyncio.sleep(0.05)
+
+    assert len(calls) >= 2
+    assert not lease.lost
+
+
+@pytest.mark.asyncio
+async def test_lease_loss_calls_on_lost_once():
+    """Test losing the lease marks it lost, stops renewing and calls on_lost"""
+    store = FakeLeaseStore()
+    lost_calls = []
+    async with make_lease(store, on_lost=lambda: lost_calls.append(1)) as lease:
+        await asyncio.sleep(0.03)
+        store.stolen = True
+        await asyncio.sleep(0.05)
+        renewals = store.renewals
+        await asyncio.sleep(0.03)
+
+        assert lease.lost
+        assert lost_calls == [1]
+        assert store.renewals == renewals
+
+    assert store.released
+
+
+@pytest.mark.asyncio
+async def test_lease_loss_cancels_in_flight_pipeline_items():
+    """Test a lost lease cancels the job's running and queued pipeline items"""
+
+    class Item:
+        def __init__(self, name):
+            self.name = name
+            self.cancelled = False
+
+    started = asyncio.Event()
+    finished = []
+
+    async def slow(item):
+        if item.name != "c":
+            started.set()
+            await asyncio.sleep(10)
+        return item
+
+    async def record(item):
+        finished.append(item.name)
+
+    pipeline = Pipeline(
+        [Stage("slow", slow), Stage("record", record)],
+        is_cancelled=lambda item: item.cancelled
+    )
+    pipeline.start()
+    items = [Item("a"), Item("b")]
+
+    def abandon():
+        for item in items:
+            item.cancelled = True
+        pipeline.cancel_items()
+
+    store = FakeLeaseStore()
+    try:
+        async with make_lease(store, on_lost=abandon) as lease:
+            for item in items:
+                await pipeline.submit(item)
+            await started.wait()
+            store.stolen = True
+            await asyncio.wait_for(pipeline.queues[0].join(), timeout=1)
+
+        assert lease.lost
+        assert finished == []
+        # The stage worker survives the cancellation and keeps serving other items
+        await pipeline.submit(Item("c"))
+        for _ in range(100):
+            if finished:
+                break
+            await asyncio.sleep(0.01)
+        assert finished == ["c"]
+    finally:
+        await pipeline.stop()
+
+
+@pytest.mark.parametrize("task, claimable", [
+    ({"status": "pending", "claimed_by": None, "lease_expires_at": None}, True),
+    ({"status": "processing", "claimed_by": "worker-1", "lease_expires_at": "live"}, False),
+    ({"status": "processing", "claimed_by": "worker-1", "lease_expires_at": "expired"}, True),
+    # Released tasks and tasks left processing before leases existed
+    ({"status": "processing", "claimed_by": None, "lease_expires_at": "expired"}, True),
+    ({"status": "processing", "claimed_by": None, "lease_expires_at": None}, True),
+    ({"status": "completed", "claimed_by": None, "lease_expires_at": None}, False),
+])
+def test_task_claimable(task, claimable):
+    """Test no processing task without a live lease is stranded"""
+    now = datetime.now(timezone.utc)
+    leases = {"live": now + timedelta(minutes=1), "expired": now - timedelta(minutes=1), None: None}
+    task = {**task, "lease_expires_at": leases[task["lease_expires_at"]]}
+
+    assert is_task_claimable(task) is claimable
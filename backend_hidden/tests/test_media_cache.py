@@ -0,0 +1,120 @@
+"""
+Worker media cache tests
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.utils.media_cache import MediaCache
+
+
+def make_producer(data: bytes, calls: list, delay: float = 0):
+    async def produce(path):
+        calls.append(path)
+        await asyncio.sleep(delay)
+        with open(path, "wb") as f:
+            f.write(data)
+    return produce
+
+
+@pytest.mark.asyncio
+async def test_miss_then_hit(tmp_path):
+    """Test the first fetch produces the entry and later fetches reuse it"""
+    cache = MediaCache(str(tmp_path / "cache"), 1024 * 1024)
+    key = MediaCache.make_key("uploads/a.mp3", "etag-1")
+    calls = []
+
+    assert await cache.fetch(key, str(tmp_path / "first.mp3"), make_producer(b"audio", calls), ".mp3") is False
+    assert await cache.fetch(key, str(tmp_path / "second.mp3"), make_producer(b"other", calls), ".mp3") is True
+
+    assert len(calls) == 1
+    assert (tmp_path / "second.mp3").read_bytes() == b"audio"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_produce_once(tmp_path):
+    """Test tasks racing for the same key wait for one producer"""
+    cache = MediaCache(str(tmp_path / "cache"), 1024 * 1024)
+    key = MediaCache.make_key("uploads/a.mp3", "etag-1")
+    calls = []
+
+    hits = await asyncio.gather(*(
+        cache.fetch(key, str(tmp_path / f"out_{i}.mp3"), make_producer(b"audio", calls, delay=0.05))
+        for i in range(4)
+    ))
+
+    assert len(calls) == 1
+    assert sorted(hits) == [False, True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_eviction_keeps_cache_under_cap_and_outputs_intact(tmp_path):
+    """Test least recently used entries are evicted without touching files handed to callers"""
+    cache = MediaCache(str(tmp_path / "cache"), 250)
+    calls = []
+    for i in range(5):
+        key = MediaCache.make_key(f"uploads/{i}.wav", "v1")
+        await cache.fetch(key, str(tmp_path / f"out_{i}.wav"), make_producer(bytes([i]) * 100, calls))
+        os.utime(cache.entry_path(key), (i, i))
+
+    cache.evict()
+
+    remaining = list(cache.objects_dir.glob("*/*"))
+    assert sum(path.stat().st_size for path in remaining) <= 250
+    assert cache.entry_path(MediaCache.make_key("uploads/4.wav", "v1")).exists()
+    for i in range(5):
+        assert (tmp_path / f"out_{i}.wav").read_bytes() == bytes([i]) * 100
+
+
+@pytest.mark.asyncio
+async def test_waiters_do_not_starve_the_default_executor(tmp_path):
+    """Test many tasks waiting on one key can't take every executor thread from the producer"""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=2)
+    loop.set_default_executor(executor)
+    cache = MediaCache(str(tmp_path / "cache"), 1024 * 1024)
+    key = MediaCache.make_key("uploads/a.mp3", "etag-1")
+    calls = []
+
+    async def produce(path):
+        calls.append(path)
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(lambda: open(path, "wb").write(b"audio"))
+
+    try:
+        hits = await asyncio.wait_for(asyncio.gather(*(
+            cache.fetch(key, str(tmp_path / f"out_{i}.mp3"), produce) for i in range(6)
+        )), timeout=10)
+    finally:
+        executor.shutdown(wait=False)
+
+    assert len(calls) == 1
+    assert hits.count(True) == 5
+
+
+@pytest.mark.asyncio
+async def test_processes_sharing_a_directory_produce_once(tmp_path):
+    """Test caches sharing a directory (as separate workers do) wait on each other's file lock"""
+    caches = [MediaCache(str(tmp_path / "cache"), 1024 * 1024) for _ in range(3)]
+    key = MediaCache.make_key("uploads/a.mp3", "etag-1")
+    calls = []
+
+    hits = await asyncio.gather(*(
+        cache.fetch(key, str(tmp_path / f"out_{i}.mp3"), make_producer(b"audio", calls, delay=0.05))
+        for i, cache in enumerate(caches)
+    ))
+
+    assert len(calls) == 1
+    assert sorted(hits) == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_lock_files_are_removed(tmp_path):
+    """Test lock files only exist while a key is locked"""
+    cache = MediaCache(str(tmp_path / "cache"), 150)
+    calls = []
+    for i in range(5):
+        key = MediaCache.make_key(f"uploads/{i}.mp3", "v1")
+        await cache.fetch(key, str(tmp_path / "out.mp3"), make_producer(b"x" * 100, calls))
+
+    assert [path.name for path in cache.locks_dir.iterdir() if path.name != ".evict"] == []
@@ -0,0 +1,50 @@
+"""
+Media command execution tests
+"""
+import subprocess
+import sys
+import pytest
+from app.utils import audio_chunker
+from app.utils.audio_chunker import AudioChunker
+from app.utils.media_exec import run_media_command
+
+
+@pytest.mark.asyncio
+async def test_failed_command_raises_called_process_error():
+    """Test a non-zero exit raises CalledProcessError with the decoded stderr"""
+    cmd = [sys.executable, "-c", "import sys; sys.stderr.write('bad input'); sys.exit(3)"]
+    with pytest.raises(subprocess.CalledProcessError) as raised:
+        await run_media_command(cmd)
+
+    assert raised.value.returncode == 3
+    assert raised.value.stderr == "bad input"
+
+
+@pytest.mark.asyncio
+async def test_slow_command_raises_timeout_expired():
+    """Test a command over its timeout is killed and raises TimeoutExpired"""
+    with pytest.raises(subprocess.TimeoutExpired):
+        await run_media_command([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.2)
+
+
+@pytest.mark.asyncio
+async def test_unchecked_command_returns_exit_code():
+    """Test check=False returns the result instead of raising"""
+    result = await run_media_command([sys.executable, "-c", "print('out'); raise SystemExit(1)"], check=False)
+
+    assert result.returncode == 1
+    assert result.stdout == "out\n"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("silence_search", [0, 5])
+async def test_chunker_reports_ffmpeg_failures(monkeypatch, tmp_path, silence_search):
+    """Test FFmpeg errors from either chunking path surface as chunking failures with FFmpeg's stderr"""
+    async def failing_command(cmd, timeout=None, check=True):
+        raise subprocess.CalledProcessError(1, cmd, "", "Invalid data found")
+
+    monkeypatch.setattr(audio_chunker, "run_media_command", failing_command)
+    chunker = AudioChunker(30, silence_search=silence_search)
+
+    with pytest.raises(Exception, match="Invalid data found"):
+        await chunker.chunk_audio(str(tmp_path / "input.mp3"), "test_job")
@@ -0,0 +1,50 @@
+"""
+Rate budget tests
+"""
+import asyncio
+import pytest
+from app.utils import rate_budget
+from app.utils.rate_budget import RateBudget
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the budget sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_budget.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_budget.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_burst_up_to_budget_then_waits_for_refill(clock):
+    """Test a full bucket allows a burst, then each request waits for its share of the minute"""
+    budget = RateBudget(60)
+    for _ in range(60):
+        await budget.acquire()
+    assert clock.slept == []
+
+    await budget.acquire()
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+@pytest.mark.asyncio
+async def test_disabled_budget_never_waits(clock):
+    """Test a budget of 0 lets every request through"""
+    budget = RateBudget(0)
+    await asyncio.gather(*(budget.acquire() for _ in range(1000)))
+    assert clock.slept == []
@@ -0,0 +1,44 @@
+"""
+Streamed upload tests
+"""
+import pytest
+from app.utils.media import FileTooLargeError, MediaProcessor
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_save_stream_writes_file_and_checksum(tmp_path):
+    """Test the file and checksum match what calculate_checksum sees"""
+    output = tmp_path / "uploads" / "audio.mp3"
+
+    size, checksum = await MediaProcessor.save_stream(stream(b"abc", b"def" * 1000, b"g"), str(output), chunk_size=64)
+
+    assert output.read_bytes() == b"abc" + b"def" * 1000 + b"g"
+    assert size == 3004
+    assert checksum == MediaProcessor.calculate_checksum(str(output))
+
+
+@pytest.mark.asyncio
+async def test_save_stream_accepts_exactly_max_size(tmp_path):
+    output = tmp_path / "audio.mp3"
+
+    size, _ = await MediaProcessor.save_stream(stream(b"x" * 10), str(output), max_size=10)
+
+    assert size == 10
+
+
+@pytest.mark.asyncio
+async def test_save_stream_rejects_oversized_upload_without_leaving_files(tmp_path):
+    """Test an upload over max_size fails and leaves neither the file nor its temp file"""
+    output = tmp_path / "audio.mp3"
+    output.write_bytes(b"previous upload")
+
+    with pytest.raises(FileTooLargeError):
+        await MediaProcessor.save_stream(stream(b"x" * 6, b"x" * 6), str(output), max_size=10)
+
+    assert output.read_bytes() == b"previous upload"
+    assert [path.name for path in tmp_path.iterdir()] == ["audio.mp3"]
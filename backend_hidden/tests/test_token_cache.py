@@ -0,0 +1,67 @@
+"""
+Verified token cache tests
+"""
+import time
+from app.utils import token_cache
+from app.utils.token_cache import VerifiedTokenCache
+
+
+def claims(exp_in=3600, **extra):
+    return {"sub": "user-1", "exp": time.time() + exp_in, **extra}
+
+
+def test_cached_claims_until_exp(monkeypatch):
+    """Test claims are served until the token expires, then dropped"""
+    cache = VerifiedTokenCache()
+    payload = claims(exp_in=60)
+    cache.put("token-a", payload, "kid-1")
+
+    assert cache.get("token-a") is payload
+    assert cache.get("token-b") is None
+
+    later = time.time() + 61
+    monkeypatch.setattr(token_cache.time, "time", lambda: later)
+    assert cache.get("token-a") is None
+    assert len(cache) == 0
+
+
+def test_tokens_without_future_exp_are_not_cached():
+    """Test tokens that are expired or have no exp are never cached"""
+    cache = VerifiedTokenCache()
+    cache.put("expired", claims(exp_in=-1), "kid-1")
+    cache.put("no-exp", {"sub": "user-1"}, "kid-1")
+
+    assert len(cache) == 0
+
+
+def test_least_recently_used_token_is_evicted():
+    """Test the cache stays within max_size, evicting the least recently used token"""
+    cache = VerifiedTokenCache(max_size=2)
+    cache.put("a", claims(), "kid-1")
+    cache.put("b", claims(), "kid-1")
+    cache.get("a")
+    cache.put("c", claims(), "kid-1")
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_raw_tokens_are_not_stored():
+    """Test entries are keyed by the token's hash"""
+    cache = VerifiedTokenCache()
+    cache.put("secret-token", claims(), "kid-1")
+
+    assert "secret-token" not in cache._entries
+
+
+def test_retain_kids_drops_tokens_from_rotated_keys():
+    """Test tokens signed by unpublished keys are dropped on key rotation"""
+    cache = VerifiedTokenCache()
+    cache.put("old", claims(), "kid-1")
+    cache.put("new", claims(), "kid-2")
+
+    cache.retain_kids(["kid-2"])
+
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
@@ -0,0 +1,49 @@
+"""
+TTL cache tests
+"""
+from app.utils import ttl_cache
+from app.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Test values are served until the TTL elapses"""
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", clock.monotonic)
+    cache = TTLCache(ttl=10)
+    cache.put("user-1", {"id": "user-1"})
+
+    clock.now += 9.9
+    assert cache.get("user-1") == {"id": "user-1"}
+    clock.now += 0.1
+    assert cache.get("user-1") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test the cache stays within max_size, evicting the least recently used entry"""
+    cache = TTLCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_invalidate_and_disabled_cache():
+    """Test invalidate removes an entry and a zero TTL disables caching"""
+    cache = TTLCache()
+    cache.put("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    disabled = TTLCache(ttl=0)
+    disabled.put("a", 1)
+    assert len(disabled) == 0
@@ -0,0 +1,113 @@
+"""
+TTS streaming tests
+"""
+import asyncio
+import threading
+import time
+import pytest
+from app.services.ai_service import AIService
+
+
+class FakeDeepgram:
+    """Deepgram client whose audio arrives slowly, chunk by chunk"""
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self.speak = self
+        self.v1 = self
+        self.audio = self
+
+    def generate(self, text, model, encoding):
+        def chunks():
+            try:
+                for _ in range(50):
+                    time.sleep(0.02)
+                    yield b"x" * 10
+            finally:
+                self.finished.set()
+        return chunks()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_deepgram_stream_stops_writing_before_returning(tmp_path):
+    """Test cancelling a Deepgram stream waits for its thread, so the file can be closed safely"""
+    service = AIService.__new__(AIService)
+    service.deepgram = FakeDeepgram()
+    output_path = tmp_path / "chunk.mp3"
+
+    with open(output_path, "wb") as output:
+        task = asyncio.create_task(service._stream_speech("Hello", "en", output))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The writer thread has let go of the file by the time cancellation finishes
+        assert service.deepgram.finished.is_set()
+        written = output.tell()
+
+    await asyncio.sleep(0.1)
+    assert 0 < written < 500
+    assert output_path.stat().st_size == written
+
+
+class FakeOpenAISpeech:
+    """OpenAI client whose streamed speech response yields a few chunks"""
+
+    def __init__(self):
+        self.audio = self
+        self.speech = self
+        self.with_streaming_response = self
+
+    def create(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def iter_bytes(self, chunk_size):
+        for _ in range(3):
+            yield b"mp3!"
+
+
+class ThreadRecordingOutput:
+    def __init__(self):
+        self.data = b""
+        self.threads = set()
+
+    def write(self, chunk):
+        self.threads.add(threading.get_ident())
+        self.data += chunk
+
+
+@pytest.mark.asyncio
+async def test_openai_speech_and_artifacts_are_written_off_the_event_loop(tmp_path, monkeypatch):
+    """Test streamed chunks and artifact copies don't do file I/O on the event loop thread"""
+    from app.config import settings
+    from app.services import ai_service
+
+    service = AIService.__new__(AIService)
+    service.openai_client = FakeOpenAISpeech()
+    loop_thread = threading.get_ident()
+
+    output = ThreadRecordingOutput()
+    await service._stream_speech("你好", "zh", output)
+    assert output.data == b"mp3!" * 3
+    assert loop_thread not in output.threads
+
+    copy_threads = []
+    real_copyfile = ai_service.shutil.copyfile
+
+    def recording_copyfile(src, dst):
+        copy_threads.append(threading.get_ident())
+        return real_copyfile(src, dst)
+
+    monkeypatch.setattr(settings, "tts_artifact_dir", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(ai_service.shutil, "copyfile", recording_copyfile)
+    size = await service.generate_speech_to_file("你好", "zh", str(tmp_path / "speech.mp3"))
+
+    assert size == 12
+    assert copy_threads and loop_thread not in copy_threads
+    assert [path.read_bytes() for path in (tmp_path / "artifacts").iterdir()] == [b"mp3!" * 3]
@@ -0,0 +1,154 @@
+"""
+Staged worker pipeline tests
+"""
+import asyncio
+import pytest
+from app.worker.pipeline import Pipeline, Stage
+
+
+async def wait_for(condition, timeout=1.0):
+    """Poll until condition() is true"""
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.mark.asyncio
+async def test_items_flow_through_stages_with_fan_out():
+    """Test items pass every stage in order and list results fan out"""
+    seen = []
+
+    async def split(item):
+        return [f"{item}-1", f"{item}-2"]
+
+    async def upper(item):
+        return item.upper()
+
+    async def record(item):
+        seen.append(item)
+
+    pipeline = Pipeline([Stage("split", split), Stage("upper", upper), Stage("record", record)])
+    pipeline.start()
+    try:
+        await pipeline.submit("a")
+        await pipeline.submit("b")
+        await wait_for(lambda: len(seen) == 4)
+    finally:
+        await pipeline.stop()
+
+    # A single worker per stage keeps submission order
+    assert seen == ["A-1", "A-2", "B-1", "B-2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_item_is_reported_and_dropped():
+    """Test a handler error calls on_error and on_drop and skips later stages"""
+    errors = []
+    drops = []
+    seen = []
+
+    async def check(item):
+        if item == "bad":
+            raise ValueError("bad item")
+        return item
+
+    async def record(item):
+        seen.append(item)
+
+    async def on_error(stage, item, error):
+        errors.append((stage.name, item, str(error)))
+
+    pipeline = Pipeline(
+        [Stage("check", check), Stage("record", record)],
+        on_error=on_error,
+        on_drop=lambda stage, item: drops.append((stage.name, item))
+    )
+    pipeline.start()
+    try:
+        for item in ["ok", "bad", "fine"]:
+            await pipeline.submit(item)
+        await wait_for(lambda: len(seen) == 2)
+    finally:
+        await pipeline.stop()
+
+    assert seen == ["ok", "fine"]
+    assert errors == [("check", "bad", "bad item")]
+    assert drops == [("check", "bad")]
+
+
+@pytest.mark.asyncio
+async def test_failed_item_is_dropped_when_error_handler_fails():
+    """Test on_drop still runs when on_error itself raises, so the item is always counted"""
+    finished = asyncio.Event()
+
+    async def fail(item):
+        raise RuntimeError("stage failed")
+
+    async def on_error(stage, item, error):
+        raise ConnectionError("status update failed")
+
+    pipeline = Pipeline(
+        [Stage("fail", fail)],
+        on_error=on_error,
+        on_drop=lambda stage, item: finished.set()
+    )
+    pipeline.start()
+    try:
+        await pipeline.submit("item")
+        await asyncio.wait_for(finished.wait(), timeout=1)
+        # The stage worker survived both errors
+        assert pipeline.running
+        finished.clear()
+        await pipeline.submit("another")
+        await asyncio.wait_for(finished.wait(), timeout=1)
+    finally:
+        await pipeline.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_items_are_skipped_and_dropped():
+    """Test items reported as cancelled never reach a handler but are still dropped"""
+    seen = []
+    drops = []
+
+    async def record(item):
+        seen.append(item)
+
+    pipeline = Pipeline(
+        [Stage("record", record)],
+        is_cancelled=lambda item: item.startswith("x"),
+        on_drop=lambda stage, item: drops.append(item)
+    )
+    pipeline.start()
+    try:
+        for item in ["a", "x1", "b"]:
+            await pipeline.submit(item)
+        await asyncio.wait_for(pipeline.queues[0].join(), timeout=1)
+    finally:
+        await pipeline.stop()
+
+    assert seen == ["a", "b"]
+    assert drops == ["x1"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    """Test submit blocks while the first stage's queue is full"""
+    release = asyncio.Event()
+
+    async def blocked(item):
+        await release.wait()
+
+    pipeline = Pipeline([Stage("blocked", blocked)], queue_size=1)
+    pipeline.start()
+    try:
+        await pipeline.submit(1)  # Taken by the worker
+        await asyncio.sleep(0.01)
+        await pipeline.submit(2)  # Fills the queue
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pipeline.submit(3), timeout=0.05)
+        release.set()
+    finally:
+        await pipeline.stop()